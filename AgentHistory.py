@@ -0,0 +1,203 @@
+# Historiales acotados de los agentes
+# Las posiciones y las acciones de cada agente se guardan en búferes circulares de enteros:
+# una posición se empaqueta en un entero (x << 12 | y) y una acción en un código más las dos
+# celdas empaquetadas, en lugar de tuplas y cadenas formateadas en cada acción. Con un límite,
+# la memoria por agente no crece con la duración de la partida; las entradas que salen del
+# búfer se pueden volcar a un archivo (enteros binarios en orden, ver `read_spill`)
+import os                # Rutas de los archivos de volcado
+from array import array  # Búferes de enteros sin objetos por entrada
+
+# Entradas que conserva cada historial por defecto (None: sin límite)
+HISTORY_LIMIT = 1024
+
+# Códigos de acción y su texto (con el formato de los registros anteriores)
+PORTRAIT_VICTIM = 1
+PORTRAIT_FALSE = 2
+FIRE_EXTINGUISHED = 3
+SMOKE_EXTINGUISHED = 4
+FIRE_TO_SMOKE = 5
+CLOSE_DOOR = 6
+OPEN_DOOR = 7
+BREAK_WALL = 8
+
+ACTION_FORMATS = {
+    PORTRAIT_VICTIM: "Portrait found at: {0}, Type: Victim",
+    PORTRAIT_FALSE: "Portrait found at: {0}, Type: False",
+    FIRE_EXTINGUISHED: "Fire extinguished at: {0}",
+    SMOKE_EXTINGUISHED: "Smoke extinguished at: {0}",
+    FIRE_TO_SMOKE: "Fire reduced to smoke at: {0}",
+    CLOSE_DOOR: "close door:{0}-{1}",
+    OPEN_DOOR: "open door:{0}-{1}",
+    BREAK_WALL: "break wall:{0}-{1}",
+}
+
+# Bits por coordenada de una posición empaquetada (tableros de hasta 4096 x 4096)
+COORD_BITS = 12
+COORD_MASK = (1 << COORD_BITS) - 1
+# Bits de una posición empaquetada dentro de una acción
+POS_BITS = 2 * COORD_BITS
+
+
+# Empaqueta una posición (x, y) en un entero
+def pack_position(pos):
+    return pos[0] << COORD_BITS | pos[1]
+
+
+# Desempaqueta una posición
+def unpack_position(value):
+    return (value >> COORD_BITS, value & COORD_MASK)
+
+
+# Empaqueta una acción: código y hasta dos celdas
+def pack_action(code, first, second=None):
+    value = code << 2 * POS_BITS | pack_position(first) << POS_BITS
+    if second is not None:
+        value |= pack_position(second)
+    return value
+
+
+# Texto de una acción empaquetada
+def format_action(value):
+    first = unpack_position(value >> POS_BITS & (1 << POS_BITS) - 1)
+    second = unpack_position(value & (1 << POS_BITS) - 1)
+    return ACTION_FORMATS[value >> 2 * POS_BITS].format(first, second)
+
+
+class HistoryRing:
+    # Búfer circular de enteros con tipo `typecode` que conserva las últimas `limit` entradas
+    # (todas si `limit` es None); `decode` convierte cada entrada al leerla y `spill_path`, si se
+    # indica, recibe las entradas descartadas como enteros binarios (tipo `typecode`, en orden)
+    def __init__(self, typecode, decode, limit=HISTORY_LIMIT, spill_path=None):
+        self.values = array(typecode)
+        self.decode = decode
+        self.limit = limit
+        self.spill_path = spill_path
+        self._spill = None
+        # El archivo de volcado empieza vacío, así que repetir una partida con el mismo nombre
+        # no deja entradas de la corrida anterior aunque esta no descarte ninguna
+        if spill_path is not None:
+            open(spill_path, "wb").close()
+        # Posición de la entrada más antigua dentro de `values` (una vez lleno)
+        self.head = 0
+        # Entradas descartadas desde el inicio
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    # Entradas de la más antigua a la más reciente, ya convertidas
+    def __iter__(self):
+        values = self.values
+        decode = self.decode
+        for i in range(self.head, len(values)):
+            yield decode(values[i])
+        for i in range(self.head):
+            yield decode(values[i])
+
+    def __getitem__(self, index):
+        size = len(self.values)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("índice de historial fuera de rango")
+        return self.decode(self.values[(self.head + index) % size])
+
+    def __repr__(self):
+        return repr(list(self))
+
+    # Agrega una entrada ya empaquetada, descartando la más antigua si el búfer está lleno
+    def push(self, value):
+        values = self.values
+        if self.limit is None or len(values) < self.limit:
+            values.append(value)
+            return
+
+        if self.limit <= 0:
+            self._write(value)
+            self.dropped += 1
+            return
+
+        self._write(values[self.head])
+        values[self.head] = value
+        self.head = (self.head + 1) % len(values)
+        self.dropped += 1
+
+    # Escribe una entrada descartada en el archivo de volcado (abierto al primer descarte) y la
+    # envía al sistema de inmediato, así un cierre abrupto no pierde lo ya descartado
+    def _write(self, value):
+        if self.spill_path is None:
+            return
+        if self._spill is None:
+            self._spill = open(self.spill_path, "ab")
+        self._spill.write(array(self.values.typecode, (value,)).tobytes())
+        self._spill.flush()
+
+    # Entradas volcadas al archivo, de la más antigua a la más reciente, ya convertidas
+    def spilled(self):
+        if self.spill_path is None or not os.path.exists(self.spill_path):
+            return iter(())
+        return read_spill(self.spill_path, self.values.typecode, self.decode)
+
+    # Cierra el archivo de volcado
+    def close(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+class PositionHistory(HistoryRing):
+    def __init__(self, limit=HISTORY_LIMIT, spill_path=None):
+        super().__init__("i", unpack_position, limit, spill_path)
+
+    # Agrega una posición (x, y)
+    def append(self, pos):
+        self.push(pack_position(pos))
+
+
+class ActionHistory(HistoryRing):
+    def __init__(self, limit=HISTORY_LIMIT, spill_path=None):
+        super().__init__("q", format_action, limit, spill_path)
+
+    # Agrega una acción con su código y sus celdas (el texto se arma solo al leerla)
+    def record(self, code, first, second=None):
+        self.push(pack_action(code, first, second))
+
+
+# Crea los historiales de posiciones y acciones de un agente; con `spill_dir` las entradas
+# descartadas van a "<run_id>-agent-<id>-positions.bin" y "<run_id>-agent-<id>-actions.bin"
+# en ese directorio
+def agent_histories(agent_id, limit=HISTORY_LIMIT, spill_dir=None, run_id="run"):
+    if spill_dir is None:
+        return PositionHistory(limit), ActionHistory(limit)
+
+    os.makedirs(spill_dir, exist_ok=True)
+    prefix = os.path.join(spill_dir, f"{run_id}-agent-{agent_id}")
+    return (PositionHistory(limit, prefix + "-positions.bin"),
+            ActionHistory(limit, prefix + "-actions.bin"))
+
+
+# Lee un archivo de volcado: enteros binarios con tipo `typecode` en el orden en que se
+# descartaron, convertidos con `decode` (por bloques, sin cargar el archivo completo); una
+# entrada incompleta al final (escritura interrumpida) se ignora
+def read_spill(path, typecode, decode, block=4096):
+    itemsize = array(typecode).itemsize
+    with open(path, "rb") as spill:
+        while True:
+            data = spill.read(block * itemsize)
+            data = data[:len(data) - len(data) % itemsize]
+            if not data:
+                return
+            values = array(typecode)
+            values.frombytes(data)
+            for value in values:
+                yield decode(value)
+
+
+# Posiciones (x, y) de un archivo "...-positions.bin"
+def read_positions(path):
+    return read_spill(path, "i", unpack_position)
+
+
+# Textos de las acciones de un archivo "...-actions.bin"
+def read_actions(path):
+    return read_spill(path, "q", format_action)
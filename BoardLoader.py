@@ -0,0 +1,132 @@
+# Lectura compartida de archivos de tablero
+# Todas las variantes de `procesar_txt` usan este lector, así que las dimensiones del tablero,
+# la cantidad de marcadores y los umbrales de victoria/derrota salen del propio archivo
+#
+# Formato (en este orden, las líneas vacías y las que empiezan con '#' se ignoran):
+# - Filas de muros: una celda de 4 dígitos (norte, oeste, sur, este) por columna del área central
+# - Puntos de interés: "fila columna f|v"
+# - Fuegos: "fila columna"
+# - Puertas: "fila1 columna1 fila2 columna2"
+# - Entradas: "fila columna"
+# - Directivas opcionales en cualquier parte: "nombre valor" (ver DEFAULT_RULES y `entrances`)
+
+# Reglas del juego por defecto (las del tablero original de 10x8)
+DEFAULT_RULES = {
+    "active_portraits": 3,   # Retratos activos que se mantienen en el tablero
+    "max_victims": 10,       # Máximo de víctimas que se pueden agregar
+    "max_false_alarms": 5,   # Máximo de falsas alarmas que se pueden agregar
+    "casualty_limit": 4,     # Víctimas perdidas para la derrota
+    "damage_limit": 24,      # Daño estructural para la derrota
+    "rescue_goal": 7,        # Retratos rescatados para la victoria
+}
+
+
+class BoardDefinition:
+    def __init__(self, walls, fake_alarms, victims, fires, doors, doors_connected,
+                 entrances, rules):
+        self.walls = walls
+        self.fake_alarms = fake_alarms
+        self.victims = victims
+        self.fires = fires
+        self.doors = doors
+        self.doors_connected = doors_connected
+        self.entrances = entrances
+        self.rules = rules
+
+        # Dimensiones del área central (filas y columnas de muros del archivo)
+        self.rows = len(walls)
+        self.cols = len(walls[0])
+
+        # Dimensiones de la cuadrícula completa (área central más el borde exterior)
+        self.width = self.cols + 2
+        self.height = self.rows + 2
+
+    # Devuelve los datos con el formato de `procesar_txt_sim`
+    def as_tuple(self):
+        return (self.walls, self.fake_alarms, self.victims, self.fires,
+                self.doors, self.doors_connected, self.entrances)
+
+
+# Indica si una línea es una fila de muros (celdas de 4 dígitos binarios)
+def _is_wall_row(tokens):
+    return all(len(token) == 4 and set(token) <= {"0", "1"} for token in tokens)
+
+
+# Lee un archivo de tablero y devuelve su BoardDefinition
+def load_board(file_path):
+    with open(file_path, 'r') as file:
+        lines = file.readlines()
+
+    rules = dict(DEFAULT_RULES)
+    declared_entrances = None
+
+    walls = []
+    fake_alarms = []
+    victims = []
+    fires = []
+    doors = {}
+    doors_connected = {}
+    pairs = []        # Líneas "fila columna" antes de la primera puerta
+    after_doors = []  # Líneas "fila columna" después de la primera puerta
+
+    for number, line in enumerate(lines, start=1):
+        tokens = line.split()
+
+        if not tokens or tokens[0].startswith("#"):
+            continue
+
+        # Directivas "nombre valor"
+        if not tokens[0].lstrip("-").isdigit():
+            if len(tokens) != 2:
+                raise ValueError(f"{file_path}:{number}: directiva inválida {line.strip()!r}")
+
+            name, value = tokens[0], int(tokens[1])
+
+            if name == "entrances":
+                declared_entrances = value
+            elif name in rules:
+                rules[name] = value
+            else:
+                raise ValueError(f"{file_path}:{number}: directiva desconocida {name!r}")
+
+        # Filas de muros (solo al inicio del archivo)
+        elif _is_wall_row(tokens) and not (fake_alarms or victims or pairs or doors):
+            # Cada celda se descompone en 4 dígitos
+            walls.append([[int(d) for d in token] for token in tokens])
+
+        # Puntos de interés
+        elif len(tokens) == 3 and tokens[2] in ("f", "v"):
+            r, c = int(tokens[0]), int(tokens[1])
+            if tokens[2] == 'f':  # Falsa alarma
+                fake_alarms.append((r, c))
+            else:  # Víctima
+                victims.append((r, c))
+
+        # Puertas
+        elif len(tokens) == 4:
+            r1, c1, r2, c2 = map(int, tokens)
+            doors[(c1, r1, c2, r2)] = (c1, r1, c2, r2)
+            doors_connected[(c1, r1)] = (c2, r2)
+            doors_connected[(c2, r2)] = (c1, r1)
+
+        # Fuegos y entradas
+        elif len(tokens) == 2:
+            (after_doors if doors else pairs).append((int(tokens[0]), int(tokens[1])))
+
+        else:
+            raise ValueError(f"{file_path}:{number}: línea inválida {line.strip()!r}")
+
+    if not walls or any(len(row) != len(walls[0]) for row in walls):
+        raise ValueError(f"{file_path}: las filas de muros deben tener el mismo número de celdas")
+
+    # Las puertas separan los fuegos de las entradas; sin puertas, `entrances N` indica
+    # cuántas de las últimas líneas "fila columna" son entradas
+    if declared_entrances is not None:
+        pairs += after_doors
+        split = len(pairs) - declared_entrances
+        fires, entrances = pairs[:split], pairs[split:]
+    else:
+        fires, entrances = pairs, after_doors
+
+    return BoardDefinition(walls, fake_alarms, victims, fires, doors, doors_connected,
+                           entrances, rules)
@@ -0,0 +1,675 @@
+# Estado del tablero respaldado por arreglos contiguos
+# Sustituye los diccionarios `grid_details`, `grid_walls` y `portraits` del modelo
+# por arreglos planos (índice = y * ancho + x) y expone vistas tipo diccionario
+# para que el código existente siga funcionando sin cambios
+from array import array                   # Arreglos tipados contiguos (int8)
+from collections.abc import MutableMapping  # Interfaz base para las vistas tipo diccionario
+
+import numpy as np  # Vistas vectorizadas sobre la misma memoria de los arreglos
+
+# Códigos del tipo de retrato guardados en el arreglo `portrait`
+# 0 indica que la celda no tiene entrada en el diccionario de retratos
+PORTRAIT_CODES = {"victim": 1, "false_alarm": 2, None: 3}
+PORTRAIT_NAMES = {1: "victim", 2: "false_alarm", 3: None}
+# Códigos de los retratos activos (los que todavía se pueden examinar)
+LIVE_PORTRAIT_CODES = (1, 2)
+# Lado (en celdas) de las cubetas del índice espacial de retratos
+PORTRAIT_BUCKET = 8
+
+# Conversión entre la cadena de 4 caracteres ("1001") y la máscara de 4 bits
+# El carácter en el índice `d` corresponde al bit `1 << d`
+MASK_TO_STR = tuple(
+    "".join("1" if mask >> d & 1 else "0" for d in range(4)) for mask in range(16)
+)
+STR_TO_MASK = {text: mask for mask, text in enumerate(MASK_TO_STR)}
+
+# Desplazamiento (dx, dy) de cada dirección: 0 norte, 1 oeste, 2 sur, 3 este
+DIRECTION_STEPS = ((0, -1), (-1, 0), (0, 1), (1, 0))
+# Dirección opuesta a cada dirección
+OPPOSITE = (2, 3, 0, 1)
+
+# Banderas de la tabla de aristas (una lectura por celda y dirección)
+EDGE_WALL = 1     # Muro sin puerta: bloquea el paso de los agentes
+EDGE_DOOR = 2     # Puerta cerrada sobre la arista
+EDGE_BLOCKED = 4  # Muro o puerta cerrada: bloquea el fuego y las explosiones
+
+# Entradas máximas de la bitácora de cambios de costo
+JOURNAL_LIMIT = 1 << 16
+
+
+class BoardState:
+    # Crea los arreglos del tablero para una cuadrícula de `width` x `height`
+    # Si se recibe una `topology` compilada, copia sus máscaras iniciales de muros y puertas
+    def __init__(self, width, height, topology=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        # Nivel de fuego por celda: 0 vacío, 1 humo, 2 fuego (int8 con signo)
+        self.fire = array("b", bytes(self.size))
+        # Bits de muros por celda (bit d = dirección d)
+        self.walls = bytearray(self.size)
+        # Bits de daño registrado por celda (bit d = dirección d)
+        self.damage = bytearray(self.size)
+        # Tipo de retrato por celda (ver PORTRAIT_CODES)
+        self.portrait = bytearray(self.size)
+        # Número de agentes en cada celda
+        self.occupancy = bytearray(self.size)
+        # Índice de ocupación: agentes de cada celda en orden de llegada (igual que la celda
+        # de la cuadrícula de mesa) y conjunto de celdas ocupadas
+        self.occupants = {}
+        self.occupied = set()
+        # Índices incrementales: celdas con humo, celdas con fuego y celdas cambiadas
+        # desde la última fase del entorno (al inicio todas cuentan como cambiadas)
+        self.smoke_set = set()
+        self.fire_set = set()
+        self.changed = set(range(self.size))
+        # Versiones del tablero: aumentan cuando cambia una arista (muro o puerta), un retrato
+        # o el conjunto de celdas con humo o fuego (para invalidar cálculos derivados)
+        self.edge_version = 0
+        self.portrait_version = 0
+        self.burning_version = 0
+        # Versión de los costos de movimiento: aumenta con cualquier cambio de nivel de fuego o
+        # de arista (los caminos planeados por los agentes con una versión anterior caducan)
+        self.cost_version = 0
+        # Bitácora de cambios de costo: la celda de cada aumento de `cost_version` (su nivel de
+        # fuego o sus aristas de salida cambiaron); `journal_base` es la versión de la primera
+        # entrada que se conserva
+        self.cost_journal = []
+        self.journal_base = 0
+
+        # Bits de puertas por celda y bits de puertas abiertas (bit d = dirección d)
+        self.doors = bytearray(self.size)
+        self.door_open = bytearray(self.size)
+        # Tabla de aristas: banderas EDGE_* en el índice (celda << 2) | dirección
+        self.edges = bytearray(self.size * 4)
+
+        # Topología compartida (solo lectura) de la que se copió el estado inicial
+        self.topology = topology
+
+        if topology is not None:
+            self.walls[:] = topology.walls
+            self.doors[:] = topology.doors
+            self.door_open[:] = topology.door_open
+            self.edges[:] = topology.edges
+
+        self._build_views()
+
+    # Copia el estado mutable del tablero (fuego, muros, daños, retratos, puertas y aristas)
+    # compartiendo la topología; la ocupación queda vacía para que el nuevo modelo registre
+    # a sus propios agentes
+    def copy(self):
+        board = BoardState.__new__(BoardState)
+        board.width = self.width
+        board.height = self.height
+        board.size = self.size
+        board.topology = self.topology
+
+        board.fire = array("b", self.fire)
+        board.walls = bytearray(self.walls)
+        board.damage = bytearray(self.damage)
+        board.portrait = bytearray(self.portrait)
+        board.occupancy = bytearray(self.size)
+        board.occupants = {}
+        board.occupied = set()
+        board.smoke_set = set(self.smoke_set)
+        board.fire_set = set(self.fire_set)
+        board.changed = set(self.changed)
+        board.edge_version = self.edge_version
+        board.portrait_version = self.portrait_version
+        board.burning_version = self.burning_version
+        board.cost_version = self.cost_version
+        board.cost_journal = list(self.cost_journal)
+        board.journal_base = self.journal_base
+        board.doors = bytearray(self.doors)
+        board.door_open = bytearray(self.door_open)
+        board.edges = bytearray(self.edges)
+
+        board._build_views()
+
+        # Conservar el orden de inserción y el registro de los retratos
+        board.portraits.copy_from(self.portraits)
+
+        return board
+
+    # Crea las vistas numpy y las vistas tipo diccionario sobre los arreglos
+    def _build_views(self):
+        shape = (self.height, self.width)
+
+        # Vistas numpy (comparten memoria con los arreglos, indexadas [y, x])
+        self.fire_np = np.frombuffer(self.fire, dtype=np.int8).reshape(shape)
+        self.walls_np = np.frombuffer(self.walls, dtype=np.uint8).reshape(shape)
+        self.damage_np = np.frombuffer(self.damage, dtype=np.uint8).reshape(shape)
+        self.portrait_np = np.frombuffer(self.portrait, dtype=np.uint8).reshape(shape)
+        self.occupancy_np = np.frombuffer(self.occupancy, dtype=np.uint8).reshape(shape)
+        # Tabla de aristas indexada [y, x, dirección]
+        self.edges_np = np.frombuffer(self.edges, dtype=np.uint8).reshape(shape + (4,))
+
+        # Máscara del área central (sin el borde exterior de la cuadrícula)
+        if self.topology is not None:
+            self.interior_np = self.topology.interior_np
+        else:
+            self.interior_np = np.zeros(shape, dtype=bool)
+            self.interior_np[1:-1, 1:-1] = True
+
+        # Vistas con la misma interfaz que los diccionarios originales
+        self.details = CellView(self)
+        self.walls_view = WallView(self)
+        self.portraits = PortraitView(self)
+
+    # Convierte una posición (x, y) en el índice plano de los arreglos
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    # Indica si la posición (x, y) está dentro de la cuadrícula
+    def contains(self, pos):
+        return 0 <= pos[0] < self.width and 0 <= pos[1] < self.height
+
+    # Convierte un índice plano en la posición (x, y)
+    def position(self, idx):
+        return (idx % self.width, idx // self.width)
+
+    # Recalcula las banderas de las 4 aristas de una celda a partir de sus máscaras
+    def refresh_edges(self, idx):
+        wall = self.walls[idx]
+        door = self.doors[idx]
+        opened = self.door_open[idx]
+        base = idx << 2
+
+        for d in range(4):
+            bit = 1 << d
+            flags = 0
+            # Muro que no es puerta
+            if wall & bit and not door & bit:
+                flags |= EDGE_WALL
+            # Puerta que no está abierta
+            if door & bit and not opened & bit:
+                flags |= EDGE_DOOR
+            # Muro (o puerta en un muro) que no está abierto
+            if wall & bit and not opened & bit:
+                flags |= EDGE_BLOCKED
+            self.edges[base + d] = flags
+
+        self.edge_version += 1
+        self._cost_changed(idx)
+
+    # Cambia el nivel de fuego de una celda y actualiza los índices de humo, fuego y cambios
+    def set_fire(self, idx, value):
+        previous = self.fire[idx]
+        self.fire[idx] = value
+
+        if previous == value:
+            return
+
+        self._cost_changed(idx)
+
+        # La celda entra o sale del conjunto de celdas con humo o fuego
+        if (previous == 0) != (value == 0):
+            self.burning_version += 1
+
+        self.smoke_set.discard(idx)
+        self.fire_set.discard(idx)
+        if value == 1:
+            self.smoke_set.add(idx)
+        elif value == 2:
+            self.fire_set.add(idx)
+
+        self.changed.add(idx)
+
+    # Registra un cambio de costo de movimiento en la celda `idx`
+    def _cost_changed(self, idx):
+        self.cost_version += 1
+        self.cost_journal.append(idx)
+
+        # Descarta la mitad más antigua de la bitácora al llenarse
+        if len(self.cost_journal) > JOURNAL_LIMIT:
+            drop = len(self.cost_journal) // 2
+            del self.cost_journal[:drop]
+            self.journal_base += drop
+
+    # Celdas con cambios de costo desde la versión `version`, o None si esos cambios ya se
+    # descartaron de la bitácora
+    def cost_changes_since(self, version):
+        if version < self.journal_base:
+            return None
+        return self.cost_journal[version - self.journal_base:]
+
+    # Marca una celda como cambiada (ocupación, muros o puertas)
+    def mark(self, idx):
+        self.changed.add(idx)
+
+    # Devuelve las celdas cambiadas desde la última llamada y reinicia el registro
+    def take_changes(self):
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+    # Registra la llegada de un agente a una celda
+    def add_occupant(self, idx, agent):
+        self.occupancy[idx] += 1
+        self.occupants.setdefault(idx, []).append(agent)
+        self.occupied.add(idx)
+        self.changed.add(idx)
+
+    # Registra la salida de un agente de una celda
+    def remove_occupant(self, idx, agent):
+        self.occupancy[idx] -= 1
+        agents = self.occupants[idx]
+        agents.remove(agent)
+        if not agents:
+            self.occupied.discard(idx)
+        self.changed.add(idx)
+
+    # Reemplaza la máscara completa de muros de una celda
+    def set_walls(self, idx, mask):
+        self.walls[idx] = mask
+        self.refresh_edges(idx)
+        self.changed.add(idx)
+
+    # Activa o elimina el muro de una celda en la dirección `d`
+    def set_wall(self, idx, d, present):
+        if present:
+            self.walls[idx] |= 1 << d
+        else:
+            self.walls[idx] &= ~(1 << d) & 0xF
+        self.refresh_edges(idx)
+        self.changed.add(idx)
+
+    # Registra las puertas del modelo (llaves (x1, y1, x2, y2) de `exit_positions`)
+    # Una puerta está abierta si ambas orientaciones existen y son verdaderas
+    # Devuelve los pares de celdas registrados
+    def load_doors(self, exit_positions):
+        loaded = []
+        for door in exit_positions:
+            if len(door) != 4:
+                continue
+            start, end = door[:2], door[2:]
+
+            # Ignora puertas fuera del tablero o entre celdas no adyacentes
+            if not (self.contains(start) and self.contains(end)):
+                continue
+            if (end[0] - start[0], end[1] - start[1]) not in DIRECTION_STEPS:
+                continue
+
+            opened = bool(exit_positions.get(door) and exit_positions.get(end + start))
+            self.set_door(start, end, True, opened)
+            loaded.append((start, end))
+
+        return loaded
+
+    # Activa o elimina la puerta entre dos celdas adyacentes y su estado abierta/cerrada
+    def set_door(self, start, end, present, opened=False):
+        d = DIRECTION_STEPS.index((end[0] - start[0], end[1] - start[1]))
+        for idx, side in ((self.index(start), d), (self.index(end), OPPOSITE[d])):
+            bit = 1 << side
+            if present:
+                self.doors[idx] |= bit
+            else:
+                self.doors[idx] &= ~bit & 0xF
+            if present and opened:
+                self.door_open[idx] |= bit
+            else:
+                self.door_open[idx] &= ~bit & 0xF
+            self.refresh_edges(idx)
+            self.changed.add(idx)
+
+    # Devuelve las banderas EDGE_* entre `start` y `next` con una sola lectura
+    # La dirección sigue la misma regla que `MansionModel.direction`; si las celdas no son
+    # adyacentes solo se considera el muro de `start` en esa dirección (no hay puertas)
+    def edge(self, start, next):
+        dx = next[0] - start[0]
+        dy = next[1] - start[1]
+
+        if dx == 0:
+            d = 0 if dy < 0 else 2
+        elif dy == 0:
+            d = 1 if dx < 0 else 3
+        else:
+            return 0
+
+        idx = start[1] * self.width + start[0]
+        if abs(dx) + abs(dy) == 1:
+            return self.edges[(idx << 2) | d]
+
+        return EDGE_WALL | EDGE_BLOCKED if self.walls[idx] >> d & 1 else 0
+
+    # Devuelve las posiciones de una máscara booleana en orden fila por fila (y, luego x)
+    def positions(self, mask):
+        width = self.width
+        return [(idx % width, idx // width) for idx in np.flatnonzero(mask).tolist()]
+
+    # Devuelve las posiciones de una máscara booleana en orden columna por columna (x, luego y)
+    def positions_by_column(self, mask):
+        height = self.height
+        return [(idx // height, idx % height) for idx in np.flatnonzero(mask.T).tolist()]
+
+    # Celdas con humo o fuego, en el mismo orden que recorría `grid_details.items()`
+    # Se obtienen de los índices incrementales, sin recorrer el tablero
+    def burning_cells(self):
+        width = self.width
+        return [(idx % width, idx // width) for idx in sorted(self.smoke_set | self.fire_set)]
+
+    # Kernel vectorizado de flashover: índices planos (en orden creciente) de las celdas con humo
+    # que pasan a fuego en una fase, con el mismo resultado que recorrerlas una por una en orden
+    # de índice. Una celda con humo se convierte si tiene un vecino en llamas sin muro entre
+    # ambas (las puertas no cuentan); como el recorrido es creciente, una conversión solo
+    # alcanza a las celdas posteriores (vecino este y vecino sur) dentro de la misma fase
+    def flashover_kernel(self):
+        smoke = self.fire_np == 1
+        burning = self.fire_np == 2
+        # Aristas sin muro por dirección (0 norte, 1 oeste, 2 sur, 3 este)
+        open_edges = (self.edges_np & EDGE_WALL) == 0
+
+        # Humo junto a fuego que ya existía al iniciar la fase
+        reached = np.zeros_like(smoke)
+        reached[1:, :] |= burning[:-1, :] & open_edges[1:, :, 0]
+        reached[:, 1:] |= burning[:, :-1] & open_edges[:, 1:, 1]
+        reached[:-1, :] |= burning[1:, :] & open_edges[:-1, :, 2]
+        reached[:, :-1] |= burning[:, 1:] & open_edges[:, :-1, 3]
+        converted = smoke & reached
+
+        # Propaga las conversiones hacia el este y el sur hasta que no haya cambios
+        while True:
+            grown = np.zeros_like(smoke)
+            grown[1:, :] = converted[:-1, :] & open_edges[1:, :, 0]
+            grown[:, 1:] |= converted[:, :-1] & open_edges[:, 1:, 1]
+            grown &= smoke & ~converted
+
+            if not grown.any():
+                break
+            converted |= grown
+
+        return np.flatnonzero(converted).tolist()
+
+    # Celdas del área central con un nivel válido (0, 1 o 2), en orden columna por columna
+    def interior_cells(self):
+        mask = self.interior_np & (self.fire_np >= 0) & (self.fire_np <= 2)
+        return self.positions_by_column(mask)
+
+
+# Vista tipo diccionario de `grid_details`: (x, y) -> nivel de fuego
+class CellView(MutableMapping):
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    # Devuelve el índice plano de `pos` o None si no es una celda válida
+    def _index(self, pos):
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return None
+        board = self._board
+        if 0 <= x < board.width and 0 <= y < board.height:
+            return y * board.width + x
+        return None
+
+    def __getitem__(self, pos):
+        idx = self._index(pos)
+        if idx is None:
+            raise KeyError(pos)
+        return self._board.fire[idx]
+
+    def __setitem__(self, pos, value):
+        idx = self._index(pos)
+        if idx is None:
+            raise KeyError(pos)
+        self._board.set_fire(idx, value)
+
+    def __delitem__(self, pos):
+        raise TypeError("Las celdas del grid no se pueden eliminar")
+
+    def __contains__(self, pos):
+        return self._index(pos) is not None
+
+    def get(self, pos, default=None):
+        idx = self._index(pos)
+        return default if idx is None else self._board.fire[idx]
+
+    # Recorre las celdas en el mismo orden que el diccionario original (y, luego x)
+    def __iter__(self):
+        width = self._board.width
+        return ((x, y) for y in range(self._board.height) for x in range(width))
+
+    def __len__(self):
+        return self._board.size
+
+    # Copia del estado como diccionario (usada por el DataCollector)
+    def __deepcopy__(self, memo):
+        return dict(self.items())
+
+
+# Vista de una celda de `grid_walls`: [0] muros y [1] daños como cadenas de 4 caracteres
+class WallCellView:
+    __slots__ = ("_board", "_idx")
+
+    def __init__(self, board, idx):
+        self._board = board
+        self._idx = idx
+
+    def _layer(self, layer):
+        if layer == 0:
+            return self._board.walls
+        if layer == 1:
+            return self._board.damage
+        raise IndexError(layer)
+
+    def __getitem__(self, layer):
+        return MASK_TO_STR[self._layer(layer)[self._idx]]
+
+    def __setitem__(self, layer, value):
+        if layer == 0:
+            self._board.set_walls(self._idx, STR_TO_MASK[value])
+        else:
+            self._layer(layer)[self._idx] = STR_TO_MASK[value]
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        return iter((self[0], self[1]))
+
+    def __repr__(self):
+        return repr([self[0], self[1]])
+
+    def __deepcopy__(self, memo):
+        return [self[0], self[1]]
+
+
+# Vista tipo diccionario de `grid_walls`: (x, y) -> [muros, daños]
+# Conserva las mismas llaves que el diccionario original (x en 1..ancho-1, y en 1..alto-1)
+class WallView(MutableMapping):
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    def _index(self, pos):
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return None
+        board = self._board
+        if 1 <= x < board.width and 1 <= y < board.height:
+            return y * board.width + x
+        return None
+
+    def __getitem__(self, pos):
+        idx = self._index(pos)
+        if idx is None:
+            raise KeyError(pos)
+        return WallCellView(self._board, idx)
+
+    def __setitem__(self, pos, value):
+        cell = self[pos]
+        cell[0], cell[1] = value
+
+    def __delitem__(self, pos):
+        raise TypeError("Las celdas de muros no se pueden eliminar")
+
+    def __contains__(self, pos):
+        return self._index(pos) is not None
+
+    def __iter__(self):
+        board = self._board
+        return ((x, y) for y in range(1, board.height) for x in range(1, board.width))
+
+    def __len__(self):
+        return (self._board.width - 1) * (self._board.height - 1)
+
+    def __deepcopy__(self, memo):
+        return {pos: [cell[0], cell[1]] for pos, cell in self.items()}
+
+
+# Vista tipo diccionario de `portraits`: (x, y) -> "victim" | "false_alarm" | None
+# El tipo vive en el arreglo `portrait`; `_keys` solo conserva el orden de inserción
+# También es el registro de retratos: lleva la cuenta por tipo y un índice de los retratos
+# activos (víctimas y falsas alarmas) en orden de inserción y por cubetas espaciales, para
+# que las consultas no recorran todas las entradas
+class PortraitView(MutableMapping):
+    __slots__ = ("_board", "_keys", "_next_order", "counts", "_live", "_buckets")
+
+    def __init__(self, board):
+        self._board = board
+        # Posición -> número de orden de inserción
+        self._keys = {}
+        self._next_order = 0
+        # Retratos por tipo (incluye None)
+        self.counts = {name: 0 for name in PORTRAIT_CODES}
+        # Retratos activos: posición -> orden de inserción, y cubeta -> posiciones activas
+        self._live = {}
+        self._buckets = {}
+
+    # Copia el registro de otra vista (el arreglo `portrait` se copia con el tablero)
+    def copy_from(self, other):
+        self._keys = dict(other._keys)
+        self._next_order = other._next_order
+        self.counts = dict(other.counts)
+        self._live = dict(other._live)
+        self._buckets = {bucket: set(cells) for bucket, cells in other._buckets.items()}
+
+    def _index(self, pos):
+        try:
+            x, y = pos
+        except (TypeError, ValueError):
+            return None
+        board = self._board
+        if 0 <= x < board.width and 0 <= y < board.height:
+            return y * board.width + x
+        return None
+
+    # Cubeta espacial de una posición
+    @staticmethod
+    def _bucket(pos):
+        return (pos[0] // PORTRAIT_BUCKET, pos[1] // PORTRAIT_BUCKET)
+
+    # Actualiza las cuentas y el índice de activos cuando una posición pasa de `old` a `new`
+    # (códigos del arreglo `portrait`, 0 sin retrato)
+    def _register(self, pos, old, new):
+        if old:
+            self.counts[PORTRAIT_NAMES[old]] -= 1
+        if new:
+            self.counts[PORTRAIT_NAMES[new]] += 1
+
+        live = new in LIVE_PORTRAIT_CODES
+        if live and pos not in self._live:
+            self._live[pos] = self._keys[pos]
+            self._buckets.setdefault(self._bucket(pos), set()).add(pos)
+        elif not live and pos in self._live:
+            del self._live[pos]
+            bucket = self._bucket(pos)
+            self._buckets[bucket].discard(pos)
+            if not self._buckets[bucket]:
+                del self._buckets[bucket]
+
+    def __getitem__(self, pos):
+        idx = self._index(pos)
+        if idx is None or not self._board.portrait[idx]:
+            raise KeyError(pos)
+        return PORTRAIT_NAMES[self._board.portrait[idx]]
+
+    def __setitem__(self, pos, value):
+        idx = self._index(pos)
+        if idx is None:
+            raise KeyError(pos)
+        board = self._board
+        if pos not in self._keys:
+            self._keys[pos] = self._next_order
+            self._next_order += 1
+        old = board.portrait[idx]
+        if old != PORTRAIT_CODES[value]:
+            board.portrait[idx] = PORTRAIT_CODES[value]
+            board.portrait_version += 1
+            self._register(pos, old, PORTRAIT_CODES[value])
+
+    def __delitem__(self, pos):
+        idx = self._index(pos)
+        if idx is None or not self._board.portrait[idx]:
+            raise KeyError(pos)
+        self._register(pos, self._board.portrait[idx], 0)
+        self._board.portrait[idx] = 0
+        self._board.portrait_version += 1
+        del self._keys[pos]
+
+    def __contains__(self, pos):
+        idx = self._index(pos)
+        return idx is not None and self._board.portrait[idx] != 0
+
+    # Número de orden de inserción de un retrato (para recorrerlos como el diccionario original)
+    def order(self, pos):
+        return self._keys[pos]
+
+    # Posiciones de los retratos activos (víctimas y falsas alarmas) en orden de inserción
+    def live(self):
+        return list(self._live)
+
+    # Retrato activo más cercano a `pos` por distancia Manhattan (empates por orden de
+    # inserción, igual que `min` sobre `live()`), o None si no hay retratos activos
+    # Recorre las cubetas en anillos alrededor de `pos` y se detiene cuando ningún anillo
+    # restante puede tener un retrato más cercano
+    def nearest(self, pos):
+        if not self._live:
+            return None
+
+        x, y = pos
+        bx, by = self._bucket(pos)
+        board = self._board
+        rings = max(board.width, board.height) // PORTRAIT_BUCKET + 1
+        best = None
+
+        for ring in range(rings + 1):
+            # Distancia mínima posible a una celda de este anillo
+            if best is not None and best[0] < (ring - 1) * PORTRAIT_BUCKET + 1:
+                break
+
+            for bucket in self._ring(bx, by, ring):
+                for cell in self._buckets.get(bucket, ()):
+                    key = (abs(cell[0] - x) + abs(cell[1] - y), self._live[cell], cell)
+                    if best is None or key < best:
+                        best = key
+
+        return best[2]
+
+    # Cubetas en el perímetro del anillo `ring` alrededor de la cubeta (bx, by)
+    @staticmethod
+    def _ring(bx, by, ring):
+        if ring == 0:
+            return [(bx, by)]
+        cells = []
+        for cx in range(bx - ring, bx + ring + 1):
+            cells.append((cx, by - ring))
+            cells.append((cx, by + ring))
+        for cy in range(by - ring + 1, by + ring):
+            cells.append((bx - ring, cy))
+            cells.append((bx + ring, cy))
+        return cells
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __deepcopy__(self, memo):
+        return dict(self.items())
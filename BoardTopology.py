@@ -0,0 +1,181 @@
+# Topología estática del tablero
+# Se compila una sola vez por distribución de tablero (muros, puertas y entradas) y se
+# comparte en modo de solo lectura entre todos los modelos construidos con esa distribución
+from collections import OrderedDict  # Caché de topologías en orden de uso
+
+import numpy as np  # Máscaras booleanas del tablero
+
+from BoardState import BoardState, DIRECTION_STEPS, STR_TO_MASK  # Plantilla para calcular las máscaras iniciales
+
+# Topologías ya compiladas, indexadas por la distribución del tablero, de la menos a la más
+# recientemente usada
+_TOPOLOGIES = OrderedDict()
+
+# Máximo de topologías guardadas (al llenarse se descarta la menos recientemente usada; los
+# modelos que ya la tienen la conservan)
+TOPOLOGY_CACHE_SIZE = 32
+
+
+class BoardTopology:
+    # Compila la topología a partir de la configuración leída del archivo del tablero
+    # `walls` son las filas de muros (listas de 4 dígitos), `doors` el diccionario de puertas
+    # con llaves (x1, y1, x2, y2) y `entrances` las entradas como (fila, columna)
+    def __init__(self, walls, doors, entrances, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        # Área central (sin el borde exterior) en orden columna por columna (x, luego y)
+        self.interior_cells = tuple(
+            (x, y) for x in range(1, width - 1) for y in range(1, height - 1)
+        )
+        # Conjunto del área central para consultas de pertenencia en O(1)
+        self.interior = frozenset(self.interior_cells)
+
+        # Máscara booleana del área central, indexada [y, x]
+        self.interior_np = np.zeros((height, width), dtype=bool)
+        self.interior_np[1:-1, 1:-1] = True
+        self.interior_np.flags.writeable = False
+
+        # Vecinos von Neumann de cada celda en el mismo orden que `grid.get_neighborhood`
+        # (oeste, norte, sur, este), indexados por el índice plano de la celda
+        self.neighbors = tuple(
+            self._von_neumann(idx % width, idx // width) for idx in range(self.size)
+        )
+
+        # Los mismos vecinos como índices planos
+        self.neighbor_ids = tuple(
+            tuple(ny * width + nx for nx, ny in cells) for cells in self.neighbors
+        )
+
+        # Aristas de salida de cada celda en el orden de vecinos de la búsqueda de los agentes
+        # (este, oeste, sur, norte): (vecino, índice en la tabla de aristas de la celda)
+        # y aristas de entrada: (celda de origen, índice en la tabla de aristas del origen)
+        outbound = [[] for _ in range(self.size)]
+        inbound = [[] for _ in range(self.size)]
+
+        for idx in range(self.size):
+            x, y = idx % width, idx // width
+
+            for d in (3, 1, 2, 0):
+                step_x, step_y = DIRECTION_STEPS[d]
+                nx, ny = x + step_x, y + step_y
+
+                if 0 <= nx < width and 0 <= ny < height:
+                    nxt = ny * width + nx
+                    outbound[idx].append((nxt, (idx << 2) | d))
+                    inbound[nxt].append((idx, (idx << 2) | d))
+
+        self.outbound = tuple(map(tuple, outbound))
+        self.inbound = tuple(map(tuple, inbound))
+
+        # Rayos direccionales: para cada celda y dirección (0 norte, 1 oeste, 2 sur, 3 este),
+        # los índices planos de las celdas que siguen en línea recta hasta el borde de la cuadrícula
+        self.rays = tuple(
+            tuple(self._ray(idx % width, idx // width, d) for d in range(4))
+            for idx in range(self.size)
+        )
+
+        # Entradas en coordenadas (x, y) y su proyección fuera del área central
+        self.entrances = tuple((int(col), int(row)) for row, col in entrances)
+        self.entrance_positions = tuple(self._outside(x, y) for x, y in self.entrances)
+
+        # Esquinas del área central y la dirección en la que su muro exterior no se daña
+        # (noroeste y noreste hacia el norte, sureste hacia el sur)
+        self.corner_rules = {
+            (1, 1): 0,
+            (width - 2, 1): 0,
+            (width - 2, height - 2): 2,
+        }
+
+        # Máscaras iniciales de muros, puertas y aristas calculadas sobre una plantilla
+        template = BoardState(width, height)
+
+        for y, row in enumerate(walls, start=1):
+            for x, cell in enumerate(row, start=1):
+                # Igual que `grid_walls`: solo celdas con x en 1..ancho-1 y y en 1..alto-1
+                if 1 <= x < width and 1 <= y < height:
+                    template.set_walls(y * width + x, STR_TO_MASK["".join(map(str, cell))])
+
+        # Pares de celdas adyacentes con puerta ((x1, y1), (x2, y2))
+        self.door_edges = tuple(template.load_doors(doors))
+
+        # Copias inmutables que cada modelo duplica en su propio BoardState
+        self.walls = bytes(template.walls)
+        self.doors = bytes(template.doors)
+        self.door_open = bytes(template.door_open)
+        self.edges = bytes(template.edges)
+
+    # Devuelve la topología compilada para esta distribución, compilándola solo si no está en
+    # la caché de las TOPOLOGY_CACHE_SIZE distribuciones usadas más recientemente
+    @classmethod
+    def from_layout(cls, walls, doors, entrances, width, height):
+        key = cls.layout_key(walls, doors, entrances, width, height)
+        topology = _TOPOLOGIES.get(key)
+
+        if topology is None:
+            topology = cls(walls, doors, entrances, width, height)
+            _TOPOLOGIES[key] = topology
+            if len(_TOPOLOGIES) > TOPOLOGY_CACHE_SIZE:
+                _TOPOLOGIES.popitem(last=False)
+        else:
+            _TOPOLOGIES.move_to_end(key)
+
+        return topology
+
+    # Llave inmutable que identifica una distribución de tablero
+    @staticmethod
+    def layout_key(walls, doors, entrances, width, height):
+        return (
+            width,
+            height,
+            tuple(tuple("".join(map(str, cell)) for cell in row) for row in walls),
+            tuple((door, bool(doors[door])) for door in doors),
+            tuple(tuple(entrance) for entrance in entrances),
+        )
+
+    # Índice plano de una posición (x, y)
+    def index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    # Vecinos von Neumann de una posición (x, y)
+    def neighbors_of(self, pos):
+        return self.neighbors[pos[1] * self.width + pos[0]]
+
+    # Calcula los vecinos dentro de la cuadrícula en el orden de mesa (x - 1, y - 1, y + 1, x + 1)
+    def _von_neumann(self, x, y):
+        candidates = ((x - 1, y), (x, y - 1), (x, y + 1), (x + 1, y))
+        return tuple(
+            (nx, ny) for nx, ny in candidates
+            if 0 <= nx < self.width and 0 <= ny < self.height
+        )
+
+    # Calcula las celdas en línea recta desde (x, y) en la dirección `d`, sin incluir (x, y)
+    # Los índices planos en línea recta forman una progresión aritmética, así que cada rayo
+    # es un `range` (memoria constante sin importar el tamaño del tablero)
+    def _ray(self, x, y, d):
+        idx = y * self.width + x
+
+        if d == 0:  # Norte
+            return range(idx - self.width, -1, -self.width)
+        elif d == 1:  # Oeste
+            return range(idx - 1, idx - x - 1, -1)
+        elif d == 2:  # Sur
+            return range(idx + self.width, self.size, self.width)
+        return range(idx + 1, idx - x + self.width)  # Este
+
+    # Proyecta una entrada del área central a la celda exterior adyacente
+    def _outside(self, x, y):
+        if y == 1:  # Borde superior
+            return (x, 0)
+
+        elif x == 1:  # Borde izquierdo
+            return (0, y)
+
+        elif x == self.width - 2:  # Borde derecho
+            return (self.width - 1, y)
+
+        elif y == self.height - 2:  # Borde inferior
+            return (x, self.height - 1)
+
+        return (x, y)  # Si no está en un borde, no se ajusta (esto no debería ocurrir)
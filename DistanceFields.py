@@ -0,0 +1,256 @@
+# Campos de distancia inversos hacia cada clase de objetivo de los agentes
+# Un campo guarda, para cada celda, el costo del mejor camino hasta el objetivo más cercano
+# de su clase (salidas, retratos o celdas con humo/fuego) y cuál es ese objetivo. Con el campo,
+# el siguiente paso de un agente es una consulta a sus vecinos en lugar de una búsqueda completa
+# Los campos se comparten entre todos los agentes, así que sus cálculos y reparaciones no
+# descuentan del presupuesto de expansiones de ningún agente (`expansion_budget`)
+import heapq  # Cola de prioridad para el Dijkstra inverso con varias fuentes
+from array import array  # Copia de los niveles de fuego del último cálculo
+
+import numpy as np  # Comparación de la tabla de aristas y del fuego entre cálculos
+
+from BoardState import DIRECTION_STEPS  # Direcciones de la tabla de aristas
+from PathSearch import EDGE_COSTS  # Costo por paso compartido con las búsquedas de los agentes
+
+# Distancia de las celdas que no alcanzan ningún objetivo
+UNREACHABLE = float("inf")
+
+# Clases de objetivo disponibles
+KINDS = ("exits", "portraits", "fires")
+
+
+class DistanceFields:
+    def __init__(self, model):
+        self.model = model
+        # Clase -> {versión, objetivos, copia de las aristas y del fuego, distancias, objetivo
+        # más cercano}
+        self._fields = {}
+        # Número de campos calculados desde cero y de reparaciones incrementales
+        self.builds = 0
+        self.repairs = 0
+
+    # Versión del tablero de la que depende el campo de una clase: los costos de movimiento
+    # (aristas y niveles de fuego) y, según la clase, los retratos o las celdas con humo o fuego
+    def _version(self, kind):
+        board = self.model.board
+
+        if kind == "portraits":
+            return (board.cost_version, board.portrait_version)
+        elif kind == "fires":
+            return (board.cost_version, board.burning_version)
+        return (board.cost_version,)
+
+    # Índices planos de los objetivos de una clase
+    def _sources(self, kind):
+        board = self.model.board
+
+        if kind == "exits":
+            return {
+                board.index(pos) for pos in self.model.entrances
+                if isinstance(pos, tuple) and len(pos) == 2 and board.contains(pos)
+            }
+        elif kind == "portraits":
+            return {board.index(pos) for pos in self.model.portraits.live()}
+        elif kind == "fires":
+            return board.smoke_set | board.fire_set
+
+        raise ValueError(f"Clase de objetivo desconocida: {kind!r} (usar {', '.join(KINDS)})")
+
+    # Devuelve el campo (distancias, objetivo más cercano) de una clase. Solo se actualiza si
+    # cambió algún costo de movimiento o el conjunto de objetivos desde la última consulta, y en
+    # ese caso se repara en lugar de recalcularse desde cero
+    def field(self, kind):
+        version = self._version(kind)
+        cached = self._fields.get(kind)
+
+        if cached is None:
+            cached = self._build(self._sources(kind))
+            self._fields[kind] = cached
+            self.builds += 1
+        elif cached["version"] != version:
+            if not self._repair(cached, self._sources(kind)):
+                cached = self._build(self._sources(kind))
+                self._fields[kind] = cached
+                self.builds += 1
+            else:
+                self.repairs += 1
+
+        cached["version"] = version
+        return cached["dist"], cached["owner"]
+
+    # Campo nuevo desde todos los objetivos a la vez
+    def _build(self, sources):
+        board = self.model.board
+        dist = [UNREACHABLE] * board.size
+        owner = [-1] * board.size
+        queue = []
+
+        for idx in sources:
+            dist[idx] = 0
+            owner[idx] = idx
+            queue.append((0, idx, idx))
+        heapq.heapify(queue)
+
+        self._propagate(dist, owner, queue)
+        return {"version": None, "sources": set(sources), "edges": bytes(board.edges),
+                "fire": array("b", board.fire), "dist": dist, "owner": owner}
+
+    # Actualiza un campo con los objetivos, aristas y niveles de fuego actuales. Devuelve False
+    # si conviene recalcularlo desde cero (los cambios afectan a más de la mitad del tablero)
+    def _repair(self, cached, sources):
+        board = self.model.board
+        width = board.width
+        edges = board.edges
+        fire = board.fire
+        outbound = self.model.topology.outbound
+        inbound = self.model.topology.inbound
+        dist = cached["dist"]
+        owner = cached["owner"]
+        old_edges = cached["edges"]
+        old_fire = cached["fire"]
+
+        # Pasos con costo distinto al del último cálculo: arista -> (celda de origen, destino)
+        # Cambian las aristas modificadas y todas las que entran a una celda cuyo fuego cambió
+        steps = {}
+        if old_edges != edges:
+            previous = np.frombuffer(old_edges, dtype=np.uint8)
+            for edge_idx in np.flatnonzero(previous != board.edges_np.ravel()).tolist():
+                idx = edge_idx >> 2
+                step_x, step_y = DIRECTION_STEPS[edge_idx & 3]
+                x, y = idx % width + step_x, idx // width + step_y
+                if 0 <= x < width and 0 <= y < board.height:
+                    steps[edge_idx] = (idx, y * width + x)
+        if old_fire != fire:
+            previous = np.frombuffer(old_fire, dtype=np.int8)
+            for nxt in np.flatnonzero(previous != np.frombuffer(fire, dtype=np.int8)).tolist():
+                for idx, edge_idx in inbound[nxt]:
+                    steps[edge_idx] = (idx, nxt)
+
+        # Objetivos retirados: las celdas que los tenían como el más cercano quedan sin valor
+        region = set()
+        removed = cached["sources"] - sources
+        if removed:
+            region.update(idx for idx, own in enumerate(owner) if own in removed)
+
+        # Pasos más caros por los que pasaba un camino óptimo: la celda de origen y las que
+        # llegaban a su objetivo a través de ella (con los costos anteriores) quedan sin valor;
+        # los pasos más baratos se aplican después
+        cheaper = []
+        frontier = []
+        for edge_idx, (idx, nxt) in steps.items():
+            old_cost = EDGE_COSTS[old_edges[edge_idx]] + old_fire[nxt]
+            new_cost = EDGE_COSTS[edges[edge_idx]] + fire[nxt]
+            if new_cost < old_cost:
+                cheaper.append((edge_idx, idx, nxt))
+            elif (new_cost > old_cost and idx not in region and owner[idx] >= 0
+                  and owner[idx] == owner[nxt] and dist[idx] == dist[nxt] + old_cost):
+                region.add(idx)
+                frontier.append(idx)
+
+        while frontier:
+            idx = frontier.pop()
+            for prev, edge_idx in inbound[idx]:
+                if (prev not in region and owner[prev] == owner[idx]
+                        and dist[prev] == dist[idx] + EDGE_COSTS[old_edges[edge_idx]] + old_fire[idx]):
+                    region.add(prev)
+                    frontier.append(prev)
+
+        if len(region) > board.size // 2:
+            return False
+
+        # Las celdas sin valor se vuelven a sembrar desde sus vecinos que siguen alcanzando
+        # algún objetivo
+        queue = []
+        for idx in region:
+            dist[idx] = UNREACHABLE
+            owner[idx] = -1
+
+        for idx in region:
+            for nxt, edge_idx in outbound[idx]:
+                if owner[nxt] < 0:
+                    continue
+                new_cost = dist[nxt] + EDGE_COSTS[edges[edge_idx]] + fire[nxt]
+                if (new_cost, owner[nxt]) < (dist[idx], owner[idx]):
+                    dist[idx] = new_cost
+                    owner[idx] = owner[nxt]
+            if owner[idx] >= 0:
+                queue.append((dist[idx], owner[idx], idx))
+
+        # Objetivos nuevos
+        for idx in sources - cached["sources"]:
+            if (0, idx) < (dist[idx], owner[idx]):
+                dist[idx] = 0
+                owner[idx] = idx
+                queue.append((0, idx, idx))
+
+        # Pasos más baratos (muros destruidos, puertas abiertas, fuego reducido): la celda de
+        # origen puede mejorar pasando por ellos
+        for edge_idx, idx, nxt in cheaper:
+            if owner[nxt] < 0:
+                continue
+            new_cost = dist[nxt] + EDGE_COSTS[edges[edge_idx]] + fire[nxt]
+            if (new_cost, owner[nxt]) < (dist[idx], owner[idx]):
+                dist[idx] = new_cost
+                owner[idx] = owner[nxt]
+                queue.append((new_cost, owner[nxt], idx))
+
+        heapq.heapify(queue)
+        self._propagate(dist, owner, queue)
+
+        cached["sources"] = set(sources)
+        cached["edges"] = bytes(edges)
+        cached["fire"] = array("b", fire)
+        return True
+
+    # Dijkstra inverso a partir de las celdas en la cola. Los empates de costo se resuelven
+    # por el índice del objetivo, así que el campo solo depende de los objetivos y los costos
+    # (no del orden de las actualizaciones)
+    def _propagate(self, dist, owner, queue):
+        board = self.model.board
+        edges = board.edges
+        fire = board.fire
+        inbound = self.model.topology.inbound
+
+        while queue:
+            cost, own, idx = heapq.heappop(queue)
+            if cost != dist[idx] or own != owner[idx]:
+                continue
+
+            # Celdas desde las que se entra a `idx` y la arista que cruzan
+            entry = fire[idx]
+            for prev, edge_idx in inbound[idx]:
+                new_cost = cost + EDGE_COSTS[edges[edge_idx]] + entry
+                if new_cost < dist[prev] or (new_cost == dist[prev] and own < owner[prev]):
+                    dist[prev] = new_cost
+                    owner[prev] = own
+                    heapq.heappush(queue, (new_cost, own, prev))
+
+    # Objetivo más cercano de una clase desde `pos`, o None si ninguno es alcanzable
+    def nearest(self, kind, pos):
+        dist, owner = self.field(kind)
+        idx = self.model.board.index(pos)
+
+        if dist[idx] == UNREACHABLE:
+            return None
+        return self.model.board.position(owner[idx])
+
+    # Siguiente paso desde `pos` hacia el objetivo más cercano de una clase, o None si no hay
+    # camino; los empates se resuelven en el orden de vecinos de la búsqueda (este, oeste, sur, norte)
+    def next_step(self, kind, pos):
+        dist, owner = self.field(kind)
+        board = self.model.board
+        edges = board.edges
+        fire = board.fire
+        idx = board.index(pos)
+
+        # Sin camino, o la celda ya es un objetivo
+        if dist[idx] == UNREACHABLE or dist[idx] == 0:
+            return None
+
+        # El primer vecino por el que pasa un camino óptimo hacia el mismo objetivo
+        for nxt, edge_idx in self.model.topology.outbound[idx]:
+            if (owner[nxt] == owner[idx]
+                    and dist[nxt] + EDGE_COSTS[edges[edge_idx]] + fire[nxt] == dist[idx]):
+                return board.position(nxt)
+
+        return None
@@ -0,0 +1,255 @@
+# Archivo comprimido de solo anexado con los eventos y la línea de tiempo de muchas partidas
+# Cada partida se guarda en segmentos de turnos consecutivos; cada segmento se comprime por
+# separado (gzip o lzma de la biblioteca estándar) y se anexa al archivo de datos, y el índice
+# (un archivo de texto junto al de datos) guarda por segmento: partida, primer y último turno,
+# posición y tamaño en bytes, y hasta qué evento y registro de la línea de tiempo llega; al
+# terminar una partida se agrega la línea "<partida>\tfinal". Un lector carga solo el índice y
+# descomprime únicamente los segmentos que necesita para recorrer eventos o reconstruir el
+# estado de un turno
+#
+# Contenido de un segmento (antes de comprimir):
+# - 4 bytes (little-endian) con el tamaño de la cabecera JSON
+# - cabecera JSON: partida, turnos, cabecera de eventos y de línea de tiempo (ver
+#   `EventStore.pack` y `Timeline.pack`) y tamaño de los bytes de eventos
+# - bytes de los eventos del segmento y, si la partida tenía línea de tiempo, sus registros
+import bisect   # Búsqueda del segmento de un turno
+import gzip     # Compresión rápida
+import json     # Cabeceras de los segmentos
+import lzma     # Compresión más densa
+import os       # Existencia del índice
+import struct   # Tamaño de la cabecera
+
+from EventStore import unpack_events  # Eventos empaquetados a diccionarios
+from Timeline import Timeline         # Registros empaquetados a línea de tiempo
+
+# Compresores disponibles
+CODECS = {
+    "gzip": gzip.compress,
+    "lzma": lzma.compress,
+}
+# Firma de cada formato al inicio de un segmento comprimido
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+
+# Turnos por segmento por defecto (con línea de tiempo se redondea a un múltiplo de su
+# intervalo para que cada segmento empiece en un cuadro clave)
+CHUNK_STEPS = 100
+
+
+# Ruta del índice de un archivo de datos
+def index_path(path):
+    return path + ".idx"
+
+
+# Lee el índice de `path` y devuelve los segmentos de cada partida en orden (primer turno,
+# último turno, posición, tamaño, eventos y registros escritos hasta el segmento) y el conjunto
+# de partidas terminadas; ambos vacíos si el archivo todavía no existe
+def read_index(path):
+    segments = {}
+    finished = set()
+    try:
+        index = open(index_path(path))
+    except FileNotFoundError:
+        return segments, finished
+
+    with index:
+        for line in index:
+            fields = line.rstrip("\n").split("\t")
+            if fields[1:] == ["final"]:
+                finished.add(fields[0])
+                continue
+            segments.setdefault(fields[0], []).append(tuple(int(field) for field in fields[1:]))
+    return segments, finished
+
+
+class ArchiveWriter:
+    def __init__(self, path, codec="gzip", chunk_steps=CHUNK_STEPS):
+        if codec not in CODECS:
+            raise ValueError(f"Compresión desconocida: {codec!r} (usar {', '.join(CODECS)})")
+
+        self.path = path
+        self.compress = CODECS[codec]
+        self.chunk_steps = max(1, chunk_steps)
+        # Partidas terminadas (con la línea final en el índice) y avance de las partidas en curso:
+        # siguiente turno, evento y registro de la línea de tiempo. Una partida que quedó sin
+        # terminar en el archivo continúa donde quedó su último segmento (escribirla con el modelo
+        # de esa misma partida)
+        segments, self._finished = read_index(path)
+        self._cursors = {
+            run_id: {"step": entries[-1][1] + 1, "event": entries[-1][4], "record": entries[-1][5]}
+            for run_id, entries in segments.items() if run_id not in self._finished
+        }
+        self._data = open(path, "ab")
+        self._index = open(index_path(path), "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # Cierra el archivo; de las partidas que no se escribieron con `final` solo quedan sus
+    # segmentos completos (sin la línea final; un escritor nuevo puede continuarlas)
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+    # Anexa los segmentos completos de la partida `run_id` que aún no se escribieron; con
+    # `final` también escribe el último segmento incompleto y da la partida por terminada (no
+    # acepta más escrituras). Para escribir mientras avanza la partida, llamar entre turnos del
+    # modelo con `final=False` y una última vez con `final=True`
+    def write(self, run_id, model, final=True):
+        run_id = str(run_id)
+        if any(char in run_id for char in "\t\n"):
+            raise ValueError(f"Identificador de partida inválido: {run_id!r}")
+        if run_id in self._finished:
+            raise ValueError(f"La partida {run_id!r} ya está terminada en {self.path}")
+
+        timeline = model.timeline
+        chunk = self.chunk_steps
+        if timeline is not None:
+            chunk = -(-chunk // timeline.interval) * timeline.interval
+
+        cursor = self._cursors.get(run_id)
+        if cursor is None:
+            first = timeline.steps[0] if timeline is not None else 0
+            cursor = self._cursors[run_id] = {"step": first, "event": 0, "record": 0}
+
+        # Turno más reciente ya terminado
+        last = model.step_count
+
+        while cursor["step"] <= last:
+            stop = cursor["step"] + chunk
+            if stop - 1 > last:
+                if not final:
+                    break
+                stop = last + 1
+            self._write_segment(run_id, model, cursor, stop)
+
+        if final:
+            self._index.write(f"{run_id}\tfinal\n")
+            self._finished.add(run_id)
+            del self._cursors[run_id]
+
+        self._data.flush()
+        self._index.flush()
+
+    # Escribe el segmento de los turnos [cursor["step"], stop) y avanza el cursor
+    def _write_segment(self, run_id, model, cursor, stop):
+        events = model.events
+        start_event = end_event = cursor["event"]
+        while end_event < len(events):
+            step = events.step_of(end_event)
+            if step is not None and step >= stop:
+                break
+            end_event += 1
+
+        event_header, event_data = events.pack(start_event, end_event)
+        header = {
+            "run": run_id,
+            "first_step": cursor["step"],
+            "last_step": stop - 1,
+            "events": event_header,
+            "event_bytes": len(event_data),
+            "timeline": None,
+        }
+        data = event_data
+
+        timeline = model.timeline
+        if timeline is not None:
+            records = cursor["record"] + stop - cursor["step"]
+            header["timeline"], timeline_data = timeline.pack(cursor["record"], records)
+            data += timeline_data
+            cursor["record"] = records
+
+        encoded = json.dumps(header, separators=(",", ":"), default=list).encode()
+        segment = self.compress(struct.pack("<I", len(encoded)) + encoded + data)
+
+        offset = self._data.tell()
+        self._data.write(segment)
+        self._index.write(f"{run_id}\t{cursor['step']}\t{stop - 1}\t{offset}\t{len(segment)}"
+                          f"\t{end_event}\t{cursor['record']}\n")
+
+        cursor["step"] = stop
+        cursor["event"] = end_event
+
+
+class ArchiveReader:
+    def __init__(self, path):
+        self.path = path
+        # Segmentos de cada partida en orden (ver `read_index`) y partidas terminadas
+        if not os.path.exists(index_path(path)):
+            raise FileNotFoundError(f"No existe el índice {index_path(path)}")
+        self.segments, self.finished = read_index(path)
+
+    # Identificadores de las partidas guardadas (terminadas o no)
+    def runs(self):
+        return list(self.segments)
+
+    # Indica si la partida `run_id` se escribió hasta el final; si no, sus eventos y estados
+    # llegan solo hasta el último segmento guardado
+    def complete(self, run_id):
+        return str(run_id) in self.finished
+
+    # Lee y descomprime un segmento; devuelve (cabecera, bytes de eventos, bytes de línea de tiempo)
+    def _read(self, file, entry):
+        offset, length = entry[2], entry[3]
+        file.seek(offset)
+        raw = file.read(length)
+
+        if raw.startswith(GZIP_MAGIC):
+            payload = gzip.decompress(raw)
+        elif raw.startswith(XZ_MAGIC):
+            payload = lzma.decompress(raw)
+        else:
+            raise ValueError(f"{self.path}: segmento con formato desconocido en {offset}")
+
+        size = struct.unpack_from("<I", payload)[0]
+        header = json.loads(payload[4:4 + size])
+        body = memoryview(payload)[4 + size:]
+        return header, body[:header["event_bytes"]], body[header["event_bytes"]:]
+
+    # Segmentos de `run_id` que contienen turnos entre `start` y `stop` (sin incluir `stop`)
+    def _entries(self, run_id, start=None, stop=None):
+        if run_id not in self.segments:
+            raise KeyError(f"La partida {run_id!r} no está en el archivo")
+
+        for entry in self.segments[run_id]:
+            if start is not None and entry[1] < start:
+                continue
+            if stop is not None and entry[0] >= stop:
+                break
+            yield entry
+
+    # Recorre los eventos de la partida `run_id` en orden, opcionalmente solo los de los turnos
+    # [start, stop), descomprimiendo un segmento a la vez
+    def events(self, run_id, start=None, stop=None):
+        run_id = str(run_id)
+        with open(self.path, "rb") as file:
+            for entry in self._entries(run_id, start, stop):
+                header, event_data, _ = self._read(file, entry)
+                for event in unpack_events(header["events"], event_data):
+                    step = event.get("step")
+                    if step is not None and ((start is not None and step < start)
+                                             or (stop is not None and step >= stop)):
+                        continue
+                    yield event
+
+    # Estado de la partida `run_id` al final del turno `step` (ver `Timeline.state_at`),
+    # leyendo solo el segmento que contiene ese turno
+    def state_at(self, run_id, step):
+        run_id = str(run_id)
+        entries = self.segments.get(run_id)
+        if not entries:
+            raise KeyError(f"La partida {run_id!r} no está en el archivo")
+
+        position = bisect.bisect_right([entry[0] for entry in entries], step) - 1
+        if position < 0 or step > entries[position][1]:
+            raise IndexError(f"el turno {step} no está en la partida {run_id!r}")
+
+        with open(self.path, "rb") as file:
+            header, _, timeline_data = self._read(file, entries[position])
+        if header["timeline"] is None:
+            raise ValueError(f"La partida {run_id!r} se guardó sin línea de tiempo")
+
+        return Timeline.unpack(header["timeline"], timeline_data).state_at(step)
@@ -0,0 +1,256 @@
+# Registro compacto de eventos del modelo
+# En lugar de una lista de diccionarios (uno nuevo por evento, con llaves de texto y tuplas),
+# cada evento guarda el código de su forma (tipo más campos, internado como entero pequeño) y
+# sus valores como enteros en la columna de esa forma: las posiciones se empaquetan con
+# `AgentHistory.pack_position` (el mismo formato de los historiales; -1 es una posición vacía)
+# y los textos (tipos de retrato) se internan. Los diccionarios con la forma de siempre
+# ({"type": ..., campo: valor}) solo se arman al serializar
+import sys               # Orden de bytes de los segmentos empaquetados
+from array import array  # Columnas de enteros sin objetos por valor
+
+from AgentHistory import COORD_MASK, pack_position, unpack_position  # Posiciones empaquetadas
+
+# Clases de campo: posición (x, y), entero o texto internado
+POSITION = 0
+INTEGER = 1
+NAME = 2
+
+# Clase de cada campo conocido; un evento con otros campos se guarda tal cual
+FIELD_KINDS = {
+    "position": POSITION,
+    "at": POSITION,
+    "from": POSITION,
+    "to": POSITION,
+    "target": POSITION,
+    "agent": INTEGER,
+    "step": INTEGER,
+    "damage": INTEGER,
+    "rescued": INTEGER,
+    "portrait_type": NAME,
+}
+
+
+class EventShape:
+    __slots__ = ("code", "type", "fields", "kinds", "positions", "names", "step")
+
+    def __init__(self, code, event_type, fields):
+        self.code = code
+        self.type = event_type
+        self.fields = fields
+        self.kinds = tuple(FIELD_KINDS[field] for field in fields)
+        # Índices de los campos que se empaquetan o se internan al guardar
+        self.positions = tuple(i for i, kind in enumerate(self.kinds) if kind == POSITION)
+        self.names = tuple(i for i, kind in enumerate(self.kinds) if kind == NAME)
+        # Índice del campo "step" (None si la forma no lo tiene)
+        self.step = fields.index("step") if "step" in fields else None
+
+
+# Formas registradas (el código es el índice) y búsqueda por (tipo, campos)
+# El código 0 queda para los eventos guardados tal cual
+SHAPES = [None]
+_SHAPE_CODES = {}
+
+
+# Devuelve la forma de un tipo de evento con sus campos en orden, registrándola si es nueva
+def event_shape(event_type, fields):
+    key = (event_type, tuple(fields))
+    shape = _SHAPE_CODES.get(key)
+    if shape is None:
+        shape = EventShape(len(SHAPES), event_type, key[1])
+        SHAPES.append(shape)
+        _SHAPE_CODES[key] = shape
+    return shape
+
+
+# Eventos del entorno (MansionModel)
+PORTRAIT_ADDED = event_shape("portrait_added", ("position", "portrait_type", "step"))
+FIRE_REMOVED_TO_PORTRAIT = event_shape("fire_removed_to_portrait", ("position", "portrait_type", "step"))
+PORTRAIT_LOST = event_shape("portrait_lost", ("position", "portrait_type", "step"))
+SMOKE_ADDED = event_shape("smoke_added", ("position", "step"))
+SMOKE_TO_FIRE = event_shape("smoke_to_fire", ("position", "step"))
+FIRE_TO_SMOKE = event_shape("fire_to_smoke", ("position", "step"))
+FIRE_EXTENDED = event_shape("fire_extended", ("from", "to", "step"))
+WALL_DESTROYED = event_shape("wall_destroyed", ("position", "target", "step"))
+DAMAGE_WALL = event_shape("damage_wall", ("position", "target", "step", "damage"))
+
+# Eventos de los agentes (LuigiAgent)
+AGENT_MOVE = event_shape("agent_move", ("agent", "from", "to", "step"))
+FOUND_PORTRAIT = event_shape("found_portrait", ("at", "agent", "portrait_type", "step"))
+RESCUED_PORTRAIT = event_shape("rescued_portrait", ("agent", "position", "rescued", "step"))
+FIRE_EXTINGUISHED = event_shape("fire_extinguished", ("agent", "at", "step"))
+AGENT_FIRE_TO_SMOKE = event_shape("fire_to_smoke", ("agent", "at", "step"))
+SMOKE_EXTINGUISHED = event_shape("smoke_extinguished", ("agent", "position", "step"))
+OPEN_DOOR = event_shape("open_door", ("agent", "position", "target", "step"))
+AGENT_WALL_DESTROYED = event_shape("wall_destroyed", ("agent", "position", "target", "damage", "step"))
+
+
+class EventStore:
+    def __init__(self):
+        # Código de forma de cada evento en orden y su fila dentro de la columna de la forma
+        self.codes = array("H")
+        self.rows = array("i")
+        # Valores de cada forma, una fila de ancho fijo por evento
+        self.columns = {}
+        # Textos internados y su índice
+        self.names = []
+        self._name_codes = {}
+        # Eventos guardados tal cual (formas no reconocidas)
+        self.raw = []
+
+    def __len__(self):
+        return len(self.codes)
+
+    # Índice de un texto internado
+    def _name(self, value):
+        code = self._name_codes.get(value)
+        if code is None:
+            code = self._name_codes[value] = len(self.names)
+            self.names.append(value)
+        return code
+
+    # Agrega un evento de la forma `shape` con sus valores en el orden de sus campos
+    def append(self, shape, *values):
+        code = shape.code
+        column = self.columns.get(code)
+        if column is None:
+            column = self.columns[code] = array("i")
+
+        self.codes.append(code)
+        self.rows.append(len(column) // len(shape.fields))
+
+        values = list(values)
+        for i in shape.positions:
+            value = values[i]
+            values[i] = -1 if value is None else pack_position(value)
+        for i in shape.names:
+            values[i] = self._name(values[i])
+        column.extend(values)
+
+    # Agrega un evento en forma de diccionario; si su forma no se puede guardar en columnas
+    # (tipo que no va primero, campos desconocidos o valores de otra clase) se guarda tal cual
+    def append_dict(self, event):
+        keys = list(event)
+        if (keys and keys[0] == "type" and all(key in FIELD_KINDS for key in keys[1:])
+                and all(self._fits(FIELD_KINDS[key], event[key]) for key in keys[1:])):
+            self.append(event_shape(event["type"], keys[1:]), *(event[key] for key in keys[1:]))
+            return
+
+        self.codes.append(0)
+        self.rows.append(len(self.raw))
+        self.raw.append(event)
+
+    # Indica si un valor se puede guardar en una columna de la clase `kind`
+    @staticmethod
+    def _fits(kind, value):
+        if kind == POSITION:
+            return value is None or (type(value) is tuple and len(value) == 2
+                                     and all(type(v) is int and 0 <= v <= COORD_MASK for v in value))
+        if kind == INTEGER:
+            return type(value) is int and -(1 << 31) <= value < 1 << 31
+        return value is None or type(value) is str
+
+    # Diccionario del evento `index` (con la forma de los registros anteriores)
+    def event(self, index):
+        code = self.codes[index]
+        row = self.rows[index]
+        if code == 0:
+            return self.raw[row]
+
+        shape = SHAPES[code]
+        width = len(shape.fields)
+        column = self.columns[code]
+        event = {"type": shape.type}
+        for offset, (field, kind) in enumerate(zip(shape.fields, shape.kinds)):
+            value = column[row * width + offset]
+            if kind == POSITION:
+                value = None if value < 0 else unpack_position(value)
+            elif kind == NAME:
+                value = self.names[value]
+            event[field] = value
+        return event
+
+    # Diccionarios de los eventos entre `start` y `stop`, en orden
+    def as_dicts(self, start=0, stop=None):
+        return [self.event(index) for index in range(*slice(start, stop).indices(len(self.codes)))]
+
+    # Bytes ocupados por las columnas (sin los eventos guardados tal cual)
+    @property
+    def nbytes(self):
+        total = len(self.codes) * self.codes.itemsize + len(self.rows) * self.rows.itemsize
+        return total + sum(len(column) * column.itemsize for column in self.columns.values())
+
+    # Turno del evento `index` (None si no tiene campo "step")
+    def step_of(self, index):
+        code = self.codes[index]
+        row = self.rows[index]
+        if code == 0:
+            return self.raw[row].get("step")
+
+        shape = SHAPES[code]
+        if shape.step is None:
+            return None
+        return self.columns[code][row * len(shape.fields) + shape.step]
+
+    # Empaqueta los eventos [start, stop) para guardarlos fuera del modelo: devuelve una
+    # cabecera serializable como JSON (formas usadas, textos internados y eventos guardados tal
+    # cual) y los bytes de los códigos y de los valores de cada evento en orden
+    def pack(self, start, stop):
+        codes = self.codes[start:stop]
+        values = array("i")
+        shapes = {}
+        raw = []
+
+        for code, row in zip(codes, self.rows[start:stop]):
+            if code == 0:
+                raw.append(self.raw[row])
+                continue
+            shape = SHAPES[code]
+            width = len(shape.fields)
+            values.extend(self.columns[code][row * width:(row + 1) * width])
+            shapes[str(code)] = [shape.type, list(shape.fields)]
+
+        header = {
+            "count": len(codes),
+            "shapes": shapes,
+            "names": self.names,
+            "raw": raw,
+            "byteorder": sys.byteorder,
+            "code_bytes": len(codes) * codes.itemsize,
+        }
+        return header, codes.tobytes() + values.tobytes()
+
+
+# Diccionarios de los eventos empaquetados con `EventStore.pack`, en orden
+# Las formas se leen de la cabecera, así que no dependen de los códigos de este proceso
+def unpack_events(header, data):
+    codes = array("H")
+    values = array("i")
+    split = header["code_bytes"]
+    codes.frombytes(data[:split])
+    values.frombytes(data[split:])
+    if header["byteorder"] != sys.byteorder:
+        codes.byteswap()
+        values.byteswap()
+
+    shapes = {int(code): (event_type, fields, tuple(FIELD_KINDS[field] for field in fields))
+              for code, (event_type, fields) in header["shapes"].items()}
+    names = header["names"]
+    raw = iter(header["raw"])
+
+    offset = 0
+    for code in codes:
+        if code == 0:
+            yield next(raw)
+            continue
+
+        event_type, fields, kinds = shapes[code]
+        event = {"type": event_type}
+        for field, kind in zip(fields, kinds):
+            value = values[offset]
+            offset += 1
+            if kind == POSITION:
+                value = None if value < 0 else unpack_position(value)
+            elif kind == NAME:
+                value = names[value]
+            event[field] = value
+        yield event
@@ -0,0 +1,236 @@
+# Planificador incremental (estilo D* Lite) para los agentes
+# Busca hacia atrás desde todos los objetivos de una clase hasta la posición del agente y
+# conserva su estado entre consultas: cuando el tablero cambia solo repara las celdas
+# afectadas (leídas de la bitácora de cambios de costo del tablero) en lugar de buscar desde
+# cero. Usa el mismo costo por paso que las demás búsquedas (`PathSearch.step_cost`)
+import heapq  # Cola de prioridad de las celdas inconsistentes
+
+from PathSearch import EDGE_COSTS, step_cost  # Costo por paso compartido con las búsquedas
+
+# Costo de las celdas que no alcanzan ningún objetivo
+UNREACHABLE = float("inf")
+
+
+class IncrementalPlanner:
+    def __init__(self, model):
+        self.model = model
+        self.goals = set()
+        # Versión de costos del tablero con la que están sincronizados los valores
+        self.version = None
+        # Número de celdas expandidas (para medir el trabajo de cada reparación)
+        self.expanded = 0
+        # Celdas expandidas por la última consulta y si se quedó sin presupuesto
+        self.last_expanded = 0
+        self.exhausted = False
+        self._reset(None)
+
+    # Reinicia la búsqueda (sin valores calculados) con el agente en `start`
+    def _reset(self, start):
+        size = self.model.board.size
+        self.g = [UNREACHABLE] * size
+        self.rhs = [UNREACHABLE] * size
+        self.queue = []
+        self.queued = {}
+        self.km = 0
+        self.start = start
+        self.last = start
+
+        for idx in self.goals:
+            self.rhs[idx] = 0
+            self._push(idx)
+
+    # Copia el estado de la búsqueda para el modelo `model` (bifurcaciones)
+    def copy(self, model):
+        planner = IncrementalPlanner.__new__(IncrementalPlanner)
+        planner.model = model
+        planner.goals = set(self.goals)
+        planner.version = self.version
+        planner.expanded = self.expanded
+        planner.last_expanded = self.last_expanded
+        planner.exhausted = self.exhausted
+        planner.g = list(self.g)
+        planner.rhs = list(self.rhs)
+        planner.queue = list(self.queue)
+        planner.queued = dict(self.queued)
+        planner.km = self.km
+        planner.start = self.start
+        planner.last = self.last
+        return planner
+
+    # Distancia Manhattan entre dos índices planos (admisible: cada paso cuesta al menos 1)
+    def _distance(self, a, b):
+        width = self.model.board.width
+        return abs(a % width - b % width) + abs(a // width - b // width)
+
+    # Heurística desde la posición del agente
+    def _heuristic(self, idx):
+        return self._distance(idx, self.start)
+
+    # Llave de prioridad de una celda
+    def _key(self, idx):
+        best = min(self.g[idx], self.rhs[idx])
+        return (best + self._heuristic(idx) + self.km, best)
+
+    # Inserta (o reemplaza) una celda en la cola; las entradas viejas se descartan al salir
+    def _push(self, idx):
+        key = self._key(idx)
+        if self.queued.get(idx) != key:
+            self.queued[idx] = key
+            heapq.heappush(self.queue, (key, idx))
+
+    # Costo de entrar a `nxt` por la arista `edge_idx`
+    def _cost(self, nxt, edge_idx):
+        board = self.model.board
+        return step_cost(board.fire, board.edges[edge_idx], nxt)
+
+    # Recalcula el mejor costo de una celda a partir de sus vecinos y la encola si quedó
+    # inconsistente (el costo de las aristas se calcula en línea: es el ciclo más frecuente)
+    def _update(self, idx):
+        if idx not in self.goals:
+            g = self.g
+            board = self.model.board
+            edges = board.edges
+            fire = board.fire
+            best = UNREACHABLE
+            for nxt, edge_idx in self.model.topology.outbound[idx]:
+                cost = g[nxt] + EDGE_COSTS[edges[edge_idx]] + fire[nxt]
+                if cost < best:
+                    best = cost
+            self.rhs[idx] = best
+
+        if self.g[idx] != self.rhs[idx]:
+            self._push(idx)
+        else:
+            self.queued.pop(idx, None)
+
+    # Expande celdas hasta que la posición del agente quede consistente y no queden celdas con
+    # llave menor o igual a la suya (así todo camino óptimo queda con valores exactos)
+    # Con `budget` expande como máximo esa cantidad de celdas y devuelve False si no terminó;
+    # la cola queda lista para continuar en la siguiente consulta
+    def _compute(self, budget=None):
+        queue = self.queue
+        queued = self.queued
+        g = self.g
+        rhs = self.rhs
+        inbound = self.model.topology.inbound
+        start = self.start
+        expanded = 0
+
+        while queue:
+            key, idx = queue[0]
+            if queued.get(idx) != key:
+                heapq.heappop(queue)
+                continue
+
+            # Llave de la posición del agente (su heurística es 0)
+            best = min(g[start], rhs[start])
+            if key > (best + self.km, best) and rhs[start] == g[start]:
+                break
+
+            # Presupuesto agotado antes de terminar
+            if budget is not None and expanded >= budget:
+                self.last_expanded = expanded
+                return False
+
+            heapq.heappop(queue)
+            new_key = self._key(idx)
+            if key < new_key:
+                self._push(idx)
+                continue
+
+            del queued[idx]
+            self.expanded += 1
+            expanded += 1
+
+            if g[idx] > rhs[idx]:
+                g[idx] = rhs[idx]
+                for prev, _ in inbound[idx]:
+                    self._update(prev)
+            else:
+                g[idx] = UNREACHABLE
+                self._update(idx)
+                for prev, _ in inbound[idx]:
+                    self._update(prev)
+
+        self.last_expanded = expanded
+        return True
+
+    # Aplica los cambios del tablero y de los objetivos desde la última consulta
+    def _sync(self, start, goals):
+        board = self.model.board
+        inbound = self.model.topology.inbound
+
+        changes = None
+        if self.version is not None:
+            changes = board.cost_changes_since(self.version)
+
+        # Primera consulta o cambios ya descartados de la bitácora: búsqueda desde cero
+        if changes is None:
+            self.goals = set(goals)
+            self._reset(start)
+            self.version = board.cost_version
+            return
+
+        # El agente se movió: las llaves ya encoladas se corrigen con el desplazamiento acumulado
+        if start != self.last:
+            self.km += self._distance(self.last, start)
+            self.start = start
+            self.last = start
+
+        # Objetivos nuevos o retirados
+        for idx in self.goals ^ goals:
+            if idx in goals:
+                self.goals.add(idx)
+                self.rhs[idx] = 0
+            else:
+                self.goals.discard(idx)
+            self._update(idx)
+
+        # Cada celda cambiada altera sus aristas de salida y el costo de entrar a ella
+        affected = set(changes)
+        for idx in list(affected):
+            affected.update(prev for prev, _ in inbound[idx])
+        for idx in affected:
+            self._update(idx)
+
+        self.version = board.cost_version
+
+    # Objetivo más cercano desde `pos` entre `goals` y el camino hacia él (sin la posición
+    # inicial), o (None, [pos]) si ninguno es alcanzable
+    # Con `budget` expande como máximo esa cantidad de celdas; si se agota antes de terminar
+    # devuelve (None, [pos]) y `exhausted` queda en True
+    def plan(self, pos, goals, budget=None):
+        board = self.model.board
+        outbound = self.model.topology.outbound
+
+        width, height = board.width, board.height
+        start = board.index(pos)
+        self._sync(start, {y * width + x for x, y in goals if 0 <= x < width and 0 <= y < height})
+        self.exhausted = not self._compute(budget)
+        if self.exhausted:
+            return None, [pos]
+        g = self.g
+
+        if g[start] == UNREACHABLE:
+            return None, [pos]
+
+        # Sigue el vecino con menor costo más valor hasta llegar a un objetivo
+        # (empates en el orden de vecinos de la búsqueda: este, oeste, sur, norte)
+        path = []
+        idx = start
+        while idx not in self.goals:
+            if len(path) >= board.size:
+                return None, [pos]
+            best = None
+            best_cost = UNREACHABLE
+            for nxt, edge_idx in outbound[idx]:
+                cost = self._cost(nxt, edge_idx) + g[nxt]
+                if cost < best_cost:
+                    best = nxt
+                    best_cost = cost
+            if best is None:
+                return None, [pos]
+            idx = best
+            path.append(board.position(idx))
+
+        return board.position(idx), path
@@ -1,8 +1,11 @@
 # Importación de módulos necesarios
-import heapq            # Biblioteca para trabajar con colas de prioridad
 from mesa import Agent  # Clase base para agentes en simulaciones con Mesa
 from queue import Queue # Cola FIFO
-import random           # Biblioteca para generar valores aleatorios
+from BoardState import EDGE_WALL, EDGE_DOOR  # Banderas de la tabla de aristas del tablero
+from IncrementalPlanner import IncrementalPlanner  # Planificador incremental por clase de objetivo
+from PathSearch import astar, nearest  # Núcleo de búsqueda sobre índices planos con arreglos reutilizables
+import AgentHistory  # Historiales acotados de posiciones y acciones
+import EventStore  # Formas de los eventos del registro del modelo
 
 DEVELOPMENT = False  # Bandera de desarrollo
 
@@ -15,13 +18,43 @@ class LuigiAgent(Agent):
         self.role = role                    # Rol asignado al agente, que puede influir en su comportamiento
         self.pos = None                     # Posición actual del agente en la cuadrícula, inicialmente `None`
         self.model = model                  # Referencia al modelo al que pertenece el agente
-        self.history = []                   # Historial de posiciones del agente
-        self.action_history = []            # Historial de acciones realizadas por el agente
+        # Historiales de posiciones y de acciones (búferes circulares con el límite del modelo)
+        self.history, self.action_history = AgentHistory.agent_histories(
+            unique_id, model.history_limit, model.history_spill, model.run_id)
         self.action_points = 4              # Puntos de acción disponibles por turno
         self.carrying_portrait = False      # Indica si el agente está llevando un retrato
         self.in_central_grid = False        # Indica si el agente está en la cuadrícula central
         self.start_position = position      # Posición inicial del agente
-
+        self.planned_path = []              # Resto del camino planeado (con `path_reuse`)
+        self.planned_target = None          # Objetivo del camino planeado
+        self.planned_goals = None           # Objetivos entre los que se eligió el planeado
+        self.planned_version = None         # Versión de costos del tablero con la que se planeó
+        self.planners = {}                  # Planificadores incrementales por clase de objetivo
+        self.assigned_target = None         # Objetivo asignado por el modelo en el turno actual
+        self.search_budget = None           # Celdas que aún puede expandir en el turno (None: sin límite)
+
+    # Crea una copia del agente para `model` con su estado de juego (rol, energía, retrato y
+    # posición inicial) y su camino planeado, sin los historiales; la posición la asigna el
+    # modelo al colocarlo
+    def fork(self, model):
+        agent = LuigiAgent(self.unique_id, model, self.role, self.start_position)
+        agent.action_points = self.action_points
+        agent.carrying_portrait = self.carrying_portrait
+        agent.in_central_grid = self.in_central_grid
+        agent.planned_path = list(self.planned_path)
+        agent.planned_target = self.planned_target
+        agent.planned_goals = self.planned_goals
+        agent.planned_version = self.planned_version
+        agent.planners = {kind: planner.copy(model) for kind, planner in self.planners.items()}
+        agent.assigned_target = self.assigned_target
+        agent.search_budget = self.search_budget
+        return agent
+
+
+    # Cierra los archivos de volcado de sus historiales
+    def close(self):
+        self.history.close()
+        self.action_history.close()
 
     # Función para reiniciar el estado del agente
     # Resetea los atributos del agente y lo mueve a su posición inicial si es necesario
@@ -32,219 +65,187 @@ class LuigiAgent(Agent):
         self.in_central_grid = False
 
         # Mensaje de depuración indicando que el agente ha sido reiniciado
-        print(f"[DEBUG] Agente {self.unique_id} ha muerto.")
+        self.model.log.debug("[DEBUG] Agente %s ha muerto.", self.unique_id)
 
         # Si el agente tiene una posición inicial definida, lo mueve a esa posición
         if self.start_position:
-            self.model.grid.move_agent(self, self.start_position)
+            self.model.move_agent(self, self.start_position)
             self.pos = self.start_position
 
             # Mensaje de depuración indicando el movimiento a la posición inicial
-            print(f"[DEBUG] Agente {self.unique_id} movido a su posición inicial {self.start_position}.")
+            self.model.log.debug("[DEBUG] Agente %s movido a su posición inicial %s.", self.unique_id, self.start_position)
         
         # Registra el evento de movimiento en el modelo
-        self.model.log_event({
-            "type": "agent_move",           # Tipo de evento: movimiento del agente
-            "agent": self.unique_id,        # ID único del agente
-            "from": self.start_position,    # Posición inicial del movimiento
-            "to": self.start_position,      # Posición final del movimiento
-        })
+        self.model.emit_event(EventStore.AGENT_MOVE, self.unique_id, self.start_position, self.start_position, self.model.step_count)
 
     # Implementa el algoritmo de Dijkstra para encontrar el camino más corto entre puntos
+    # (un A* con heurística Manhattan; ver `PathSearch.astar`). `details` es la vista de niveles
+    # de fuego del modelo, que la búsqueda lee directamente del arreglo del tablero
     def dijkstra(self, details, ptk, goals):
-        # Inicializa un diccionario para almacenar 
-        # los costos acumulados desde el punto inicial
-        path_cost = {ptk: 0}
-        
-        # Inicializa un conjunto para rastrear los nodos 
-        # ya visitados
-        path_close = set()
-        # Inicializa un diccionario para mapear cada nodo a 
-        # su nodo anterior en el camino
-        path_past = {}
-        # Inicializa la cola de prioridad
-
-        # Inicializa una cola de prioridad para manejar los nodos abiertos,
-        # comenzando con el nodo inicial `ptk` y un costo de 0
-        analize_path = [(0, ptk)]
-        # Si hay objetivos definidos (lista de metas no vacía)
-        if len(goals) >= 1:
-            
-            # Mientras haya nodos por evaluar en la cola de prioridad
-            while analize_path:
-                # Extrae el nodo con menor costo acumulado 
-                # de la cola de prioridad
-                _, present_node = heapq.heappop(analize_path)
-                
-                # Si el nodo actual es uno de los objetivos,
-                # construye el camino más corto
-                if present_node in goals:
-                    # Construye el camino mas corto
-                    path = []
-                    
-                    # Retrocede desde el nodo actual hasta el 
-                    # nodo inicial utilizando `path_past`
-                    while present_node in path_past:
-                        path.append(present_node)
-
-                        present_node = path_past[present_node]
-                    # Devuelve el camino invertido
-                    return path[::-1]
-
-                # Marca el nodo actual como visitado añadiéndolo al conjunto `path_close`
-                path_close.add(present_node)
-                
-                # Explora todos los vecinos (adyacentes) del nodo actual
-                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                    # Calcula las coordenadas del vecino
-                    x, y = present_node[0] + dx, present_node[1] + dy
-                    neighbor = (x, y)
-
-                    # Si el vecino no es válido (fuera de los 
-                    # detalles del modelo), lo omite
-                    if neighbor not in details:
-                        continue
-
-                    # Si el vecino ya ha sido visitado, lo omite
-                    if neighbor in path_close:
-                        continue
-
-                    # Obtiene el costo base del vecino desde `details`
-                    cost = details[neighbor]
-
-                    # Penaliza obstáculos para que no tome ese path tan seguido
-                    # Cada path tiene un costo fijo
-                    # Esto para que pueda escoger el camino mas corto
+        # Sin objetivos, retorna posición inicial
+        if len(goals) < 1:
+            return [ptk]
 
-                    # Penaliza paredes para que no tome ese path tan seguido
-                    if self.check_collision_walls(present_node, neighbor):
-                        cost += 4
-                    
-                    # Penaliza puertas para que prefiera el path sin ningun obstaculo
-                    if self.check_collision_doors(present_node, neighbor):
-                        cost += 1
+        board = self.model.board
+        width = board.width
 
-                    # Calcula el costo tentativo para llegar al vecino
-                    for_the_moment_cost = path_cost[present_node] + cost
-                    
-                    # Si el vecino no tiene costo registrado o el costo tentativo es menor,
-                    # lo actualiza
-                    if neighbor not in path_cost or for_the_moment_cost < path_cost[neighbor]:
-                        # Actualiza el costo del vecino
-                        path_cost[neighbor] = for_the_moment_cost
-                        # Calcula las heurísticas hacia todos los objetivos desde el vecino
-                        valid_goals = [self.manhattan_heuristic(neighbor, goal) for goal in goals]
-                        
+        path = astar(self.model, ptk[1] * width + ptk[0],
+                     {goal[1] * width + goal[0] for goal in goals}, self.search_budget)
+        buffers = self.model.search_buffers
+        self.spend_budget(buffers.expanded, buffers.exhausted)
 
-                        # Determina la prioridad del vecino considerando el costo y la heurística
-                        if valid_goals:
-                            priority = for_the_moment_cost + min(valid_goals)
-                        else:
-                            # Si no hay heurísticas válidas, usa una heurística hacia el punto inicial
-                            priority = for_the_moment_cost + self.manhattan_heuristic(neighbor, ptk)
-
-                        # Añade el vecino a la cola de prioridad
-                        heapq.heappush(analize_path, (priority, neighbor))
-                        # Registra de dónde vino el vecino
-                        path_past[neighbor] = present_node
-            
-            # Si no hay camino, devuelve posición inicial
-            return [ptk]
-        
-        else:
-            # Sin objetivos, retorna posición inicial
+        # Si no hay camino, devuelve posición inicial
+        if path is None:
             return [ptk]
+        return [(idx % width, idx // width) for idx in path]
     
-    # Verifica si existe una pared entre dos puntos
+    # Verifica si existe una pared entre dos puntos (las puertas no cuentan como pared)
+    # Comparte la tabla de aristas del tablero con `MansionModel.check_collision_walls`
     def check_collision_walls(self, start, next):
-        # Obtiene la dirección entre las dos posiciones
-        direction = self.model.direction(start, next)
-        # Combina las posiciones para buscar en estructuras específicas
-        combined_possn = start + next
-        # Combina las posiciones en orden inverso
-        combined_posns = next + start
-        
-        # Verifica si la celda inicial tiene información de paredes
-        if start in self.model.grid_walls:
-            # Determina si la pared en la dirección especificada está bloqueada
-            wall_blocked = direction is not None and self.model.grid_walls[start][0][direction] == '1'
-        else:
-            # Si no hay datos, asume que no hay pared bloqueada
-            wall_blocked = False
-
-        # Si la combinación de posiciones está en las salidas, permite el paso
-        if (combined_possn in self.model.exit_positions or 
-            combined_posns in self.model.exit_positions):
-            wall_blocked = False
-        
-        # Devuelve True si hay una pared bloqueada, False de lo contrario
-        return wall_blocked
+        return bool(self.model.board.edge(start, next) & EDGE_WALL)
 
     # Verifica si hay una puerta cerrada entre dos posiciones
     def check_collision_doors(self, start, next):
-        # Combina las posiciones para buscar salidas específicas
-        combined_possn = start + next
-        # Combina las posiciones en orden inverso
-        combined_posns = next + start
-
-        # Verifica si las posiciones están marcadas como salidas
-        if combined_possn in self.model.exit_positions or \
-           combined_posns in self.model.exit_positions:
-            
-            # Si ambas posiciones son salidas abiertas
-            if self.model.exit_positions.get(combined_possn) and \
-               self.model.exit_positions.get(combined_posns):
-                # No hay puerta bloqueada
-                doors_blocked = False
-
-            else:
-                # Hay una puerta bloqueada
-                doors_blocked = True
-        else:
-            # No hay puerta en estas posiciones
-            doors_blocked = False
-
-        # Devuelve True si la puerta está cerrada, False de lo contrario
-        return doors_blocked
+        return bool(self.model.board.edge(start, next) & EDGE_DOOR)
     
-    # Calcula una heurística basada en la distancia de Manhattan más un factor aleatorio
+    # Calcula una heurística basada en la distancia de Manhattan
     def manhattan_heuristic(self, cell, goal):
-        # Calcula la heurística Manhattan entre dos celdas
-
         # La distancia de Manhattan es la suma de las diferencias absolutas 
         # entre las coordenadas de las dos celdas
-        return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1]) + random.uniform(0, 0.5)
-        # Se agrega un factor aleatorio para romper posibles empates
+        # Los empates se resuelven por el orden de los candidatos, sin factor aleatorio
+        return abs(cell[0] - goal[0]) + abs(cell[1] - goal[1])
+
+    # Descuenta del presupuesto del turno las `expanded` celdas expandidas por la última búsqueda
+    # y registra en el modelo si la búsqueda se cortó por falta de presupuesto (`exhausted`)
+    def spend_budget(self, expanded, exhausted):
+        if self.search_budget is not None:
+            self.search_budget = max(0, self.search_budget - expanded)
+        if exhausted:
+            self.model.budget_hits += 1
+
+    # Busca desde la posición del agente el objetivo alcanzable más cercano por costo real
+    # Una sola búsqueda de Dijkstra que se detiene en el primer objetivo que sale de la cola;
+    # cada paso cuesta lo mismo que en `dijkstra` (`PathSearch.step_cost`: 1 más el nivel de
+    # fuego de la celda destino y las penalizaciones de muros y puertas), sin heurística
+    # Devuelve (objetivo, camino sin la posición inicial) o (None, [posición]) si no hay camino
+    def nearest_path(self, goals):
+        board = self.model.board
+        width, height = board.width, board.height
+
+        target, path = nearest(self.model, board.index(self.pos),
+                               {y * width + x for x, y in goals if 0 <= x < width and 0 <= y < height},
+                               budget=self.search_budget)
+        buffers = self.model.search_buffers
+        self.spend_budget(buffers.expanded, buffers.exhausted)
+
+        if target is None:
+            return None, [self.pos]
+        return (target % width, target // width), [(idx % width, idx // width) for idx in path]
+
+    # Elige el objetivo más cercano de una clase ("exits", "portraits" o "fires"), o el objetivo
+    # asignado por el modelo en este turno si todavía es uno de los candidatos
+    # Con campos de distancia es el objetivo del campo; si no, el del planificador incremental
+    # de la clase o el de `nearest_path`, cuyo camino queda planeado para el siguiente `move_towards`
+    def nearest_target(self, kind, candidates):
+        fields = self.model.distance_fields
+
+        # Objetivo asignado en la fase de asignación del turno, mientras siga disponible
+        if self.assigned_target is not None and kind != "exits" and self.assigned_target in candidates:
+            target = self.assigned_target
+            if not (self.planned_target == target and self.planned_path
+                    and self.planned_version == self.model.board.cost_version):
+                _, self.planned_path = self.nearest_path([target])
+                self.planned_target = target
+                self.planned_goals = None
+                self.planned_version = self.model.board.cost_version
+            return target
+
+        if fields is not None:
+            target = fields.nearest(kind, self.pos)
+            if target is not None:
+                return target
+        else:
+            goals = set(candidates)
+
+            # Con `path_reuse`, si los objetivos y los costos no cambiaron y el agente sigue el
+            # camino planeado, el objetivo planeado sigue siendo el más cercano
+            if (self.model.path_reuse and self.planned_path and self.planned_goals == goals
+                    and self.planned_version == self.model.board.cost_version):
+                return self.planned_target
+
+            if self.model.incremental_planning:
+                planner = self.planners.get(kind)
+                if planner is None:
+                    planner = self.planners[kind] = IncrementalPlanner(self.model)
+                target, path = planner.plan(self.pos, goals, self.search_budget)
+                self.spend_budget(planner.last_expanded, planner.exhausted)
+            else:
+                target, path = self.nearest_path(goals)
+
+            if target is not None:
+                self.planned_path = path
+                self.planned_target = target
+                self.planned_goals = goals
+                self.planned_version = self.model.board.cost_version
+                return target
+
+        # Sin camino: el candidato más cercano en línea recta (los retratos con el índice espacial)
+        if kind == "portraits":
+            return self.model.portraits.nearest(self.pos)
+        return min(candidates, key=lambda pos: self.manhattan_heuristic(self.pos, pos))
+
+    # Devuelve el camino hacia `target`, reutilizando el último camino planeado si
+    # es hacia el mismo objetivo, los costos del tablero no cambiaron desde que se planeó y el
+    # siguiente paso sigue siendo una celda vecina; si no, vuelve a planear con `dijkstra`
+    def planned_path_to(self, target):
+        board = self.model.board
+        path = self.planned_path
+
+        if not (path and self.planned_target == target
+                and self.planned_version == board.cost_version
+                and abs(path[0][0] - self.pos[0]) + abs(path[0][1] - self.pos[1]) == 1):
+            path = self.dijkstra(self.model.grid_details, self.pos, [target])
+            self.planned_target = target
+            self.planned_version = board.cost_version
+
+        # Con `path_reuse` se conserva lo que queda después del siguiente paso; si no, el
+        # siguiente movimiento vuelve a elegir su objetivo
+        self.planned_path = path[1:] if self.model.path_reuse else []
+        return path
 
     # Mueve al agente hacia un objetivo utilizando el algoritmo Dijkstra
-    def move_towards(self, target):
+    # Si se indica la clase del objetivo y el modelo tiene campos de distancia, el siguiente
+    # paso se lee del campo de esa clase en lugar de buscar el camino completo
+    def move_towards(self, target, kind=None):
         # Si ya está en el objetivo, no necesita moverse
         if self.pos == target:
             return True
         
-        # Calcula el camino más corto al objetivo
-        path = self.dijkstra(self.model.grid_details, self.pos, [target])
-        print(f"[DEBUG] Agente {self.unique_id} tiene el camino: {path}")
+        fields = self.model.distance_fields
+
+        if kind is not None and fields is not None and target != self.assigned_target:
+            # Siguiente paso del campo (sin camino, se queda en su posición como `dijkstra`)
+            next_step = fields.next_step(kind, self.pos)
+            path = [next_step or self.pos]
+        else:
+            # Camino planeado al elegir el objetivo (o uno nuevo si ya no es válido)
+            path = self.planned_path_to(target)
+        self.model.log.debug("[DEBUG] Agente %s tiene el camino: %s", self.unique_id, path)
         # Si no hay camino, devuelve False
 
         if not path:
-            print(f"[DEBUG] Agente {self.unique_id} no puede alcanzar el objetivo desde {self.pos}.")
+            self.model.log.debug("[DEBUG] Agente %s no puede alcanzar el objetivo desde %s.", self.unique_id, self.pos)
             return False
         
         # Obtiene el siguiente paso del camino
         next_step = path[0]
-        print(f"[DEBUG] Agente {self.unique_id} se mueve de {self.pos} a {next_step}.")
+        self.model.log.debug("[DEBUG] Agente %s se mueve de %s a %s.", self.unique_id, self.pos, next_step)
 
         # Registra el movimiento en el modelo
-        self.model.log_event({
-            "type": "agent_move",
-            "agent": self.unique_id,
-            "from": self.pos,
-            "to": next_step,
-        })
+        self.model.emit_event(EventStore.AGENT_MOVE, self.unique_id, self.pos, next_step, self.model.step_count)
 
         # Actualiza la posición del agente en la cuadrícula
-        self.model.grid.move_agent(self, next_step)
+        self.model.move_agent(self, next_step)
         # Actualiza la posición actual del agente
         self.pos = next_step
         # Registra la posición en el historial
@@ -267,21 +268,16 @@ class LuigiAgent(Agent):
             if portrait == "victim":
                 # El agente ahora lleva el retrato
                 self.carrying_portrait = True
-                # Elimina el retrato de la posición
-                self.model.portraits[position] = None
+                # Elimina el retrato de la posición (sin dejar una entrada vacía en el registro)
+                del self.model.portraits[position]
 
-                print(f"Agente {self.unique_id} ha encontrado una víctima en {position}.")
+                self.model.log.debug("Agente %s ha encontrado una víctima en %s.", self.unique_id, position)
 
                 # Registra la acción
-                self.action_history.append(f"Portrait found at: {position}, Type: Victim")
+                self.action_history.record(AgentHistory.PORTRAIT_VICTIM, position)
 
                 # Registra el evento en el modelo
-                self.model.log_event({
-                    "type": "found_portrait",
-                    "at": position,
-                    "agent": self.unique_id,
-                    "portrait_type": "victim",
-                })
+                self.model.emit_event(EventStore.FOUND_PORTRAIT, position, self.unique_id, "victim", self.model.step_count)
 
                 # Devuelve los datos del retrato
                 return {"position": position, "type": "victim"}
@@ -289,19 +285,14 @@ class LuigiAgent(Agent):
             # Si el retrato es una falsa alarma
             elif portrait == "false_alarm":
                 # Elimina el retrato de la posición
-                self.model.portraits[position] = None
+                del self.model.portraits[position]
 
-                print(f"Agente {self.unique_id} encontró una falsa alarma en {position}.")
+                self.model.log.debug("Agente %s encontró una falsa alarma en %s.", self.unique_id, position)
 
-                self.action_history.append(f"Portrait found at: {position}, Type: False")
+                self.action_history.record(AgentHistory.PORTRAIT_FALSE, position)
                 # Registra el evento en el modelo
 
-                self.model.log_event({
-                    "type": "found_portrait",
-                    "at": position,
-                    "agent": self.unique_id,
-                    "portrait_type": "False",
-                })
+                self.model.emit_event(EventStore.FOUND_PORTRAIT, position, self.unique_id, "False", self.model.step_count)
 
                 # Devuelve los datos del retrato
                 return {"position": position, "type": "false_alarm"}
@@ -313,7 +304,7 @@ class LuigiAgent(Agent):
     def extinguish_fire(self, position):
         # Verifica si el agente tiene al menos 2 puntos de acción
         if self.action_points >= 2:
-            print(f"[DEBUG] Agente: {self.unique_id} fuego apagado en {position}.")
+            self.model.log.debug("[DEBUG] Agente: %s fuego apagado en %s.", self.unique_id, position)
 
             # Marca la celda como libre de fuego
             self.model.grid_details[position] = 0
@@ -321,18 +312,14 @@ class LuigiAgent(Agent):
             self.action_points -= 2
 
             # Registra la acción en el historial
-            self.action_history.append(f"Fire extinguished at: {position}") 
+            self.action_history.record(AgentHistory.FIRE_EXTINGUISHED, position)
 
             # Registra el evento en el modelo
-            self.model.log_event({
-                    "type": "fire_extinguished",
-                    "agent": self.unique_id,
-                    "at": position,
-                })
+            self.model.emit_event(EventStore.FIRE_EXTINGUISHED, self.unique_id, position, self.model.step_count)
             
         # Si no tiene suficientes puntos de acción
         else:
-            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para apagar fuego en {position}.")
+            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para apagar fuego en %s.", self.unique_id, position)
 
     # Intenta reducir o eliminar el humo en una celda específica
     # `position` es la celda objetivo
@@ -340,7 +327,7 @@ class LuigiAgent(Agent):
     def extinguish_smoke(self, position, reducing):
         # Verifica si el agente tiene al menos 1 punto de acción.
         if self.action_points >= 1:
-            print(f"[DEBUG] Agente {self.unique_id} eliminó el humo en {position}.")
+            self.model.log.debug("[DEBUG] Agente %s eliminó el humo en %s.", self.unique_id, position)
             # Reduce el nivel de humo o fuego en la celda objetivo
             self.model.grid_details[position] -= 1
             # Resta 1 punto de acción al agente
@@ -348,26 +335,18 @@ class LuigiAgent(Agent):
 
             # Caso en el que se está eliminando humo completamente
             if reducing == False:
-                self.action_history.append(f"Smoke extinguished at: {position}")
+                self.action_history.record(AgentHistory.SMOKE_EXTINGUISHED, position)
 
-                self.model.log_event({
-                        "type": "fire_to_smoke",
-                        "agent": self.unique_id,
-                        "at": position,
-                    })
+                self.model.emit_event(EventStore.AGENT_FIRE_TO_SMOKE, self.unique_id, position, self.model.step_count)
                 
             # Caso en el que se está reduciendo fuego a humo
             else:
-                print(f"[DEBUG] Agente {self.unique_id} reduce el fuego a humo en {position}.")
-                self.model.log_event({
-                    "type": "smoke_extinguished",
-                    "agent": self.unique_id,
-                    "position": position,
-                })
+                self.model.log.debug("[DEBUG] Agente %s reduce el fuego a humo en %s.", self.unique_id, position)
+                self.model.emit_event(EventStore.SMOKE_EXTINGUISHED, self.unique_id, position, self.model.step_count)
 
         else:
             # Si no tiene puntos de acción suficientes
-            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para apagar humo en {position}.")
+            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para apagar humo en %s.", self.unique_id, position)
 
     # Mueve al agente dentro de la cuadrícula central
     def move_inside_central_grid(self):
@@ -398,20 +377,15 @@ class LuigiAgent(Agent):
         self.action_points -= 1
 
         # Actualiza la posición del agente en el modelo
-        self.model.grid.move_agent(self, next_step)
+        self.model.move_agent(self, next_step)
         # Actualiza la posición actual
         self.pos = next_step
 
         # Agrega la posición al historial
         self.history.append(self.pos)
 
-        print(f"[DEBUG] Agente {self.unique_id} se mueve dentro del cuadrante central en {self.pos}.")
-        self.model.log_event({
-            "type": "agent_move",
-            "from": self.pos,
-            "agent": self.unique_id,
-            "to": next_step,
-        })
+        self.model.log.debug("[DEBUG] Agente %s se mueve dentro del cuadrante central en %s.", self.unique_id, self.pos)
+        self.model.emit_event(EventStore.AGENT_MOVE, self.unique_id, self.pos, next_step, self.model.step_count)
 
     
     # Cierra una puerta entre dos celdas
@@ -423,8 +397,11 @@ class LuigiAgent(Agent):
 
             self.model.exit_positions[y1] = False
 
+            # Actualiza la puerta en la tabla de aristas
+            self.model.board.set_door(x1, y1, True, opened=False)
+
             # Registra la acción en el historial
-            self.action_history.append(f"close door:{x1}-{y1}")
+            self.action_history.record(AgentHistory.CLOSE_DOOR, x1, y1)
 
             # Resta 1 punto de acción por cerrar la puerta
             self.action_points -= 1
@@ -450,9 +427,9 @@ class LuigiAgent(Agent):
                 # Encuentra las salidas válidas en el modelo
                 valid_exits = [pos for pos in self.model.entrances if isinstance(pos, tuple) and len(pos) == 2]
                 if valid_exits:
-                    # Encuentra la salida más cercana utilizando la heurística de Manhattan
-                    nearest_exit = min(valid_exits, key=lambda pos: self.manhattan_heuristic(self.pos, pos))
-                    print(f"[DEBUG] Agente {self.unique_id} lleva retrato. Moviéndose hacia la salida más cercana: {nearest_exit}")
+                    # Encuentra la salida más cercana por costo real del camino
+                    nearest_exit = self.nearest_target("exits", valid_exits)
+                    self.model.log.debug("[DEBUG] Agente %s lleva retrato. Moviéndose hacia la salida más cercana: %s", self.unique_id, nearest_exit)
                     
                     # Revisa si hay fuego alrededor antes de moverse
                     if self.handle_fire_around():
@@ -462,66 +439,56 @@ class LuigiAgent(Agent):
                     if self.check_collision_walls(self.pos, nearest_exit):
                         # Si tiene suficientes puntos, rompe la pared
                         if self.action_points >= 2:
-                            print(f"[DEBUG] Agente {self.unique_id} encuentra una pared entre {self.pos} y {nearest_exit}. Rompiendo pared.")
+                            self.model.log.debug("[DEBUG] Agente %s encuentra una pared entre %s y %s. Rompiendo pared.", self.unique_id, self.pos, nearest_exit)
                             self.break_wall(self.pos, nearest_exit)
 
                         # Si no tiene suficientes puntos, termina el turno
                         else:
-                            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para romper la pared.")
+                            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para romper la pared.", self.unique_id)
                             break
 
                     # Verifica si hay una puerta cerrada bloqueando el camino
                     elif self.check_collision_doors(self.pos, nearest_exit):
                         # Si tiene suficientes puntos, abre la puerta
                         if self.action_points >= 1:
-                            print(f"[DEBUG] Agente {self.unique_id} encuentra una puerta cerrada entre {self.pos} y {nearest_exit}. Abriendo puerta.")
+                            self.model.log.debug("[DEBUG] Agente %s encuentra una puerta cerrada entre %s y %s. Abriendo puerta.", self.unique_id, self.pos, nearest_exit)
                             self.open_door(self.pos, nearest_exit)
-                            print("Logeando abrir puerta")
+                            self.model.log.debug("Logeando abrir puerta")
 
-                            self.model.log_event({
-                                "type": "open_door",
-                                "agent": self.unique_id,
-                                "position": self.pos,
-                                "target": nearest_exit,
-                            })
+                            self.model.emit_event(EventStore.OPEN_DOOR, self.unique_id, self.pos, nearest_exit, self.model.step_count)
 
                         # Si no tiene suficientes puntos, termina el turno
                         else:
-                            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para abrir la puerta.")
+                            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para abrir la puerta.", self.unique_id)
                             break
 
                     # Si llega a la salida
                     if self.pos == nearest_exit:
-                        print(f"[DEBUG] Agente {self.unique_id} ha llegado a la salida con el retrato.")
+                        self.model.log.debug("[DEBUG] Agente %s ha llegado a la salida con el retrato.", self.unique_id)
 
                         # Suelta el retrato en la salida
                         self.carrying_portrait = False
                         # Incrementa el contador de rescates
                         self.model.rescued += 1
 
-                        print(f"[DEBUG] Agente {self.unique_id} ha rescatado a una víctima. Total rescatados: {self.model.rescued}")
+                        self.model.log.debug("[DEBUG] Agente %s ha rescatado a una víctima. Total rescatados: %s", self.unique_id, self.model.rescued)
 
-                        self.model.log_event({
-                            "type": "rescued_portrait",
-                            "agent": self.unique_id,
-                            "position": nearest_exit,
-                            "rescued": self.model.rescued,
-                        })
+                        self.model.emit_event(EventStore.RESCUED_PORTRAIT, self.unique_id, nearest_exit, self.model.rescued, self.model.step_count)
 
                     # Si aún tiene suficientes puntos de acción, continúa moviéndose hacia la salida
                     if self.action_points >= 2:
-                        self.move_towards(nearest_exit)
+                        self.move_towards(nearest_exit, "exits")
 
                     # Si no tiene puntos suficientes, termina el turno
                     else:
-                        print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para moverse hacia {nearest_exit}.")
+                        self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para moverse hacia %s.", self.unique_id, nearest_exit)
                     
                     if self.action_points < 2:
                         break
 
                 # Si no hay salidas válidas, termina el turno
                 else:
-                    print(f"[ERROR] No hay salidas válidas para el agente {self.unique_id}. Terminando turno.")
+                    self.model.log.info("[ERROR] No hay salidas válidas para el agente %s. Terminando turno.", self.unique_id)
                     break 
             else:
                 # Si el agente no lleva un retrato
@@ -531,16 +498,13 @@ class LuigiAgent(Agent):
 
                 else:
                     # Si ya está en el área central, busca el retrato más cercano
-                    portraits = [
-                        pos for pos, label in self.model.portraits.items()
-                        if label in ["victim", "false_alarm"] and isinstance(pos, tuple) and len(pos) == 2
-                    ]
+                    portraits = self.model.portraits.live()
 
                     if portraits:
-                        # Encuentra el retrato más cercano utilizando la heurística de Manhattan
-                        nearest_portrait = min(portraits, key=lambda pos: self.manhattan_heuristic(self.pos, pos))
+                        # Encuentra el retrato más cercano por costo real del camino
+                        nearest_portrait = self.nearest_target("portraits", portraits)
                         
-                        print(f"[DEBUG] Agente {self.unique_id} buscando retrato. Moviéndose hacia el retrato más cercano: {nearest_portrait}")
+                        self.model.log.debug("[DEBUG] Agente %s buscando retrato. Moviéndose hacia el retrato más cercano: %s", self.unique_id, nearest_portrait)
                         
                         # Revisa si hay fuego cerca antes de moverse
                         if self.handle_fire_around():
@@ -550,35 +514,30 @@ class LuigiAgent(Agent):
                         if self.check_collision_walls(self.pos, nearest_portrait):
                             # Si tiene suficientes puntos, rompe la pared
                             if self.action_points >= 2:
-                                print(f"[DEBUG] Agente {self.unique_id} encuentra una pared entre {self.pos} y {nearest_portrait}. Rompiendo pared.")
+                                self.model.log.debug("[DEBUG] Agente %s encuentra una pared entre %s y %s. Rompiendo pared.", self.unique_id, self.pos, nearest_portrait)
                                 self.break_wall(self.pos, nearest_portrait)
                             # Si no tiene suficientes puntos, termina el turno
                             else:
-                                print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para romper la pared.")
+                                self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para romper la pared.", self.unique_id)
                                 break
 
                         # Verifica si hay una puerta cerrada bloqueando el camino
                         elif self.check_collision_doors(self.pos, nearest_portrait):
                             # Si tiene suficientes puntos, abre la puerta
                             if self.action_points >= 1:
-                                print(f"[DEBUG] Agente {self.unique_id} encuentra una puerta cerrada entre {self.pos} y {nearest_portrait}. Abriendo puerta.")
+                                self.model.log.debug("[DEBUG] Agente %s encuentra una puerta cerrada entre %s y %s. Abriendo puerta.", self.unique_id, self.pos, nearest_portrait)
                                 self.open_door(self.pos, nearest_portrait)
                                 
-                                print("Logeando abrir puerta")
-                                self.model.log_event({
-                                    "type": "open_door",
-                                    "agent": self.unique_id,
-                                    "position": self.pos,
-                                    "target": nearest_portrait,
-                                })
+                                self.model.log.debug("Logeando abrir puerta")
+                                self.model.emit_event(EventStore.OPEN_DOOR, self.unique_id, self.pos, nearest_portrait, self.model.step_count)
 
                             else:
                                 # Si no tiene suficientes puntos, termina el turno
-                                print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para abrir la puerta.")
+                                self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para abrir la puerta.", self.unique_id)
                                 break
                         
                         # Intenta moverse hacia el retrato
-                        if not self.move_towards(nearest_portrait):
+                        if not self.move_towards(nearest_portrait, "portraits"):
                             break
                         
                         # Si llega al retrato, lo examina
@@ -587,7 +546,7 @@ class LuigiAgent(Agent):
                                 continue
                     else:
                         # Si no hay más retratos, termina el turno
-                        print(f"[DEBUG] No hay más retratos para el agente {self.unique_id}. Terminando turno.")
+                        self.model.log.debug("[DEBUG] No hay más retratos para el agente %s. Terminando turno.", self.unique_id)
                         break
 
     # Estrategia del agente cuando su rol es "bombero"
@@ -608,12 +567,12 @@ class LuigiAgent(Agent):
 
             else:
                 # Obtiene las celdas donde hay fuego (valor 2) o humo (valor 1)
-                fire_cells = [pos for pos, value in self.model.grid_details.items() if value == 1 or value == 2]
+                fire_cells = self.model.board.burning_cells()
 
                 if fire_cells:
-                    # Encuentra el fuego o humo más cercano utilizando la heurística de Manhattan
-                    nearest_fire = min(fire_cells, key=lambda pos: self.manhattan_heuristic(self.pos, pos))
-                    print(f"[DEBUG] Agente {self.unique_id} buscando fuego. Moviéndose hacia el fuego más cercano: {nearest_fire}")
+                    # Encuentra el fuego o humo más cercano por costo real del camino
+                    nearest_fire = self.nearest_target("fires", fire_cells)
+                    self.model.log.debug("[DEBUG] Agente %s buscando fuego. Moviéndose hacia el fuego más cercano: %s", self.unique_id, nearest_fire)
 
                     # Marca la celda como visitada si aún no lo ha sido
                     if nearest_fire not in visited_positions:
@@ -626,42 +585,37 @@ class LuigiAgent(Agent):
                     # Si hay una pared entre la posición actual y el fuego más cercano, intenta romperla
                     if self.check_collision_walls(self.pos, nearest_fire):
                         if self.action_points >= 2:
-                            print(f"[DEBUG] Agente {self.unique_id} encuentra una pared entre {self.pos} y {nearest_fire}. Rompiendo pared.")
+                            self.model.log.debug("[DEBUG] Agente %s encuentra una pared entre %s y %s. Rompiendo pared.", self.unique_id, self.pos, nearest_fire)
                             self.break_wall(self.pos, nearest_fire)
 
                         else:
-                            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para romper la pared.")
+                            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para romper la pared.", self.unique_id)
                             break
 
                     # Si hay una puerta cerrada entre la posición actual y el fuego más cercano, intenta abrirla
                     elif self.check_collision_doors(self.pos, nearest_fire):
                         if self.action_points >= 1:
-                            print(f"[DEBUG] Agente {self.unique_id} encuentra una puerta cerrada entre {self.pos} y {nearest_fire}. Abriendo puerta.")
+                            self.model.log.debug("[DEBUG] Agente %s encuentra una puerta cerrada entre %s y %s. Abriendo puerta.", self.unique_id, self.pos, nearest_fire)
                             self.open_door(self.pos, nearest_fire)
                             
-                            self.model.log_event({
-                                "type": "open_door",
-                                "agent": self.unique_id,
-                                "position": self.pos,
-                                "target": nearest_fire,
-                            })
+                            self.model.emit_event(EventStore.OPEN_DOOR, self.unique_id, self.pos, nearest_fire, self.model.step_count)
 
                         else:
-                            print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para abrir la puerta.")
+                            self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para abrir la puerta.", self.unique_id)
                             break
 
                     # Verifica si tiene suficientes puntos de acción para extinguir fuego o humo
                     fire_value = self.model.grid_details[nearest_fire]
                     if fire_value == 2 and self.action_points < 2:
-                        print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para extinguir fuego.")
+                        self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para extinguir fuego.", self.unique_id)
                         break
 
                     elif fire_value == 1 and self.action_points < 1:
-                        print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para extinguir humo.")
+                        self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para extinguir humo.", self.unique_id)
                         break
                     
                      # Mueve al agente hacia el fuego más cercano; si no puede moverse, termina
-                    if not self.move_towards(nearest_fire):
+                    if not self.move_towards(nearest_fire, "fires"):
                         break
 
                     # Si el agente llega al fuego o humo, intenta extinguirlo
@@ -675,8 +629,8 @@ class LuigiAgent(Agent):
                                 # Reduce el fuego a humo si tiene pocos puntos
                                 reducing = True
                                 self.extinguish_smoke(nearest_fire, reducing)
-                                print(f"[DEBUG] Agente {self.unique_id} bajando fuego a humo . El fuego es : {nearest_fire}")
-                                self.action_history.append(f"Fire reduced to smoke at: {nearest_fire}")
+                                self.model.log.debug("[DEBUG] Agente %s bajando fuego a humo . El fuego es : %s", self.unique_id, nearest_fire)
+                                self.action_history.record(AgentHistory.FIRE_TO_SMOKE, nearest_fire)
 
                         elif fire_value == 1:
                             # Extingue el humo
@@ -686,13 +640,13 @@ class LuigiAgent(Agent):
 
                 else:
                     # Si no se encuentran más fuegos ni humos, termina
-                    print(f"[DEBUG] Agente {self.unique_id} no encuentra más fuego ni humo.")
+                    self.model.log.debug("[DEBUG] Agente %s no encuentra más fuego ni humo.", self.unique_id)
                     break
 
     # Verifica si hay fuego o humo en las celdas vecinas y los apaga si es posible
     def handle_fire_around(self):
-        # Obtiene las celdas vecinas usando la vecindad de Moore
-        neighbors = self.model.grid.get_neighborhood(self.pos, moore=False, include_center=False)
+        # Obtiene las celdas vecinas (vecindad de Von Neumann precalculada en la topología)
+        neighbors = self.model.topology.neighbors_of(self.pos)
         
         for neighbor in neighbors:
             if neighbor in self.model.grid_details:
@@ -707,7 +661,7 @@ class LuigiAgent(Agent):
                             self.break_wall(self.pos, neighbor)
 
                     else:
-                        print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para apagar fuego en {neighbor}. Puntos disponibles: {self.action_points}")
+                        self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para apagar fuego en %s. Puntos disponibles: %s", self.unique_id, neighbor, self.action_points)
                 
                 elif self.model.grid_details[neighbor] == 1:
                     # Si hay humo en una celda vecina y tiene suficientes puntos, lo apaga
@@ -718,10 +672,10 @@ class LuigiAgent(Agent):
                             return True
                         
                         else:
-                            print(f"[DEBUG] Agente {self.unique_id} no puede romper paredes para apagar humo en {neighbor}.")
+                            self.model.log.debug("[DEBUG] Agente %s no puede romper paredes para apagar humo en %s.", self.unique_id, neighbor)
 
                     else:
-                        print(f"[DEBUG] Agente {self.unique_id} no tiene suficientes puntos para apagar humo en {neighbor}. Puntos disponibles: {self.action_points}")
+                        self.model.log.debug("[DEBUG] Agente %s no tiene suficientes puntos para apagar humo en %s. Puntos disponibles: %s", self.unique_id, neighbor, self.action_points)
         # Retorna falso si no se logró apagar fuego o humo en las celdas vecinas
         return False
 
@@ -729,20 +683,13 @@ class LuigiAgent(Agent):
     # `origin` y `target` son las celdas adyacentes donde se rompe la pared
     # `direction_sn` y `direction_ns` son las direcciones relativas entre las celdas
     def update_grid_walls(self, origin, target, direction_sn, direction_ns):
-        # Obtiene las paredes de la celda de origen como lista
-        origin_wall = list(self.model.grid_walls[origin][0])
+        board = self.model.board
 
-        # Obtiene las paredes de la celda de destino como lista
-        target_wall = list(self.model.grid_walls[target][0])
         # Marca como rota la pared en la dirección `direction_sn` desde el origen
-        origin_wall[direction_sn]= "0"
+        board.set_wall(board.index(origin), direction_sn, False)
 
         # Marca como rota la pared en la dirección `direction_ns` desde el destino
-        target_wall[direction_ns]= "0"
-
-        # Convierte las listas de paredes actualizadas de nuevo a cadenas y actualiza el modelo
-        self.model.grid_walls[origin][0] = ''.join(origin_wall)
-        self.model.grid_walls[target][0] = ''.join(target_wall)
+        board.set_wall(board.index(target), direction_ns, False)
 
     # Rompe una pared entre dos celdas adyacentes.
     # `start` es la celda inicial y `next` la celda objetivo.
@@ -758,33 +705,31 @@ class LuigiAgent(Agent):
              # Actualiza las paredes en la cuadrícula
             self.update_grid_walls(start, next, direction_sn, direction_ns)
             # Registra la acción en el historial
-            self.action_history.append(f"break wall:{start}-{next}")
+            self.action_history.record(AgentHistory.BREAK_WALL, start, next)
             # Resta 2 puntos de acción por romper una pared
             self.action_points -= 2
             # Incrementa el contador de daños en el modelo
             self.model.damage_counter +=1
             
-            print(f"[DEBUG] Agente {self.unique_id} rompió la pared {next}.")
+            self.model.log.debug("[DEBUG] Agente %s rompió la pared %s.", self.unique_id, next)
             
-            # Registra el evento en el modelo
-            self.model.log_event({
-                "type": "wall_destroyed", # Define el tipo de evento como "wall_destroyed"
-                "agent": self.unique_id,  # Identifica al agente que realizó la acción mediante su ID único
-                "position": start,        # Registra la posición inicial desde donde se rompió la pared
-                "target": next,           # Registra la posición objetivo donde estaba la pared rota
-                "damage":self.model.damage_counter  # Registra el contador de daños
-            })
+            # Registra el evento en el modelo (agente, celda de origen, celda de la pared rota y
+            # contador de daños)
+            self.model.emit_event(EventStore.AGENT_WALL_DESTROYED, self.unique_id, start, next, self.model.damage_counter, self.model.step_count)
 
     # Define las acciones que realiza el agente en un turno
     def step(self):
-        print(f"\n[DEBUG] Agente {self.unique_id} ({self.role}) inicia su turno en posición {self.pos}. Energía inicial: {self.action_points}.")
+        self.model.log.debug("\n[DEBUG] Agente %s (%s) inicia su turno en posición %s. Energía inicial: %s.", self.unique_id, self.role, self.pos, self.action_points)
+
+        # Presupuesto de búsqueda del turno (celdas expandidas entre todas sus búsquedas)
+        self.search_budget = self.model.expansion_budget
 
         if self.role == "rescuer":        # Si el rol del agente es rescatista
             self.rescuer_strategy()       # Ejecuta la estrategia de rescatista
         elif self.role == "firefighter":  # Si el rol del agente es bombero
             self.firefighter_strategy()   # Ejecuta la estrategia de bombero
 
-        print(f"[DEBUG] Agente {self.unique_id} ({self.role}) termina su turno en posición {self.pos}. Energía restante: {self.action_points}.")
+        self.model.log.debug("[DEBUG] Agente %s (%s) termina su turno en posición %s. Energía restante: %s.", self.unique_id, self.role, self.pos, self.action_points)
 
         # Añade retratos al modelo (si corresponde)
         self.model.add_portraits()
@@ -800,7 +745,7 @@ class LuigiAgent(Agent):
     def toggle_point(self):
         # Cambia el estado del retrato
         self.carrying_portrait = not self.carrying_portrait
-        print(f"Agente {self.unique_id} ahora {'lleva un retrato' if self.carrying_portrait else 'no lleva un retrato'}.")
+        self.model.log.debug("Agente %s ahora %s.", self.unique_id, 'lleva un retrato' if self.carrying_portrait else 'no lleva un retrato')
 
     
     # Abre una puerta entre dos celdas
@@ -811,8 +756,11 @@ class LuigiAgent(Agent):
             self.model.exit_positions[x1] = True
             self.model.exit_positions[y1] = True
 
+            # Actualiza la puerta en la tabla de aristas
+            self.model.board.set_door(x1, y1, True, opened=True)
+
             # Registra la acción en el historial
-            self.action_history.append(f"open door:{x1}-{y1}")
+            self.action_history.record(AgentHistory.OPEN_DOOR, x1, y1)
 
             # Resta 1 punto de acción por abrir la puerta
             self.action_points -= 1
\ No newline at end of file
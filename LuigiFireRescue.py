@@ -1,5 +1,6 @@
 from MansionModel import MansionModel
 from LuigiAgentTest import LuigiAgent
+from BoardLoader import load_board  # Lector compartido de archivos de tablero
 
 # Librerías de visualización y gráficos
 import matplotlib.pyplot as plt  # Creación y personalización de gráficos
@@ -26,64 +27,11 @@ from queue import Queue
 
 DEVELOPMENT_MODE = False
 WAIT_TIME = 0.01
+# Nivel de registro del modelo: "silent", "info" o "debug"
+LOG_LEVEL = "debug"
 
 def procesar_txt(file_path):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    # Procesar paredes
-    WALLS = []
-    index = 0
-    for _ in range(6):  # 6 líneas de paredes
-        row = []
-        cells = lines[index].strip().split()
-        for cell in cells:
-            walls = [int(d) for d in cell]  # Cada celda se descompone en 4 dígitos
-            row.append(walls)
-        WALLS.append(row)
-        index += 1
-
-    # Procesar puntos de interés
-    FAKE_ALARMS = []
-    VICTIMS = []
-    for _ in range(3):  # Máximo 3 líneas para puntos de interés
-        r, c, marker_type = lines[index].strip().split()
-        if marker_type == 'f':  # Falsa alarma
-            FAKE_ALARMS.append((int(r), int(c)))
-        elif marker_type == 'v':  # Víctima
-            VICTIMS.append((int(r), int(c)))
-        index += 1
-
-    # Procesar marcadores de fuego
-    FIRES = []
-    for _ in range(10):  # 10 líneas de fuego
-        r, c = map(int, lines[index].strip().split())
-        FIRES.append((r, c))
-        index += 1
-
-    # Procesar marcadores de puertas
-    DOORS = {}
-    DOORS_CONNECTED = {}
-    for _ in range(8):  # 8 líneas de puertas
-        r1, c1, r2, c2 = map(int, lines[index].strip().split())
-        
-        # Reorganizar las coordenadas al formato (c1, r1, c2, r2)
-        c1, r1, c2, r2 = c1, r1, c2, r2
-        
-        # Almacenar las puertas con el formato reorganizado
-        DOORS[(c1, r1, c2, r2)] = (c1, r1, c2, r2)
-        DOORS_CONNECTED[(c1, r1)] = (c2, r2)
-        DOORS_CONNECTED[(c2, r2)] = (c1, r1)
-        index += 1
-        
-    # Procesar puntos de entrada
-    ENTRANCES = []
-    for _ in range(4):  # 4 líneas de puntos de entrada
-        r, c = map(int, lines[index].strip().split())
-        ENTRANCES.append((r, c))
-        index += 1
-
-    return WALLS, FAKE_ALARMS, VICTIMS, FIRES, DOORS, DOORS_CONNECTED, ENTRANCES
+    return load_board(file_path).as_tuple()
 
 # Ruta del archivo
 file_path = './final.txt'
@@ -103,9 +51,11 @@ print("\nPuertas:", DOORS)
 print("\nPuertas conectadas:", DOORS_CONNECTED)
 print("\nEntradas:", ENTRANCES)
 
-# PARÁMETROS
-WIDTH = 9
-HEIGHT = 7
+# PARÁMETROS (dimensiones y reglas tomadas del archivo del tablero)
+BOARD = load_board(file_path)
+RULES = BOARD.rules
+WIDTH = BOARD.width - 1
+HEIGHT = BOARD.height - 1
 LUIGIS = 6
 
 WALLS, FAKE_ALARMS, PORTRAITS, GHOSTS, DOORS, DOORS_CONNECTED, ENTRANCES = procesar_txt(file_path)
@@ -130,7 +80,8 @@ for sim in range(NUM_SIMULACIONES):
     
     model = MansionModel(LUIGIS, FAKE_ALARMS, 
                          PORTRAITS, WALLS, DOORS, 
-                         GHOSTS, ENTRANCES, DEVELOPMENT_MODE, SEED)
+                         GHOSTS, ENTRANCES, DEVELOPMENT_MODE, SEED,
+                         rules=RULES, log_level=LOG_LEVEL)
     time.sleep(WAIT_TIME) if DEVELOPMENT_MODE else None
     
     steps = 0
@@ -171,13 +122,13 @@ for sim in range(NUM_SIMULACIONES):
     print(f"Damage: {model.damage_counter}")
     print(f"Deaths: {model.casualties}")
     print(f"Saved Victims: {model.rescued}")
-    if model.damage_counter >= 24:
+    if model.damage_counter >= RULES["damage_limit"]:
         print("MANSION TAKEN OVER")
         print("GAME OVER")
-    elif model.losses >= 4:
-        print("4 DEATHS")
+    elif model.losses >= RULES["casualty_limit"]:
+        print(f"{RULES['casualty_limit']} DEATHS")
         print("GAME OVER")
-    elif model.rescued >= 7:
+    elif model.rescued >= RULES["rescue_goal"]:
         print("VICTORY!!!!")
 
 # Mostrar un resumen de los resultados de todas las simulaciones
@@ -1,10 +1,22 @@
 from mesa import Model  # Define los agentes y el modelo base de la simulación
 from mesa.space import MultiGrid  # Permite colocar los agentes en una cuadrícula (multi o individual)
 from mesa.time import BaseScheduler
-from mesa.datacollection import DataCollector  # Recolecta y organiza datos de la simulación para análisis
 from LuigiAgentTest import LuigiAgent
+from BoardState import BoardState, EDGE_WALL, EDGE_BLOCKED  # Estado del tablero y tabla de aristas
+from BoardTopology import BoardTopology  # Topología estática compartida entre modelos
+from BoardLoader import DEFAULT_RULES  # Reglas del juego por defecto
+from SimulationLogger import SimulationLogger  # Registro de diagnóstico con niveles
+from DistanceFields import DistanceFields  # Campos de distancia hacia los objetivos de los agentes
+from PathSearch import SearchBuffers  # Arreglos reutilizables de las búsquedas de caminos
+from TaskAssignment import greedy_assignment  # Emparejamiento global de agentes con objetivos
+from StepRecorder import StepRecorder  # Registro por turno en arreglos tipados
+from AgentHistory import HISTORY_LIMIT  # Límite por defecto de los historiales de los agentes
+import EventStore  # Registro compacto de eventos y formas de los eventos
+from Timeline import Timeline  # Cuadros clave y diferencias por turno para saltar a cualquier turno
 
 # Librerías matemáticas y generación de aleatoriedad
+from collections import deque  # Cola de saltos pendientes de las explosiones
+import heapq  # Colas de prioridad para recorrer el frente de celdas cambiadas en orden
 import itertools  # Proporciona herramientas para crear combinaciones y permutaciones
 import random  # Permite generar números y secuencias aleatorias, útil para la variabilidad en simulaciones
 import math  # Contiene funciones matemáticas básicas, como operaciones trigonométricas y logarítmicas
@@ -12,11 +24,18 @@ import math  # Contiene funciones matemáticas básicas, como operaciones trigon
 class MansionModel(Model):
     def __init__(self, luigis, fake_alarms,
                  victims, walls, doors, boo, 
-                 entrances, mode, seed):
+                 entrances, mode, seed, topology=None, vectorized_flashover=False,
+                 rules=None, log_level="debug", distance_fields=False,
+                 path_reuse=False, incremental_planning=False, task_assignment=False,
+                 expansion_budget=None, record_every=1, history_limit=HISTORY_LIMIT,
+                 history_spill=None, keyframe_interval=None, run_id=None):
         # Inicializar la clase base Model sin argumentos adicionales
         super().__init__()
+
+        # Registro de diagnóstico con niveles ("silent", "info" o "debug")
+        self.log = SimulationLogger(log_level)
         
-        print(f"Corriendo con semilla: {seed}")
+        self.log.info("Corriendo con semilla: %s", seed)
 
         # Variables iniciales del modelo
 
@@ -46,32 +65,70 @@ class MansionModel(Model):
         self.wall_config       = walls
         # Modo de la simulación
         self.mode              = mode
-        # Lista para almacenar eventos del modelo
-        self.model_events = []
-
-        # Configuración del recolector de datos
-        self.datacollector = DataCollector(
-            model_reporters={
-                "Grid": "get_grid",             # Información del grid actual
-                "Walls": "get_walls",           # Configuración de muros
-                "Steps": "step_count",          # Contador de pasos
-                "Doors": "doors",               # Puertas del grid
-                "Damage": "damage_counter",     # Daño acumulado
-                "Status": "simulation_status",  # Estado de la simulación
-                "Portraits": "portraits",       # Información de retratos
-                "Rescued": "rescued",           # Número de retratos rescatados
-                "Losses": "losses"              # Número de pérdidas
-            },
-            agent_reporters={
-                "Agent_ID": lambda agent: agent.unique_id,
-                "Role": lambda agent: agent.role,
-                "Position": lambda agent: (agent.pos[0], agent.pos[1]),
-                "Agent History": lambda agent: getattr(agent, 'history', [])
-            }
-        )
-
-        # Configuración inicial de retratos
-        self.portraits = {}
+        # Reglas del juego (límites de retratos y umbrales de victoria/derrota)
+        self.rules             = dict(DEFAULT_RULES)
+        if rules:
+            self.rules.update(rules)
+        # Registro de eventos del modelo (ver `model_events` para la lista de diccionarios)
+        self.events = EventStore.EventStore()
+        # Retratos en llamas que quedaron pendientes para la siguiente fase de flashover
+        self.pending_portraits = set()
+        # Estadísticas de cada explosión (saltos y muros dañados)
+        self.explosion_stats = []
+        # Calcular la conversión de humo en fuego con el kernel vectorizado del tablero
+        self.vectorized_flashover = vectorized_flashover
+        # Campos de distancia compartidos por los agentes (None: cada agente busca su camino)
+        self.distance_fields = DistanceFields(self) if distance_fields else None
+        # Los agentes conservan el resto de su camino mientras no cambien los costos del tablero
+        self.path_reuse = path_reuse
+        # Los agentes eligen su objetivo con un planificador incremental propio por clase de
+        # objetivo que se repara con la bitácora de cambios del tablero
+        self.incremental_planning = incremental_planning
+        # Al inicio de cada turno se asignan retratos a los rescatistas y fuegos a los bomberos
+        # con un emparejamiento global en lugar de que cada uno elija el más cercano
+        self.task_assignment = task_assignment
+        # Máximo de celdas que cada agente puede expandir en sus búsquedas durante su turno
+        # (None: sin límite); al agotarse las búsquedas devuelven su mejor plan parcial. Cubre
+        # A*, el objetivo más cercano y el planificador incremental; la búsqueda de cada agente en
+        # la asignación de tareas tiene su propio límite igual, y los campos de distancia (compartidos
+        # por todos los agentes) no tienen límite
+        self.expansion_budget = expansion_budget
+        # Entradas que conserva cada historial de agente (None: sin límite) y directorio al
+        # que se vuelcan las entradas descartadas (None: se descartan)
+        self.history_limit = history_limit
+        self.history_spill = history_spill
+        # Identificador de la partida, prefijo de sus archivos de volcado para que partidas con
+        # otra semilla o identificador no escriban en los mismos archivos
+        self.run_id = run_id if run_id is not None else f"seed-{seed}"
+        # Búsquedas cortadas por falta de presupuesto (total y en el turno actual)
+        self.budget_hits = 0
+        self.turn_budget_hits = 0
+
+        # Generador aleatorio propio de la simulación, sembrado con `seed` (las bifurcaciones
+        # copian su estado, así que no avanzan la secuencia de este modelo)
+        self.rng = random.Random(seed)
+
+        # Dimensiones del grid: área central de los muros más el borde exterior
+        self.grid_width = len(walls[0]) + 2
+        self.grid_height = len(walls) + 2
+
+        # Topología estática del tablero (se compila una vez por distribución y se comparte)
+        if topology is None:
+            topology = BoardTopology.from_layout(
+                walls, doors, entrances, self.grid_width, self.grid_height
+            )
+        self.topology = topology
+
+        # Estado del tablero en arreglos contiguos (fuego, muros, daños, retratos, ocupación)
+        # Las máscaras iniciales de muros y puertas se copian de la topología
+        self.board = BoardState(self.grid_width, self.grid_height, self.topology)
+        # Arreglos de trabajo reutilizables de las búsquedas de caminos de los agentes
+        self.search_buffers = SearchBuffers(self.board.size)
+        # Registro por turno (uno de cada `record_every` turnos; 0 lo deshabilita)
+        self.recorder = StepRecorder(self.board, record_every)
+
+        # Configuración inicial de retratos (vista tipo diccionario sobre el arreglo de retratos)
+        self.portraits = self.board.portraits
 
         for (row, col) in fake_alarms:
             # Configurar alarmas falsas en el grid
@@ -82,31 +139,29 @@ class MansionModel(Model):
             self.portraits[(int(col), int(row))] = "victim"
 
         # Imprimir información inicial de retratos
-        print("[INFO] Coordenadas iniciales de retratos:")
-
-        for coord, portrait_type in self.portraits.items():
-            print(f"  - {coord}: {portrait_type}")
+        if self.log.debug_enabled:
+            self.log.debug("[INFO] Coordenadas iniciales de retratos:")
 
-        # Dimensiones del grid
-        self.grid_width = 10
-        self.grid_height = 8
+            for coord, portrait_type in self.portraits.items():
+                self.log.debug("  - %s: %s", coord, portrait_type)
 
         # Configuración de puertas y entradas
         self.exit_positions = doors
-        self.entrances = [(int(col), int(row)) for row, col in entrances]
+        self.entrances = list(self.topology.entrances)
 
         # Imprimir información inicial de puertas y entradas
-        print("[INFO] Coordenadas iniciales de entradas:")
-        for entrance in self.entrances:
-            print(f"  - {entrance}")
+        if self.log.debug_enabled:
+            self.log.debug("[INFO] Coordenadas iniciales de entradas:")
+            for entrance in self.entrances:
+                self.log.debug("  - %s", entrance)
 
-        print("[INFO] Coordenadas iniciales de puertas:")
-        for door in self.exit_positions:
-            print(f"  - {door}")
+            self.log.debug("[INFO] Coordenadas iniciales de puertas:")
+            for door in self.exit_positions:
+                self.log.debug("  - %s", door)
 
         # Definir función para imprimir todas las coordenadas del grid
         def print_grid_coordinates(grid_width, grid_height):
-            print("\n--- Coordenadas del Grid ---")
+            self.log.debug("\n--- Coordenadas del Grid ---")
 
             for y in range(grid_height):
                 row = ""
@@ -115,75 +170,44 @@ class MansionModel(Model):
                     # Ajustar el ancho de cada celda para alinear
                     row += f"({x},{y})".ljust(10)
 
-                print(row)
-            print("\n")
+                self.log.debug(row)
+            self.log.debug("\n")
 
         # Crear el espacio y los detalles del grid
         self.grid = MultiGrid(self.grid_width, self.grid_height, torus=False)
         
-        # Inicializar celdas con valor 0
-        self.grid_details = {(x, y): 0 for y in range(self.grid_height) for x in range(self.grid_width)}
+        # Vista tipo diccionario sobre el arreglo de fuego (todas las celdas inician en 0)
+        self.grid_details = self.board.details
         
         # Contador de daño acumulado
         self.damage_counter = 0
 
         # Imprimir las coordenadas del grid
-        print_grid_coordinates(self.grid_width, self.grid_height)
-
-      # Inicializar el grid de muros respetando el rango válido
-        self.grid_walls = {
-            # Cada celda tiene una configuración de muro inicial
-            (x, y): ["0000", "0000"]
-            for y in range(1, self.grid_height)
-            for x in range(1, self.grid_width)
-        }
+        if self.log.debug_enabled:
+            print_grid_coordinates(self.grid_width, self.grid_height)
 
-        # Configurar los muros desde self.wall_config
-        for y, row in enumerate(self.wall_config, start=1):  # Inicia en 1 para mapear a la grid
-            
-            for x, walls in enumerate(row, start=1):  # Inicia en 1 para mapear a la grid
-                # Asegurarse de que la celda está dentro del rango válido
-                
-                if (x, y) in self.grid_walls:
-                    # Convertir la lista de valores en string, si es necesario
-                    wall_value = ''.join(map(str, walls))
-                    self.grid_walls[(x, y)][0] = wall_value  # Asignar el valor a la celda
+        # Vista tipo diccionario sobre los arreglos de muros y daños
+        # Los muros de self.wall_config y las puertas ya vienen cargados desde la topología
+        self.grid_walls = self.board.walls_view
 
         # Imprimir la configuración final de los muros para verificación
-        print("[INFO] Configuración inicial de muros:")
-        for coord, walls in sorted(self.grid_walls.items()):  # Ordenar por coordenadas
-            print(f"  - Coordenada {coord}: {walls[0]}")
+        if self.log.debug_enabled:
+            self.log.debug("[INFO] Configuración inicial de muros:")
+            for coord, walls in sorted(self.grid_walls.items()):  # Ordenar por coordenadas
+                self.log.debug("  - Coordenada %s: %s", coord, walls[0])
 
         # Configurar zonas de fantasmas
         for position in self.boo_zones:
             self.grid_details[position] = 2
         
         # Imprimir información inicial de zonas de fantasmas
-        print("[INFO] Coordenadas iniciales de zonas de fantasmas:")
-        for boo_zone in self.boo_zones:
-            print(f"  - {boo_zone}")
-
-        # Definir función para ajustar posiciones fuera del grid
-        def adjust_position_outside_grid(x, y, grid_width, grid_height):
-            if y == 1:  # Borde superior
-                return (x, 0)
-            
-            elif x == 1:  # Borde izquierdo
-                return (0, y)
-            
-            elif x == grid_width - 2:  # Borde derecho
-                return (grid_width - 1, y)
-            
-            elif y == grid_height - 2:  # Borde inferior
-                return (x, grid_height - 1)
-            
-            return (x, y)  # Si no está en un borde, no se ajusta (esto no debería ocurrir)
+        if self.log.debug_enabled:
+            self.log.debug("[INFO] Coordenadas iniciales de zonas de fantasmas:")
+            for boo_zone in self.boo_zones:
+                self.log.debug("  - %s", boo_zone)
 
-        # Ajuste de las posiciones de las entradas fuera del grid
-        adjusted_positions = [
-            adjust_position_outside_grid(x, y, self.grid_width, self.grid_height) 
-            for x, y in self.entrances
-        ]
+        # Posiciones de las entradas proyectadas fuera del grid (precalculadas en la topología)
+        adjusted_positions = list(self.topology.entrance_positions)
 
         # Crear un ciclo de roles alternados
         agent_roles = itertools.cycle(["rescuer", "firefighter"])
@@ -203,11 +227,11 @@ class MansionModel(Model):
             agent.unique_id = idx
 
 
-            self.grid.place_agent(agent, position)
+            self.place_agent(agent, position)
             self.schedule.add(agent)
 
 
-            print(f"Agente {idx} con rol {role} colocado en posición {position}")
+            self.log.debug("Agente %s con rol %s colocado en posición %s", idx, role, position)
             total_agents -= 1
             idx += 1  # Incrementar el índice de agente
 
@@ -221,10 +245,10 @@ class MansionModel(Model):
             agent = LuigiAgent(idx, self, role, next_position)
             agent.unique_id = idx
 
-            self.grid.place_agent(agent, next_position)
+            self.place_agent(agent, next_position)
             self.schedule.add(agent)
 
-            print(f"Agente {idx} con rol {role} colocado en posición {next_position}")
+            self.log.debug("Agente %s con rol %s colocado en posición %s", idx, role, next_position)
             total_agents -= 1
             idx += 1  # Incrementar el índice de agente
 
@@ -237,41 +261,147 @@ class MansionModel(Model):
                 agent = LuigiAgent(idx, self, role, position)
                 agent.unique_id = idx
 
-                self.grid.place_agent(agent, position)
+                self.place_agent(agent, position)
                 self.schedule.add(agent)
 
-                print(f"Agente {idx} con rol {role} colocado en posición {position}")
+                self.log.debug("Agente %s con rol %s colocado en posición %s", idx, role, position)
                 idx += 1
 
+        # Línea de tiempo con un cuadro clave cada `keyframe_interval` turnos (None: sin línea
+        # de tiempo); el estado inicial es el registro del turno 0
+        self.timeline = Timeline(self, keyframe_interval) if keyframe_interval else None
+
+
+    # Coloca un agente en la cuadrícula y lo registra en el índice de ocupación
+    def place_agent(self, agent, position):
+        self.grid.place_agent(agent, position)
+        self.board.add_occupant(self.board.index(position), agent)
+
+    # Mueve un agente en la cuadrícula y actualiza el índice de ocupación
+    def move_agent(self, agent, position):
+        self.board.remove_occupant(self.board.index(agent.pos), agent)
+        self.grid.move_agent(agent, position)
+        self.board.add_occupant(self.board.index(position), agent)
+
+    # Crea una bifurcación barata del modelo para evaluar alternativas desde el estado actual
+    # Copia solo el estado mutable del juego (tablero, retratos, contadores, agentes y estado
+    # del generador aleatorio) y comparte la topología; no copia la cuadrícula de mesa, el
+    # planificador, el registro por turno ni los historiales (la bifurcación inicia sin eventos)
+    def fork(self):
+        # Pasar la semilla evita que mesa consuma el generador global al crear el modelo
+        clone = MansionModel.__new__(MansionModel, seed=self._seed)
+        Model.__init__(clone)
+        clone.random.setstate(self.random.getstate())
+        clone._steps = self._steps
+
+        # Generador propio que continúa la misma secuencia que este modelo
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+
+        clone.log = self.log
+        clone.step_count = self.step_count
+        clone.rescued = self.rescued
+        clone.losses = self.losses
+        clone.casualties = self.casualties
+        clone.damage_counter = self.damage_counter
+        clone.simulation_status = self.simulation_status
+        clone.simulation_end = self.simulation_end
+
+        clone.boo_zones = list(self.boo_zones)
+        clone.wall_config = self.wall_config
+        clone.mode = self.mode
+        clone.rules = self.rules
+        clone.events = EventStore.EventStore()
+        clone.pending_portraits = set(self.pending_portraits)
+        clone.explosion_stats = []
+        clone.vectorized_flashover = self.vectorized_flashover
+        clone.distance_fields = DistanceFields(clone) if self.distance_fields else None
+        clone.path_reuse = self.path_reuse
+        clone.incremental_planning = self.incremental_planning
+        clone.task_assignment = self.task_assignment
+        clone.expansion_budget = self.expansion_budget
+        clone.history_limit = self.history_limit
+        # Las bifurcaciones no vuelcan sus historiales (no deben escribir en los archivos del modelo)
+        clone.history_spill = None
+        clone.run_id = self.run_id
+        clone.budget_hits = self.budget_hits
+        clone.turn_budget_hits = self.turn_budget_hits
+
+        # Tablero: topología compartida y copia de los arreglos mutables
+        clone.grid_width = self.grid_width
+        clone.grid_height = self.grid_height
+        clone.topology = self.topology
+        clone.board = self.board.copy()
+        clone.search_buffers = SearchBuffers(clone.board.size)
+        clone.recorder = StepRecorder(clone.board, self.recorder.every)
+        clone.portraits = clone.board.portraits
+        clone.grid_details = clone.board.details
+        clone.grid_walls = clone.board.walls_view
+        clone.exit_positions = dict(self.exit_positions)
+        clone.entrances = list(self.entrances)
+
+        # Agentes en el mismo orden del planificador y de cada celda de la cuadrícula
+        clone.schedule = BaseScheduler(clone)
+        clone.grid = MultiGrid(self.grid_width, self.grid_height, torus=False)
+        agents = {}
+
+        for agent in self.schedule.agents:
+            agents[agent.unique_id] = agent.fork(clone)
+            clone.schedule.add(agents[agent.unique_id])
+
+        for idx, occupants in self.board.occupants.items():
+            for agent in occupants:
+                clone.place_agent(agents[agent.unique_id], self.board.position(idx))
+
+        # Colocar a los agentes no debe contar como cambio del tablero
+        clone.board.changed = set(self.board.changed)
 
+        # La línea de tiempo de la bifurcación inicia en su turno actual
+        clone.timeline = Timeline(clone, self.timeline.interval) if self.timeline is not None else None
 
-    # Agrega un evento al registro del modelo
+        return clone
+
+    # Cierra los archivos de volcado de los historiales de los agentes (llamar al terminar la
+    # partida cuando se usa `history_spill`)
+    def close(self):
+        for agent in self.schedule.agents:
+            agent.close()
+
+    # Agrega un evento en forma de diccionario al registro del modelo
     def log_event(self, event):
-        self.model_events.append(event)
+        self.events.append_dict(event)
+
+    # Agrega un evento de la forma `shape` (ver EventStore) con sus valores en el orden de sus
+    # campos, sin armar el diccionario
+    def emit_event(self, shape, *values):
+        self.events.append(shape, *values)
+
+    # Eventos registrados como lista de diccionarios ({"type": ..., campo: valor}), en orden
+    @property
+    def model_events(self):
+        return self.events.as_dicts()
 
     # Agrega retratos alternando entre víctimas y falsas alarmas hasta completar el total deseado
     def add_portraits(self):
-        # Contar el número total de víctimas y falsas alarmas ya presentes en el grid
-        total_victims = sum(1 for portrait in self.portraits.values() if portrait == "victim")
-        total_false_alarms = sum(1 for portrait in self.portraits.values() if portrait == "false_alarm")
+        # Número de víctimas y falsas alarmas ya presentes en el grid (cuentas del registro)
+        total_victims = self.portraits.counts["victim"]
+        total_false_alarms = self.portraits.counts["false_alarm"]
 
         # Definir límites máximos de víctimas y falsas alarmas
-        max_victims = 10
-        max_false_alarms = 5
+        max_victims = self.rules["max_victims"]
+        max_false_alarms = self.rules["max_false_alarms"]
 
         # Calcular puntos activos y los necesarios para alcanzar el objetivo
         active_points = total_victims + total_false_alarms
-        needed_points = 3 - active_points
+        needed_points = self.rules["active_portraits"] - active_points
 
         # Bandera para rastrear si se eliminó fuego o humo
         reduced = False
         # Contador de nuevos retratos agregados
         new_points = 0
 
-        # Definir el área central del grid donde se colocarán los retratos
-        central_area = [
-            (x, y) for x in range(1, 9) for y in range(1, 7)
-        ]
+        # Área central del grid donde se colocarán los retratos
+        central_area = self.topology.interior_cells
 
         # Determinar el próximo tipo de retrato a agregar, alternando entre víctimas y falsas alarmas
         next_type = "victim" if total_victims <= total_false_alarms else "false_alarm"
@@ -283,7 +413,7 @@ class MansionModel(Model):
                 break  # No agregar más si ambos tipos han alcanzado su límite
             
             # Elegir una posición candidata al azar dentro del área central
-            candidate_point = random.choice(central_area)
+            candidate_point = self.rng.choice(central_area)
             if candidate_point not in self.portraits:
                 # Si hay humo o fuego en la posición, eliminarlo antes de colocar un retrato
                 
@@ -292,7 +422,7 @@ class MansionModel(Model):
                     self.grid_details[candidate_point] = 0  # Eliminar humo/fuego
                     reduced = True
                     
-                    print(f"[DEBUG] El fuego/humo en {candidate_point} fue removido para poner un retrato.")
+                    self.log.debug("[DEBUG] El fuego/humo en %s fue removido para poner un retrato.", candidate_point)
 
                 # Agregar el retrato del tipo correspondiente
                 if next_type == "victim" and total_victims < max_victims:
@@ -310,14 +440,9 @@ class MansionModel(Model):
                 self.grid_details[candidate_point] = 0
                 new_points += 1
                 
-                print(f"[INFO] Nuevo retrato agregado en {candidate_point}: {self.portraits[candidate_point]}")
+                self.log.info("[INFO] Nuevo retrato agregado en %s: %s", candidate_point, self.portraits[candidate_point])
                 
-                self.log_event({
-                    "type": "portrait_added",
-                    "position": candidate_point,
-                    "portrait_type": self.portraits[candidate_point],
-                    "step": self.step_count
-                })
+                self.emit_event(EventStore.PORTRAIT_ADDED, candidate_point, self.portraits[candidate_point], self.step_count)
 
                 # Alternar el tipo de retrato para el próximo ciclo
                 next_type = "victim" if next_type == "false_alarm" else "false_alarm"
@@ -325,56 +450,39 @@ class MansionModel(Model):
         # Registrar un evento si se eliminó fuego o humo para agregar un retrato
         if reduced:
             
-            self.log_event({
-                "type": "fire_removed_to_portrait",
-                "position": candidate_point,
-                "portrait_type": self.portraits[candidate_point],
-                "step": self.step_count
-            })
+            self.emit_event(EventStore.FIRE_REMOVED_TO_PORTRAIT, candidate_point, self.portraits[candidate_point], self.step_count)
 
     # Extiende la presencia de fantasmas únicamente dentro del área central del grid
     def spread_boos(self):
-        # Definir el área central del grid
-        central_area = [
-            (x, y) for x in range(1, 9) for y in range(1, 7)
-        ]
+        # Área central del grid (conjunto precalculado en la topología)
+        central_area = self.topology.interior
 
-        # Filtrar posiciones afectadas dentro del área central
-        affected_positions = [
-            pos for pos in central_area if self.grid_details.get(pos) in (0, 1, 2)
-        ]
+        # Filtrar posiciones afectadas dentro del área central (mismo orden que `central_area`)
+        affected_positions = self.board.interior_cells()
         
         if affected_positions:
             # Elegir una posición aleatoria dentro de las posiciones afectadas
-            target_pos = random.choice(affected_positions)
+            target_pos = self.rng.choice(affected_positions)
             
             # Si la posición está vacía, agregar humo
             if self.grid_details[target_pos] == 0:
                 self.grid_details[target_pos] = 1
                 
-                print(f"[INFO] Nuevo humo agregado en {target_pos}")
+                self.log.info("[INFO] Nuevo humo agregado en %s", target_pos)
                 
-                self.log_event({
-                    "type": "smoke_added",
-                    "position": target_pos,
-                    "step": self.step_count
-                })
+                self.emit_event(EventStore.SMOKE_ADDED, target_pos, self.step_count)
             
             # Si hay humo, convertirlo en fuego
             elif self.grid_details[target_pos] == 1:
                 self.grid_details[target_pos] = 2
                 
-                print(f"[INFO] Nuevo fuego agregado en {target_pos}")
+                self.log.info("[INFO] Nuevo fuego agregado en %s", target_pos)
                 
-                self.log_event({
-                    "type": "smoke_to_fire",
-                    "position": target_pos,
-                    "step": self.step_count
-                })
+                self.emit_event(EventStore.SMOKE_TO_FIRE, target_pos, self.step_count)
 
             # Si hay fuego, extenderlo a vecinos
             elif self.grid_details[target_pos] == 2:
-                neighbors = self.grid.get_neighborhood(target_pos, moore=False, include_center=False)
+                neighbors = self.topology.neighbors_of(target_pos)
                 
                 for neighbor in neighbors:
                     if neighbor in central_area:
@@ -390,22 +498,13 @@ class MansionModel(Model):
                                 # Extender el fuego al vecino
                                 if self.grid_details.get(neighbor) == 0:
                                     
-                                    print(f"[INFO] Nuevo fuego extendido de {target_pos} a {neighbor}")
+                                    self.log.info("[INFO] Nuevo fuego extendido de %s a %s", target_pos, neighbor)
                                     
-                                    self.log_event({
-                                        "type": "fire_extended",
-                                        "from": target_pos,
-                                        "to": neighbor,
-                                        "step": self.step_count
-                                    })
+                                    self.emit_event(EventStore.FIRE_EXTENDED, target_pos, neighbor, self.step_count)
                                 
                                 if self.grid_details.get(neighbor) == 1:
                                     
-                                    self.log_event({
-                                    "type": "smoke_to_fire",
-                                    "position": target_pos,
-                                    "step": self.step_count
-                                })
+                                    self.emit_event(EventStore.SMOKE_TO_FIRE, target_pos, self.step_count)
                                     
                                 self.grid_details[neighbor] = 2
                                 self.boo_zones.append(neighbor)
@@ -427,8 +526,13 @@ class MansionModel(Model):
                         else:
                             pass
 
-    # Registra daño en muros o puertas entre dos celdas del grid                      
+    # Registra daño en muros o puertas entre dos celdas del grid
+    # Los muros y daños son máscaras de 4 bits por celda (bit d = dirección d):
+    # - 0: Norte, 1: Oeste, 2: Sur, 3: Este
+    # Un bit de muro en 1 indica muro presente; un bit de daño en 1 indica muro dañado
     def register_damage_walls_doors(self, origin, target):
+        board = self.board
+
         # Si ambas posiciones son puertas y están cerradas (False en self.exit_positions)
         if origin in self.exit_positions and target in self.exit_positions:
             
@@ -440,15 +544,6 @@ class MansionModel(Model):
 
                 del self.exit_positions[target]
                 
-                
-                # Obtener las configuraciones de muros de ambas posiciones
-                # Muro de origen
-                origin_wall = list(self.grid_walls[origin][0])
-
-                # Muro de destino
-                target_wall = list(self.grid_walls[target][0])
-
-
                 # Determinar las direcciones relativas entre origen y destino
                 # Dirección del muro en origen
                 path_org = self.direction(origin, target)
@@ -457,26 +552,15 @@ class MansionModel(Model):
                 path_targ = self.direction(target, origin)
 
 
-                # Marcar las paredes como destruidas (0 indica muro destruido)
-                origin_wall[path_org] = "0"
-
-                target_wall[path_targ] = "0"
-                
-
-                # Actualizar las configuraciones de muros en el grid
-                self.grid_walls[origin][0] = "".join(origin_wall)
+                # Marcar las paredes como destruidas en ambas celdas
+                board.set_wall(board.index(origin), path_org, False)
+                board.set_wall(board.index(target), path_targ, False)
 
                 # Incrementar el contador de daño total
-                self.grid_walls[target][0] = "".join(target_wall)
                 self.damage_counter += 1
         else:
-            # Definir el área central del grid para limitar la acción
-            central_area = [
-                (x, y) for x in range(1, 9) for y in range(1, 7)
-            ]
-            
             # Si el objetivo está dentro del área central
-            if target in central_area:
+            if target in self.topology.interior:
                 # Determinar direcciones entre origen y destino
                 path_org= self.direction(origin, target)
                 # `path_org` representa la dirección relativa desde la celda `origin` hacia la celda `target`
@@ -486,86 +570,39 @@ class MansionModel(Model):
                 # Este valor es complementario al de `path_org`. Por ejemplo, si `path_org` es 2 (sur), `path_targ` será 0 (norte)
                 path_targ= self.direction(target, origin)
 
-                # Obtener muros y contadores de daños para origen y destino
-                origin_wall = list(self.grid_walls[origin][0])
-                # `origin_wall` es una lista que indica el estado de los muros en la celda `origin`
-                # Cada posición de la lista (0 a 3) corresponde a una dirección cardinal:
-                # - 0: Norte
-                # - 1: Este
-                # - 2: Sur
-                # - 3: Oeste
-                # El valor "1" significa que hay un muro presente, y "0" significa que el muro está destruido
-                
-                # Obtener la configuración de los muros en la celda de destino
-                target_wall = list(self.grid_walls[target][0])
-                # `target_wall` funciona igual que `origin_wall`, pero para la celda `target`
-                
-                
-                # Obtener los contadores de daño en la celda de origen
-                origin_counter = list(self.grid_walls[origin][1])
-                # `origin_counter` es una lista que indica si un muro en `origin` ha recibido daño:
-                # - "0": No ha recibido daño
-                # - "1": Ha recibido daño pero aún no está destruido
-
-                # Obtener los contadores de daño en la celda de destino
-                target_counter = list(self.grid_walls[target][1])
-                # `target_counter` funciona igual que `origin_counter`, pero para la celda `target`
+                # Índices de las celdas en los arreglos del tablero
+                origin_idx = board.index(origin)
+                target_idx = board.index(target)
+
+                # Bits de daño del muro compartido en origen y destino
+                origin_damaged = board.damage[origin_idx] >> path_org & 1
+                target_damaged = board.damage[target_idx] >> path_targ & 1
                 
-                # Caso: Ambas celdas ya tienen el muro marcado como dañado ("1")
-                if origin_counter[path_org]== "1" and target_counter[path_targ]== "1":
-                    # Verifica si ambos lados del muro (en `origin` y `target`) ya tienen daño registrado
-                    
+                # Caso: Ambas celdas ya tienen el muro marcado como dañado
+                if origin_damaged and target_damaged:
                     # Incrementa el contador global de daño en el modelo, que registra cuántos muros han sido destruidos o dañados
                     self.damage_counter += 1
                     
-                    # Actualiza el muro en `origin` para marcarlo como destruido (cambiar "1" a "0")
-                    origin_wall[path_org]= "0"
-
-                    # Actualiza el muro en `target` para marcarlo como destruido (cambiar "1" a "0")
-                    target_wall[path_targ]= "0"
+                    # Marca el muro como destruido en ambos lados
+                    board.set_wall(origin_idx, path_org, False)
+                    board.set_wall(target_idx, path_targ, False)
                     
-                    # Convierte la lista de `origin_wall` nuevamente en una cadena y la guarda en `self.grid_walls[origin][0]`.
-                    # Esto asegura que el estado del muro en `origin` quede registrado correctamente en el modelo.
-                    self.grid_walls[origin][0] = ''.join(origin_wall)
+                    self.log.info("[INFO] Pared destruida de %s a %s", origin, target)
                     
-                    # Convierte la lista de `target_wall` nuevamente en una cadena y la guarda en `self.grid_walls[target][0]`.
-                    # Esto asegura que el estado del muro en `target` quede registrado correctamente en el modelo.
-                    self.grid_walls[target][0] = ''.join(target_wall)
-                    
-                    print(f"[INFO] Pared destruida de {origin} a {target}")
-                    
-                    self.log_event({
-                        "type": "wall_destroyed",
-                        "position": origin,
-                        "target": target,
-                        "step": self.step_count
-                    })
+                    self.emit_event(EventStore.WALL_DESTROYED, origin, target, self.step_count)
 
                 # Caso: Ninguna celda tiene daño registrado previamente
-                elif origin_counter[path_org]== "0" and target_counter[path_targ]== "0":
+                elif not origin_damaged and not target_damaged:
                     # Incrementar daño total
                     self.damage_counter += 1
 
-                    # Registrar daño en origen
-                    origin_counter[path_org] = "1"
-
-                    # Registrar daño en destino
-                    target_counter[path_targ] = "1"
+                    # Registrar daño en origen y destino
+                    board.damage[origin_idx] |= 1 << path_org
+                    board.damage[target_idx] |= 1 << path_targ
 
-                    # Actualizar contadores de daño en el grid
-                    self.grid_walls[origin][1] = ''.join(origin_counter)
-
-
-                    self.grid_walls[target][1] = ''.join(target_counter)
-                    print(f"[INFO] Daño registrado en {origin} y {target}")
+                    self.log.info("[INFO] Daño registrado en %s y %s", origin, target)
                     
-                    self.log_event({
-                        "type": "damage_wall",
-                        "position": origin,
-                        "target":target,
-                        "step": self.step_count,
-                        "damage":self.damage_counter
-                    })
+                    self.emit_event(EventStore.DAMAGE_WALL, origin, target, self.step_count, self.damage_counter)
                 else:
                     pass
             # Caso: La celda objetivo está fuera del área central
@@ -573,23 +610,12 @@ class MansionModel(Model):
                 # Determinar dirección entre origen y destino
                 direction = self.direction(origin, target)
 
-                # Definir coordenadas de las esquinas del grid
-                origin_nw_crnr = (1,1) # Esquina noroeste
-                origin_ne_crnr = (8,1) # Esquina noreste
-                origin_sw_crnr = (1,6) # Esquina suroeste
-                origin_sw_crnr = (8,6) # Esquina sureste
+                # Dirección prohibida si el origen es una esquina del área central
+                forbidden = self.topology.corner_rules.get(origin)
                 
                 # Validar si la posición está en una esquina específica y no en la dirección opuesta
-                if origin == origin_nw_crnr or origin == origin_ne_crnr:
-                    
-                    # Dirección prohibida para estas esquinas
-                    if direction != 0:
-                        self.wall_damage(origin, target)
-                
-                elif origin == origin_sw_crnr or origin == origin_ne_crnr:
-                    
-                    # Dirección prohibida para estas esquinas
-                    if direction != 2:
+                if forbidden is not None:
+                    if direction != forbidden:
                         self.wall_damage(origin, target)
 
                 # Caso general: Ni origen ni destino son entradas
@@ -599,111 +625,104 @@ class MansionModel(Model):
     
     # Aplica daño a un muro específico entre dos celdas
     def wall_damage(self, origin, target):
+        board = self.board
+
         # Determinar dirección del muro a partir de origen y destino
         path_org       = self.direction(origin, target)
 
-        # Obtener muros y contadores de daño de la celda origen
-        origin_wall    = list(self.grid_walls[origin][0])
+        # Índice de la celda origen en los arreglos del tablero
+        origin_idx     = board.index(origin)
 
-        # Caso: El muro ya estaba dañado ("1"), se destruye completamente
-        origin_counter = list(self.grid_walls[origin][1])
-        if origin_counter[path_org]== "1":
+        # Caso: El muro ya estaba dañado, se destruye completamente
+        if board.damage[origin_idx] >> path_org & 1:
             # Incrementar contador de daño
             self.damage_counter += 1
             # Marcar muro como destruido
-            origin_wall[path_org]= "0"
-
-            # Actualizar el grid
-            self.grid_walls[origin][0] = ''.join(origin_wall)
-            print(f"[INFO] Pared destruida de {origin} a {target}")
-            self.log_event({
-                "type": "wall_destroyed",
-                "position": origin,
-                "target": target,
-                "step": self.step_count
-            })
-
-        # Caso: El muro estaba intacto ("0"), se marca como dañado
-        elif origin_counter[path_org]== "0":
+            board.set_wall(origin_idx, path_org, False)
+
+            self.log.info("[INFO] Pared destruida de %s a %s", origin, target)
+            self.emit_event(EventStore.WALL_DESTROYED, origin, target, self.step_count)
+
+        # Caso: El muro estaba intacto, se marca como dañado
+        else:
             # Incrementar contador de daño
             self.damage_counter += 1
 
             # Registrar daño en el muro
-            origin_counter[path_org] = "1"
+            board.damage[origin_idx] |= 1 << path_org
             
-            # Actualizar contador en el grid
-            self.grid_walls[origin][1] = ''.join(origin_counter)
-            print(f"[INFO] Daño registrado en {origin}")
-            self.log_event({
-                "type": "damage_wall",
-                "position": origin,
-                "target":origin,
-                "step": self.step_count,
-                "damage":self.damage_counter
-            })
-        else:
-            pass
+            self.log.info("[INFO] Daño registrado en %s", origin)
+            self.emit_event(EventStore.DAMAGE_WALL, origin, origin, self.step_count, self.damage_counter)
 
     # Maneja la dinámica de explosiones desde una celda específica
     # Las explosiones dañan paredes, se propagan a celdas vecinas y pueden causar daño estructural
+    # La onda avanza en línea recta por el rayo precalculado de la topología usando una cola de
+    # saltos pendientes (sin recursión); cada salto sobre una celda con fuego encola el siguiente
+    # Devuelve y registra en `self.explosion_stats` los saltos y muros dañados de la explosión
     def trigger_explosion(self, origin, target):
-        print(f"[DEBUG] Explosión iniciada en {origin} con dirección a {target}.")
-        
+        board = self.board
+
         # Determina la dirección de la explosión desde la celda de origen hacia la celda objetivo
         direction = self.direction(origin, target)
 
-        # Obtiene las celdas vecinas del objetivo dentro de la vecindad de Von Neumann (moore=False)
-        exp_neighbors = self.grid.get_neighborhood(target, moore=False, include_center=False)
-        
-        # Itera sobre cada vecino de la celda objetivo para procesar los efectos de la explosión
-        for exp_neighbor in exp_neighbors:
-            
-            # Verifica si el vecino está en la misma dirección que la explosión y no es la celda de origen  
-            if self.direction(target, exp_neighbor) == direction and \
-               exp_neighbor != origin:
+        # Celdas que siguen al objetivo en esa dirección hasta el borde de la cuadrícula
+        ray = self.topology.rays[board.index(target)][direction]
+
+        # Estadísticas de la cascada
+        stats = {
+            "origin": origin,
+            "target": target,
+            "hops": 0,
+            "walls_damaged": 0,
+            "step": self.step_count
+        }
+        damage_before = self.damage_counter
+
+        # Cola de saltos pendientes: (celda anterior, celda alcanzada, posición siguiente en el rayo)
+        pending = deque([(origin, target, 0)])
+
+        while pending:
+            hop_origin, hop_target, hop = pending.popleft()
+            stats["hops"] += 1
+
+            self.log.debug("[DEBUG] Explosión iniciada en %s con dirección a %s.", hop_origin, hop_target)
+
+            # La onda llegó al borde de la cuadrícula
+            if hop == len(ray):
+                break
+
+            # Vecino de la celda alcanzada en la misma dirección de la explosión
+            exp_neighbor = board.position(ray[hop])
+
+            # Si hay una colisión con muros o puertas entre las celdas objetivo y vecina
+            if self.check_collision_walls_doors(hop_target, exp_neighbor):
+                # Registra el daño en el muro o puerta y detiene la propagación
+                self.register_damage_walls_doors(hop_target, exp_neighbor)
+
+            # Si la celda vecina está vacía (0) o contiene humo (1)
+            elif self.grid_details.get(exp_neighbor) == 0 or \
+               self.grid_details.get(exp_neighbor) == 1:
+                # La celda vecina se convierte en fuego
+                self.grid_details[exp_neighbor] = 2
                 
-                # Si hay una colisión con muros o puertas entre las celdas objetivo y vecina
-                if self.check_collision_walls_doors(target, exp_neighbor):
-                    # Registra el daño en el muro o puerta
-                    self.register_damage_walls_doors(target, exp_neighbor)
-                    break # Detiene la propagación en esa dirección
-
-                # Si la celda vecina está vacía (0) o contiene humo (1)
-                elif self.grid_details.get(exp_neighbor) == 0 or \
-                   self.grid_details.get(exp_neighbor) == 1:
-                    # La celda vecina se convierte en fuego
-                    self.grid_details[exp_neighbor] = 2
-                    
-                    # Agrega la celda vecina como una nueva zona de fantasmas
-                    self.boo_zones.append(exp_neighbor)
-                    print(f"[INFO] Nuevo fuego extendido de {target} a {exp_neighbor}")
-                    
-                    if self.grid_details.get(exp_neighbor) == 0:
-                        self.log_event({
-                            "type": "fire_extended",
-                            "from": target,
-                            "to": exp_neighbor,
-                            "step": self.step_count
-                        })
-                    
-                    if self.grid_details.get(exp_neighbor) == 1:
-                        self.log_event({
-                        "type": "fire_to_smoke",
-                        "position": exp_neighbor,
-                        "step": self.step_count
-                    })
-                    break # Detiene la propagación en esa dirección
-
-                # Si la celda vecina ya contiene fuego (2), desencadena otra explosión
-                elif self.grid_details.get(exp_neighbor) == 2:
-                    self.trigger_explosion(target,exp_neighbor)
-                    break
-
-                # Si ninguna condición se cumple, no hace nada (continúa el bucle)
-                else:
-                    pass
-        
-        return # Finaliza el manejo de explosiones
+                # Agrega la celda vecina como una nueva zona de fantasmas
+                self.boo_zones.append(exp_neighbor)
+                self.log.info("[INFO] Nuevo fuego extendido de %s a %s", hop_target, exp_neighbor)
+                
+                if self.grid_details.get(exp_neighbor) == 0:
+                    self.emit_event(EventStore.FIRE_EXTENDED, hop_target, exp_neighbor, self.step_count)
+                
+                if self.grid_details.get(exp_neighbor) == 1:
+                    self.emit_event(EventStore.FIRE_TO_SMOKE, exp_neighbor, self.step_count)
+
+            # Si la celda vecina ya contiene fuego (2), la explosión continúa desde ella
+            elif self.grid_details.get(exp_neighbor) == 2:
+                pending.append((hop_target, exp_neighbor, hop + 1))
+
+        stats["walls_damaged"] = self.damage_counter - damage_before
+        self.explosion_stats.append(stats)
+
+        return stats # Finaliza el manejo de explosiones
     
     # Calcula la dirección de movimiento entre dos posiciones
     def direction(self, start, next):
@@ -724,132 +743,156 @@ class MansionModel(Model):
             else:
                 return 3  # Movimiento hacia la derecha (Este)
 
-    # Verifica si hay una colisión con un muro o una puerta entre dos posiciones
+    # Verifica si hay una colisión con un muro o una puerta cerrada entre dos posiciones
+    # Consulta la tabla de aristas del tablero (una sola lectura por arista)
     def check_collision_walls_doors(self, start, next):
-        # Determina la dirección relativa entre las dos posiciones
-        direction = self.direction(start, next)
-        # Comprueba si hay un muro en la dirección especificada desde la celda inicial
-        wall_blocked = direction != None and self.grid_walls[start][0][direction] == '1'
-        
-        # Verifica si ambas celdas son posiciones de puertas
-        if start in self.exit_positions and next in self.exit_positions:
-            # Si ambas puertas están abiertas, no hay colisión
-            doors_blocked = not (self.exit_positions[start] and self.exit_positions[next])
+        return bool(self.board.edge(start, next) & EDGE_BLOCKED)
+
+    # Convierte en fuego una celda con humo y registra el evento
+    def convert_smoke(self, smoke_cell):
+        self.grid_details[smoke_cell] = 2  # Convertir el humo en fuego
         
-        else:
-            # Si no son puertas, se considera bloqueado
-            doors_blocked = True
+        self.log.info("[INFO] Humo %s se convierte en fuego.", smoke_cell)
         
-        # Devuelve True si hay colisión con un muro o una puerta cerrada
-        return wall_blocked and doors_blocked
+        self.emit_event(EventStore.SMOKE_TO_FIRE, smoke_cell, self.step_count)
 
     # Maneja la expansión de incendios (conversión de humo en fuego)
     # y el daño a los retratos en zonas afectadas por el fuego.
+    # Solo revisa el frente de celdas que cambiaron desde la fase anterior (y sus vecinas);
+    # los cambios hechos durante esta fase quedan registrados para la siguiente
     def process_flashover(self):
-        # Procesa la expansión de incendios y fantasmas
+        board = self.board
+        fire = board.fire
+        neighbor_ids = self.topology.neighbor_ids
+
+        # Celdas cambiadas desde la fase anterior
+        changed = board.take_changes()
+
+        # Frente: celdas cambiadas y sus vecinas
+        frontier = set(changed)
+        for idx in changed:
+            frontier.update(neighbor_ids[idx])
+
         # Expandir incendios: convertir humo en fuego si hay fuego en vecinos
-        smoke_cells = [pos for pos, val in self.grid_details.items() if val == 1]
-        
-        # Expande incendios: convierte humo en fuego si hay fuego en celdas vecinas
-        for smoke_cell in smoke_cells:
-            # Obtiene los vecinos de la celda con humo
-            neighbors = self.grid.get_neighborhood(smoke_cell, moore=False, include_center=False)
+        # Con el kernel vectorizado se calcula toda la fase de una vez sobre las máscaras del tablero
+        if self.vectorized_flashover:
+            converted = board.flashover_kernel()
+
+            for smoke_idx in converted:
+                self.convert_smoke(board.position(smoke_idx))
+        else:
+            # Las celdas se procesan por índice creciente, igual que el recorrido completo del grid
+            smoke_queue = [idx for idx in frontier if fire[idx] == 1]
+            heapq.heapify(smoke_queue)
+            queued = set(smoke_queue)
+            converted = []
             
-            for neighbor in neighbors:
-                # Si un vecino contiene fuego (valor 2)
-                if self.grid_details[neighbor] == 2:  # Si hay fuego en un vecino
-                    # Verifica si hay un muro entre las celdas
-                    check_wall = self.check_collision_walls(smoke_cell, neighbor)
+            # Expande incendios: convierte humo en fuego si hay fuego en celdas vecinas
+            while smoke_queue:
+                smoke_idx = heapq.heappop(smoke_queue)
+                smoke_cell = board.position(smoke_idx)
+            
+                # Obtiene los vecinos de la celda con humo
+                for neighbor in self.topology.neighbors[smoke_idx]:
+                    # Si un vecino contiene fuego (valor 2)
+                    if self.grid_details[neighbor] == 2:  # Si hay fuego en un vecino
+                        # Verifica si hay un muro entre las celdas
+                        check_wall = self.check_collision_walls(smoke_cell, neighbor)
                     
-                    if not check_wall:
-                        # Convierte el humo en fuego
-                        self.grid_details[smoke_cell] = 2  # Convertir el humo en fuego
-                        
-                        print(f"[INFO] Humo {smoke_cell} se convierte en fuego.")
-                        
-                        self.log_event({
-                            "type": "smoke_to_fire",
-                            "position": smoke_cell,
-                            "step": self.step_count
-                        })
-
-                        break
+                        if not check_wall:
+                            # Convierte el humo en fuego
+                            self.convert_smoke(smoke_cell)
+                            converted.append(smoke_idx)
+
+                            # Las celdas con humo vecinas que aún no se revisan en esta fase ven el nuevo fuego
+                            for next_idx in neighbor_ids[smoke_idx]:
+                                if next_idx > smoke_idx and fire[next_idx] == 1 and next_idx not in queued:
+                                    queued.add(next_idx)
+                                    heapq.heappush(smoke_queue, next_idx)
+
+                            break
+
+        # Celdas que pudieron quedar en llamas en esta fase
+        touched = changed.union(converted)
+
+        # Procesar puntos con retratos afectados por el fuego, en orden de inserción
+        # Incluye los retratos en llamas que quedaron pendientes de la fase anterior
+        burning_portraits = sorted(
+            (board.position(idx) for idx in touched | self.pending_portraits
+             if board.portrait[idx] and fire[idx] == 2),
+            key=self.portraits.order
+        )
+        self.pending_portraits = set()
 
-        # Procesar puntos con retratos afectados por el fuego
-        for point in list(self.portraits):
+        for i, point in enumerate(burning_portraits):
             # Si hay fuego en una celda con un retrato
-            if self.grid_details[point] == 2:  # Si hay fuego en el punto del retrato
-                portrait_type = self.portraits[point]
+            portrait_type = self.portraits[point]
+            
+            del self.portraits[point]  # Eliminar el retrato
+            if portrait_type == "victim":  # Incrementar bajas solo si es víctima
+                self.casualties += 1
                 
-                del self.portraits[point]  # Eliminar el retrato
-                if portrait_type == "victim":  # Incrementar bajas solo si es víctima
-                    self.casualties += 1
-                    
-                    self.log_event({
-                        "type": "portrait_lost",
-                        "position": point,
-                        "portrait_type": portrait_type,
-                        "step": self.step_count
-                    })
-                    break
+                self.emit_event(EventStore.PORTRAIT_LOST, point, portrait_type, self.step_count)
+
+                # Los demás retratos en llamas se procesan en la siguiente fase
+                self.pending_portraits = {board.index(pos) for pos in burning_portraits[i + 1:]}
+                break
         
-        for cell in self.grid.coord_iter():
-            if len(cell[0]) == 0:
+        # Reinicia a los agentes que están sobre fuego
+        # Solo se revisan las celdas del frente que están ocupadas (índice de ocupación),
+        # en el mismo orden que `grid.coord_iter()` (x, luego y)
+        width, height = board.width, board.height
+        sweep = [
+            ((idx % width) * height + idx // width, idx)
+            for idx in touched & board.occupied if fire[idx] == 2
+        ]
+        heapq.heapify(sweep)
+        visited = set()
+
+        while sweep:
+            order, idx = heapq.heappop(sweep)
+            if idx in visited:
                 continue
+            visited.add(idx)
 
-            if self.grid_details[cell[1]] == 2:
-                agents = cell[0]
-                for agent in agents:
-                    agent.reset()
+            # Lista viva de la celda: `reset` la modifica igual que la celda de la cuadrícula
+            for agent in board.occupants.get(idx, ()):
+                agent.reset()
 
-            #agents_in_cell = list(cell_content)  # Agentes en la celda actual
-            #print(f"Agentes en la celda ({x}, {y}): {agents_in_cell}")
+                # Si el agente reaparece sobre fuego en una celda posterior del recorrido, también se revisa
+                start_idx = board.index(agent.pos)
+                start_order = (start_idx % width) * height + start_idx // width
+                if start_order > order and fire[start_idx] == 2 and start_idx not in visited:
+                    heapq.heappush(sweep, (start_order, start_idx))
 
-    # Verifica si hay una colisión entre dos posiciones
+    # Verifica si hay un muro entre dos posiciones (las puertas no cuentan como muro)
+    # Consulta la tabla de aristas del tablero (una sola lectura por arista)
     def check_collision_walls(self, start, next):
-        # Determina la dirección relativa entre las dos posiciones (0: norte, 1: este, 2: sur, 3: oeste)
-        direction = self.direction(start, next)
-
-        # Combina las posiciones 'start' y 'next' para verificar si representan una conexión de salida
-        combined_possn = start + next # Ejemplo: (2,3) + (3,3) = (2,3,3,3)
-        combined_posns = next + start # Ejemplo: (3,3) + (2,3) = (3,3,2,3)
-
-        # Verifica si la posición 'start' está en el grid_walls
-        if start in self.grid_walls:
-            # Si está, verifica si hay un muro presente en la dirección calculada
-            wall_blocked = direction is not None and self.grid_walls[start][0][direction] == '1'
-        else:
-            # Si no está en el grid_walls, no hay colisión
-            wall_blocked = False  # No hay colisión si la posición no está en el grid
-
-        # Comprueba si la posición combinada está en las salidas
-        if (combined_possn in self.exit_positions or 
-            combined_posns in self.exit_positions):
-            # Si son una salida, no bloquear el paso aunque haya un muro
-            wall_blocked = False  # No bloquear si está en una posición de salida
-        
-        # Devuelve True si hay colisión con un muro, False de lo contrario
-        return wall_blocked
+        return bool(self.board.edge(start, next) & EDGE_WALL)
 
     # Actualiza el estado de la simulación
     def update_simulation_status(self):
+        # Umbrales de derrota definidos por el tablero
+        casualty_limit = self.rules["casualty_limit"]
+        damage_limit = self.rules["damage_limit"]
+
         # Condición de derrota: número de bajas o daño estructural supera el límite
-        if self.casualties >= 4 or self.damage_counter >= 24:
+        if self.casualties >= casualty_limit or self.damage_counter >= damage_limit:
             # Actualiza el estado general a 'Derrota'
             self.simulation_status = "Defeat"
             
-            if self.casualties >=4:
+            if self.casualties >= casualty_limit:
                 # Establece la razón específica de la derrota
                 self.simulation_end = "Defeat by dead victims"
             
-            if self.damage_counter >=24:
+            if self.damage_counter >= damage_limit:
                 # Establece otra posible razón de derrota
                 self.simulation_end = "Defeat by damage"
             # Indica que la simulación debe detenerse
             return True
         
         # Condición de victoria: suficientes retratos rescatados
-        elif self.rescued >= 7:
+        elif self.rescued >= self.rules["rescue_goal"]:
             # Cambia el estado general a 'Victoria'
             self.simulation_status = "Victory"
             # Indica que la simulación debe detenerse
@@ -859,30 +902,48 @@ class MansionModel(Model):
     
     # Imprime información sobre los agentes registrados en el planificador (Scheduler)
     def print_schedule(self):
-        print("Agentes en el Scheduler:")
+        self.log.debug("Agentes en el Scheduler:")
 
         # Itera sobre los agentes programados en el Scheduler
         for agent in self.schedule.agents:
             # Muestra el ID, rol y posición de cada agente
-            print(f"Agente {agent.unique_id} con rol {agent.role} en posición {agent.pos}")
+            self.log.debug("Agente %s con rol %s en posición %s", agent.unique_id, agent.role, agent.pos)
+
+    # Asigna a cada agente su objetivo del turno con un emparejamiento voraz sobre el costo
+    # real del camino (ver TaskAssignment); los agentes sin objetivo eligen el más cercano
+    def assign_tasks(self):
+        assignments = greedy_assignment(self)
+
+        for agent in self.schedule.agents:
+            agent.assigned_target = assignments.get(agent.unique_id)
+
+        self.log.debug("[DEBUG] Objetivos asignados: %s", assignments)
 
     # Evoluciona el modelo en un solo turno, incluyendo acciones de agentes y eventos del entorno
     def step(self):
         """Evoluciona un paso del modelo."""
         # Imprime el número de turno actual para seguimiento
-        print(f"\n--- Turno {self.step_count} ---")
-        # Recolecta datos del modelo y los agentes para análisis futuro
-        self.datacollector.collect(self)  # Recolectar datos para análisis
+        self.log.info("\n--- Turno %s ---", self.step_count)
+        # Registra el estado del turno para análisis futuro
+        self.recorder.record(self)
 
         # Verifica si la simulación debe detenerse debido a condiciones de victoria o derrota
         if self.update_simulation_status():
-            print(f"[DEBUG] Estatus de la simulación: {self.simulation_status}")
+            self.log.debug("[DEBUG] Estatus de la simulación: %s", self.simulation_status)
             # Finaliza el turno si la simulación ha terminado
             return
 
         # Incrementa el contador de turnos
         self.step_count += 1
-        print("[DEBUG] Iniciando pasos de los agentes en orden:")
+
+        # Búsquedas cortadas por presupuesto antes de este turno
+        hits_before = self.budget_hits
+
+        # Fase de asignación: cada agente recibe su objetivo antes de ejecutar su estrategia
+        if self.task_assignment:
+            self.assign_tasks()
+
+        self.log.debug("[DEBUG] Iniciando pasos de los agentes en orden:")
 
         # Itera sobre los agentes en el Scheduler, ordenados por su ID único
         for agent in sorted(self.schedule.agents, key=lambda a: a.unique_id):
@@ -892,10 +953,20 @@ class MansionModel(Model):
             # Procesa la expansión de incendios y otros efectos del entorno
             self.process_flashover()
 
+        # Reporte de presupuestos agotados en el turno
+        self.turn_budget_hits = self.budget_hits - hits_before
+        if self.turn_budget_hits:
+            self.log.info("[INFO] %s búsquedas agotaron su presupuesto en el turno %s.", self.turn_budget_hits, self.step_count)
+
         # Mostrar la energía restante de todos los agentes al final del turno
-        print("\n[DEBUG] Energía de los agentes al final del turno:")
-        for agent in sorted(self.schedule.agents, key=lambda a: a.unique_id):
-            print(f"  - Agente {agent.unique_id} ({agent.role}): {agent.action_points} de energía.")
+        if self.log.debug_enabled:
+            self.log.debug("\n[DEBUG] Energía de los agentes al final del turno:")
+            for agent in sorted(self.schedule.agents, key=lambda a: a.unique_id):
+                self.log.debug("  - Agente %s (%s): %s de energía.", agent.unique_id, agent.role, agent.action_points)
         
         # Vuelve a verificar si las condiciones de la simulación han cambiado
-        self.update_simulation_status()
\ No newline at end of file
+        self.update_simulation_status()
+
+        # Registra el final del turno en la línea de tiempo
+        if self.timeline is not None:
+            self.timeline.record(self)
\ No newline at end of file
@@ -0,0 +1,226 @@
+# Núcleo de búsqueda de caminos sobre índices planos de celda
+# Las búsquedas de los agentes usan arreglos de costo y padre preasignados por modelo con
+# contadores de generación: una celda solo tiene costo válido si su marca es la de la búsqueda
+# actual, así que no se crean diccionarios ni conjuntos nuevos en cada búsqueda y nada se
+# limpia entre una y otra. Los caminos se devuelven como arreglos de índices (sin la celda inicial)
+import heapq            # Cola de prioridad de las búsquedas
+from array import array  # Caminos como arreglos compactos de índices
+
+from BoardState import EDGE_WALL, EDGE_DOOR  # Banderas de la tabla de aristas
+
+# Costo de cruzar una arista según sus banderas EDGE_*: 1 por paso, más 4 si hay un muro y 1 si
+# hay una puerta cerrada
+EDGE_COSTS = tuple(1 + (4 if flags & EDGE_WALL else 0) + (1 if flags & EDGE_DOOR else 0)
+                   for flags in range(8))
+
+
+# Costo de entrar a la celda `nxt` cruzando una arista con banderas `edge`: el de la arista más
+# el nivel de fuego (`fire`) de la celda. Es el costo por paso de todas las búsquedas de los
+# agentes (A*, objetivo más cercano, planificador incremental y campos de distancia); los
+# ciclos más frecuentes lo calculan en línea con EDGE_COSTS
+def step_cost(fire, edge, nxt):
+    return EDGE_COSTS[edge] + fire[nxt]
+
+
+class SearchBuffers:
+    # Arreglos de trabajo para un tablero de `size` celdas
+    def __init__(self, size):
+        self.cost = [0] * size
+        self.parent = [-1] * size
+        # Generación en la que se alcanzó / cerró cada celda
+        self.seen = [0] * size
+        self.closed = [0] * size
+        self.generation = 0
+        # Celdas expandidas por la última búsqueda y si se quedó sin presupuesto
+        self.expanded = 0
+        self.exhausted = False
+
+    # Inicia una búsqueda: los valores de generaciones anteriores quedan invalidados
+    def begin(self):
+        self.generation += 1
+        return self.generation
+
+    # Camino desde el inicio de la búsqueda hasta `idx` (sin la celda inicial)
+    def path_to(self, idx):
+        parent = self.parent
+        path = array("i")
+        while parent[idx] >= 0:
+            path.append(idx)
+            idx = parent[idx]
+        path.reverse()
+        return path
+
+
+# A* desde `start` hasta la primera celda de `goal_ids` que sale de la cola
+# Entrar a una celda cuesta `step_cost` (el mismo costo que `nearest`, así que el camino que
+# siguen los agentes tiene el costo con el que eligieron su objetivo); la prioridad es costo más
+# la distancia Manhattan al objetivo más cercano (calculada solo para las celdas que entran a la
+# cola) y los empates se resuelven por la heurística y después por orden de inserción
+# Devuelve el camino como arreglo de índices, o None si no se alcanza ningún objetivo
+# Con `budget` expande como máximo esa cantidad de celdas; si se agota antes de llegar,
+# devuelve el camino parcial hacia la celda alcanzada con menor heurística (None sin presupuesto)
+def astar(model, start, goal_ids, budget=None):
+    board = model.board
+    width = board.width
+    fire = board.fire
+    edges = board.edges
+    edge_costs = EDGE_COSTS
+    outbound = model.topology.outbound
+
+    buffers = model.search_buffers
+    buffers.expanded = 0
+    buffers.exhausted = False
+
+    # Sin objetivos no hay camino; sin presupuesto no se expande ninguna celda
+    if not goal_ids:
+        return None
+    if budget is not None and budget <= 0:
+        buffers.exhausted = True
+        return None
+
+    # Coordenadas de los objetivos; con uno solo la heurística se calcula en línea
+    goals = [(idx % width, idx // width) for idx in goal_ids]
+    gx, gy = goals[0]
+    single = len(goals) == 1
+
+    def heuristic(idx):
+        x, y = idx % width, idx // width
+        return min(abs(x - goal_x) + abs(y - goal_y) for goal_x, goal_y in goals)
+
+    generation = buffers.begin()
+    cost_of = buffers.cost
+    parent = buffers.parent
+    seen = buffers.seen
+    closed = buffers.closed
+
+    seen[start] = generation
+    cost_of[start] = 0
+    parent[start] = -1
+
+    order = 0
+    queue = [(0, 0, 0, start)]
+    limit = budget if budget is not None else -1
+    expanded = 0
+    # Mejor celda alcanzada para el camino parcial: (heurística, costo, celda)
+    best = (heuristic(start), 0, start)
+
+    while queue:
+        _, _, _, present = heapq.heappop(queue)
+
+        if present in goal_ids:
+            buffers.expanded = expanded
+            return buffers.path_to(present)
+
+        # Entrada vieja de una celda ya expandida
+        if closed[present] == generation:
+            continue
+
+        # Presupuesto agotado: el mejor camino parcial
+        if expanded == limit:
+            buffers.expanded = expanded
+            buffers.exhausted = True
+            return buffers.path_to(best[2]) if best[2] != start else None
+
+        closed[present] = generation
+        expanded += 1
+
+        base = cost_of[present]
+        for neighbor, edge_idx in outbound[present]:
+            if closed[neighbor] == generation:
+                continue
+
+            cost = base + edge_costs[edges[edge_idx]] + fire[neighbor]
+
+            if seen[neighbor] != generation or cost < cost_of[neighbor]:
+                seen[neighbor] = generation
+                cost_of[neighbor] = cost
+                parent[neighbor] = present
+
+                if single:
+                    estimate = abs(neighbor % width - gx) + abs(neighbor // width - gy)
+                else:
+                    estimate = heuristic(neighbor)
+                order += 1
+                heapq.heappush(queue, (cost + estimate, estimate, order, neighbor))
+
+                if (estimate, cost) < best[:2]:
+                    best = (estimate, cost, neighbor)
+
+    buffers.expanded = expanded
+    return None
+
+
+# Dijkstra desde `start` con el costo por paso de `step_cost` (el mismo de `astar`). Si
+# `goal_ids` no está vacío se detiene en el primer objetivo que sale de la cola y devuelve
+# (objetivo, camino); con `all_goals` sigue hasta cerrar todos los objetivos y devuelve
+# {objetivo: costo}
+# Con `budget` expande como máximo esa cantidad de celdas; si se agota antes de llegar a un
+# objetivo devuelve (None, None) y el agente decide con la distancia en línea recta (con
+# `all_goals`, los costos de los objetivos cerrados hasta ese momento)
+def nearest(model, start, goal_ids, all_goals=False, budget=None):
+    board = model.board
+    fire = board.fire
+    edges = board.edges
+    edge_costs = EDGE_COSTS
+    outbound = model.topology.outbound
+
+    buffers = model.search_buffers
+    generation = buffers.begin()
+    cost_of = buffers.cost
+    parent = buffers.parent
+    seen = buffers.seen
+    closed = buffers.closed
+
+    seen[start] = generation
+    cost_of[start] = 0
+    parent[start] = -1
+
+    pending = len(goal_ids)
+    costs = {}
+    queue = [(0, start)]
+    limit = budget if budget is not None else -1
+    expanded = 0
+    buffers.exhausted = False
+
+    # Sin presupuesto no se expande ninguna celda
+    if budget is not None and budget <= 0:
+        buffers.expanded = 0
+        buffers.exhausted = True
+        return costs if all_goals else (None, None)
+
+    while queue and (pending or not all_goals):
+        cost, present = heapq.heappop(queue)
+        if closed[present] == generation:
+            continue
+
+        if present in goal_ids:
+            if not all_goals:
+                buffers.expanded = expanded
+                return present, buffers.path_to(present)
+            costs[present] = cost
+            pending -= 1
+
+        # Presupuesto agotado
+        if expanded == limit:
+            buffers.exhausted = True
+            break
+
+        closed[present] = generation
+        expanded += 1
+
+        for neighbor, edge_idx in outbound[present]:
+            if closed[neighbor] == generation:
+                continue
+
+            new_cost = cost + edge_costs[edges[edge_idx]] + fire[neighbor]
+
+            if seen[neighbor] != generation or new_cost < cost_of[neighbor]:
+                seen[neighbor] = generation
+                cost_of[neighbor] = new_cost
+                parent[neighbor] = present
+                heapq.heappush(queue, (new_cost, neighbor))
+
+    buffers.expanded = expanded
+    if all_goals:
+        return costs
+    return None, None
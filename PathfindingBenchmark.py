@@ -0,0 +1,256 @@
+# Micro-benchmark de búsqueda de caminos sobre tableros sintéticos
+# Construye tableros de varios tamaños y densidades de muros y puertas, mide por separado
+# `LuigiAgent.dijkstra` (un objetivo y varios objetivos), `LuigiAgent.nearest_path` y las
+# consultas de colisión con muros y puertas, y compara con una línea base guardada
+#
+# Uso:
+#   python PathfindingBenchmark.py                  # mide y compara con la línea base
+#   python PathfindingBenchmark.py --save           # mide y guarda la línea base
+#   python PathfindingBenchmark.py --quick          # solo los tableros pequeños
+#
+# Los conteos de celdas expandidas son deterministas (mismo tablero y mismas consultas en cada
+# corrida), así que un cambio en ellos indica un cambio de algoritmo y solo su aumento define el
+# código de salida; las tasas por segundo dependen de la máquina y de su carga, así que se
+# comparan con una tolerancia solo como información
+import argparse  # Opciones de línea de comandos
+import io        # Salida descartada durante la construcción de los modelos
+import json      # Línea base en disco
+import os        # Ruta de la línea base
+import random    # Tableros y consultas reproducibles
+import sys       # Código de salida
+import time      # Medición de tiempos
+from contextlib import redirect_stdout  # Silencia la salida de mesa al crear modelos
+
+from BoardLoader import BoardDefinition, DEFAULT_RULES  # Definición de tablero en memoria
+from MansionModel import MansionModel
+
+# Archivo de la línea base (junto a este script)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pathfinding_baseline.json")
+
+# Tableros: (columnas, filas) del área central y probabilidad de muro entre celdas vecinas
+BOARD_SIZES = [(8, 6), (24, 24), (50, 50), (100, 100)]
+QUICK_SIZES = [(8, 6), (24, 24)]
+WALL_DENSITIES = [0.15, 0.45]
+# Fracción de los muros interiores que tienen puerta
+DOOR_RATIO = 0.2
+
+# Consultas por tablero y objetivos de cada búsqueda con varios objetivos
+SINGLE_QUERIES = 60
+MULTI_QUERIES = 20
+MULTI_GOALS = 8
+# Repeticiones de cada medición (se toma la más rápida) y vueltas sobre todos los pares de
+# celdas vecinas en cada medición de colisiones (cada consulta dura muy poco)
+REPEATS = 5
+COLLISION_ROUNDS = 20
+# Caída relativa máxima de una tasa respecto a la línea base antes de marcarla (informativo)
+TOLERANCE = 0.25
+
+
+# Genera la definición de un tablero de `cols` x `rows` con muros interiores al azar
+# Los muros se colocan en ambos lados de la arista para que el tablero sea consistente
+def synthetic_board(cols, rows, density, seed):
+    rnd = random.Random(seed)
+
+    # Celdas con 4 dígitos (norte, oeste, sur, este), borde exterior cerrado
+    walls = [[[int(r == 0), int(c == 0), int(r == rows - 1), int(c == cols - 1)]
+              for c in range(cols)] for r in range(rows)]
+    doors = {}
+    doors_connected = {}
+
+    # Coordenadas del archivo de tablero: fila y columna desde 1
+    for r in range(rows):
+        for c in range(cols):
+            # Arista hacia el este
+            if c + 1 < cols and rnd.random() < density:
+                walls[r][c][3] = walls[r][c + 1][1] = 1
+                if rnd.random() < DOOR_RATIO:
+                    doors[(c + 1, r + 1, c + 2, r + 1)] = (c + 1, r + 1, c + 2, r + 1)
+            # Arista hacia el sur
+            if r + 1 < rows and rnd.random() < density:
+                walls[r][c][2] = walls[r + 1][c][0] = 1
+                if rnd.random() < DOOR_RATIO:
+                    doors[(c + 1, r + 1, c + 1, r + 2)] = (c + 1, r + 1, c + 1, r + 2)
+
+    for c1, r1, c2, r2 in doors:
+        doors_connected[(c1, r1)] = (c2, r2)
+        doors_connected[(c2, r2)] = (c1, r1)
+
+    # Fuegos fijos (le dan costo a las celdas) y una entrada a mitad de cada lado
+    cells = [(r, c) for r in range(1, rows + 1) for c in range(1, cols + 1)]
+    rnd.shuffle(cells)
+    fires = cells[:max(1, len(cells) // 20)]
+    entrances = [(1, (cols + 1) // 2), (rows, (cols + 1) // 2),
+                 ((rows + 1) // 2, 1), ((rows + 1) // 2, cols)]
+
+    rules = dict(DEFAULT_RULES)
+    rules["damage_limit"] = rows * cols
+
+    return BoardDefinition(walls, [], [], fires, doors, doors_connected, entrances, rules)
+
+
+# Crea el modelo del tablero sin salida de diagnóstico
+def build_model(board, seed):
+    random.seed(seed)
+    with redirect_stdout(io.StringIO()):
+        return MansionModel(1, board.fake_alarms, board.victims, board.walls, dict(board.doors),
+                            board.fires, board.entrances, False, seed, rules=board.rules,
+                            log_level="silent")
+
+
+# Ejecuta `run` `REPEATS` veces y devuelve (segundos de la más rápida, su resultado)
+def best_time(run):
+    best = None
+    result = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, result
+
+
+# Mide un tablero y devuelve sus métricas
+def bench_board(cols, rows, density, seed=0):
+    board = synthetic_board(cols, rows, density, seed)
+    model = build_model(board, seed)
+    agent = model.schedule.agents[0]
+    buffers = model.search_buffers
+    details = model.grid_details
+
+    # Celdas del área central (coordenadas x, y de la cuadrícula)
+    rnd = random.Random(seed + 1)
+    cells = [(x, y) for y in range(1, rows + 1) for x in range(1, cols + 1)]
+    single = [(rnd.choice(cells), rnd.choice(cells)) for _ in range(SINGLE_QUERIES)]
+    multi = [(rnd.choice(cells), rnd.sample(cells, min(MULTI_GOALS, len(cells))))
+             for _ in range(MULTI_QUERIES)]
+
+    # Pares de celdas vecinas para las consultas de colisión
+    inside = set(cells)
+    pairs = [((x, y), (x + dx, y + dy)) for x, y in cells
+             for dx, dy in ((1, 0), (0, 1)) if (x + dx, y + dy) in inside]
+
+    def run_single():
+        expanded = 0
+        for start, goal in single:
+            agent.dijkstra(details, start, [goal])
+            expanded += buffers.expanded
+        return expanded
+
+    def run_multi():
+        expanded = 0
+        for start, goals in multi:
+            agent.dijkstra(details, start, goals)
+            expanded += buffers.expanded
+        return expanded
+
+    def run_nearest():
+        expanded = 0
+        position = agent.pos
+        for start, goals in multi:
+            agent.pos = start
+            agent.nearest_path(goals)
+            expanded += buffers.expanded
+        agent.pos = position
+        return expanded
+
+    def run_collisions():
+        hits = 0
+        for _ in range(COLLISION_ROUNDS):
+            for start, nxt in pairs:
+                hits += agent.check_collision_walls(start, nxt)
+                hits += agent.check_collision_doors(start, nxt)
+        return hits
+
+    metrics = {}
+    for name, run in (("single", run_single), ("multi", run_multi), ("nearest", run_nearest)):
+        elapsed, expanded = best_time(run)
+        metrics[name + "_expanded"] = expanded
+        metrics[name + "_rate"] = round(expanded / elapsed) if elapsed else 0
+
+    elapsed, _ = best_time(run_collisions)
+    metrics["collision_rate"] = round(2 * COLLISION_ROUNDS * len(pairs) / elapsed) if elapsed and pairs else 0
+
+    return metrics
+
+
+# Mide todos los tableros; las llaves son "columnasxfilas@densidad"
+def run_suite(sizes):
+    results = {}
+    for cols, rows in sizes:
+        for density in WALL_DENSITIES:
+            key = f"{cols}x{rows}@{density}"
+            results[key] = bench_board(cols, rows, density)
+            metrics = results[key]
+            print(f"{key:>14}  single {metrics['single_rate']:>9}/s  multi {metrics['multi_rate']:>9}/s  "
+                  f"nearest {metrics['nearest_rate']:>9}/s  collisions {metrics['collision_rate']:>10}/s")
+    return results
+
+
+# Compara con la línea base: imprime cada métrica y devuelve cuántos conteos de expansiones
+# aumentaron y cuántas tasas cayeron más de la tolerancia
+def compare(results, baseline, tolerance):
+    regressions = 0
+    slower = 0
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:>14}  sin línea base")
+            continue
+
+        for name, value in metrics.items():
+            previous = base.get(name)
+            if not previous:
+                continue
+            ratio = value / previous
+
+            if name.endswith("_expanded"):
+                # Menos expansiones es mejor; cualquier cambio indica otro algoritmo
+                mark = "" if value == previous else ("  (menos)" if value < previous else "  (MÁS)")
+                if value > previous:
+                    regressions += 1
+            else:
+                mark = ""
+                if ratio < 1 - tolerance:
+                    mark = "  (MÁS LENTO)"
+                    slower += 1
+                elif ratio > 1 + tolerance:
+                    mark = "  (más rápido)"
+            print(f"{key:>14}  {name:<16} {previous:>10} -> {value:>10}  x{ratio:.2f}{mark}")
+
+    return regressions, slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de búsqueda de caminos")
+    parser.add_argument("--save", action="store_true", help="guarda los resultados como línea base")
+    parser.add_argument("--quick", action="store_true", help="solo los tableros pequeños")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="archivo de la línea base")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="caída relativa de una tasa permitida antes de marcarla (informativo)")
+    args = parser.parse_args()
+
+    results = run_suite(QUICK_SIZES if args.quick else BOARD_SIZES)
+
+    if args.save:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"No hay línea base en {args.baseline} (usar --save)")
+        return 0
+
+    print()
+    regressions, slower = compare(results, baseline, args.tolerance)
+    print(f"\n{slower} tasas por debajo de la tolerancia (informativo, dependen de la máquina)")
+    print(f"{regressions} conteos de expansiones peores que la línea base")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
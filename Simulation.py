@@ -1,6 +1,7 @@
 from flask import Flask, jsonify
 from collections import OrderedDict
 from MansionModel import MansionModel  # Importa tu modelo y agentes
+from BoardLoader import load_board  # Lector compartido de archivos de tablero
 import random
 
 # Librerías de manipulación y análisis de datos
@@ -14,60 +15,33 @@ SEED = 31
 LUIGIS = 6
 DEVELOPMENT_MODE = True
 FILE_PATH = './final.txt'
+# Nivel de registro del modelo: "silent", "info" o "debug"
+LOG_LEVEL = "debug"
 
 def procesar_txt(file_path):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    # Procesar paredes
-    WALLS = []
-    index = 0
-    for _ in range(6):  # 6 líneas de paredes
-        row = []
-        cells = lines[index].strip().split()
-        for cell in cells:
-            # Cada celda es un diccionario con paredes explícitas
-            walls = {
-                "top": int(cell[0]),
-                "left": int(cell[1]),
-                "bottom": int(cell[2]),
-                "right": int(cell[3])
-            }
-            row.append(walls)
-        WALLS.append(row)
-        index += 1
-
-    # Procesar puntos de interés
-    FAKE_ALARMS = []
-    VICTIMS = []
-    for _ in range(3):  # Máximo 3 líneas para puntos de interés
-        r, c, marker_type = lines[index].strip().split()
-        if marker_type == 'f':  # Falsa alarma
-            FAKE_ALARMS.append({"row": int(r), "col": int(c)})
-        elif marker_type == 'v':  # Víctima
-            VICTIMS.append({"row": int(r), "col": int(c)})
-        index += 1
-
-    # Procesar marcadores de fuego
-    FIRES = []
-    for _ in range(10):  # 10 líneas de fuego
-        r, c = map(int, lines[index].strip().split())
-        FIRES.append({"row": r, "col": c})
-        index += 1
-
-    # Procesar marcadores de puertas
-    DOORS = []
-    for _ in range(8):  # 8 líneas de puertas
-        r1, c1, r2, c2 = map(int, lines[index].strip().split())
-        DOORS.append({"r1": r1, "c1": c1, "r2": r2, "c2": c2})
-        index += 1
-
-    # Procesar puntos de entrada
-    ENTRANCES = []
-    for _ in range(4):  # 4 líneas de puntos de entrada
-        r, c = map(int, lines[index].strip().split())
-        ENTRANCES.append({"row": r, "col": c})
-        index += 1
+    board = load_board(file_path)
+
+    # Cada celda de muros es un diccionario con paredes explícitas
+    WALLS = [
+        [
+            {"top": cell[0], "left": cell[1], "bottom": cell[2], "right": cell[3]}
+            for cell in row
+        ]
+        for row in board.walls
+    ]
+
+    # Puntos de interés
+    FAKE_ALARMS = [{"row": r, "col": c} for r, c in board.fake_alarms]
+    VICTIMS = [{"row": r, "col": c} for r, c in board.victims]
+
+    # Marcadores de fuego
+    FIRES = [{"row": r, "col": c} for r, c in board.fires]
+
+    # Marcadores de puertas (las llaves del tablero están en el formato (c1, r1, c2, r2))
+    DOORS = [{"r1": r1, "c1": c1, "r2": r2, "c2": c2} for c1, r1, c2, r2 in board.doors]
+
+    # Puntos de entrada
+    ENTRANCES = [{"row": r, "col": c} for r, c in board.entrances]
 
     # Usar OrderedDict para asegurar el orden de las claves en el JSON
     data = OrderedDict([
@@ -77,70 +51,15 @@ def procesar_txt(file_path):
         ("fires", FIRES),
         ("doors", DOORS),
         ("entrances", ENTRANCES),
-        ("width", 8),
-        ("height", 6)
+        ("width", board.cols),
+        ("height", board.rows)
     ])
     
     return data
 
 
 def procesar_txt_sim(file_path):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-
-    # Procesar paredes
-    WALLS = []
-    index = 0
-    for _ in range(6):  # 6 líneas de paredes
-        row = []
-        cells = lines[index].strip().split()
-        for cell in cells:
-            walls = [int(d) for d in cell]  # Cada celda se descompone en 4 dígitos
-            row.append(walls)
-        WALLS.append(row)
-        index += 1
-
-    # Procesar puntos de interés
-    FAKE_ALARMS = []
-    VICTIMS = []
-    for _ in range(3):  # Máximo 3 líneas para puntos de interés
-        r, c, marker_type = lines[index].strip().split()
-        if marker_type == 'f':  # Falsa alarma
-            FAKE_ALARMS.append((int(r), int(c)))
-        elif marker_type == 'v':  # Víctima
-            VICTIMS.append((int(r), int(c)))
-        index += 1
-
-    # Procesar marcadores de fuego
-    FIRES = []
-    for _ in range(10):  # 10 líneas de fuego
-        r, c = map(int, lines[index].strip().split())
-        FIRES.append((r, c))
-        index += 1
-
-    # Procesar marcadores de puertas
-    DOORS = {}
-    DOORS_CONNECTED = {}
-    for _ in range(8):  # 8 líneas de puertas
-        r1, c1, r2, c2 = map(int, lines[index].strip().split())
-        
-        # Reorganizar las coordenadas al formato (c1, r1, c2, r2)
-        c1, r1, c2, r2 = c1, r1, c2, r2
-        
-        # Almacenar las puertas con el formato reorganizado
-        DOORS[(c1, r1, c2, r2)] = (c1, r1, c2, r2)
-        DOORS_CONNECTED[(c1, r1)] = (c2, r2)
-        DOORS_CONNECTED[(c2, r2)] = (c1, r1)
-        index += 1
-        
-    # Procesar puntos de entrada
-    ENTRANCES = []
-    for _ in range(4):  # 4 líneas de puntos de entrada
-        r, c = map(int, lines[index].strip().split())
-        ENTRANCES.append((r, c))
-        index += 1
-
-    return WALLS, FAKE_ALARMS, VICTIMS, FIRES, DOORS, DOORS_CONNECTED, ENTRANCES
+    return load_board(file_path).as_tuple()
 
 @app.route('/get_board', methods=['GET'])
 def get_board():
@@ -169,11 +88,13 @@ def run_simulation():
         np.random.seed(SEED)
 
         # Procesar el archivo y configurar el modelo
-        WALLS, FAKE_ALARMS, VICTIMS, FIRES, DOORS, DOORS_CONNECTED, ENTRANCES = procesar_txt_sim(FILE_PATH)
+        board = load_board(FILE_PATH)
+        WALLS, FAKE_ALARMS, VICTIMS, FIRES, DOORS, DOORS_CONNECTED, ENTRANCES = board.as_tuple()
         model = MansionModel(
             LUIGIS, FAKE_ALARMS, 
             VICTIMS, WALLS, DOORS, 
-            FIRES, ENTRANCES, DEVELOPMENT_MODE, SEED
+            FIRES, ENTRANCES, DEVELOPMENT_MODE, SEED,
+            rules=board.rules, log_level=LOG_LEVEL
         )
 
         # Registrar agentes iniciales
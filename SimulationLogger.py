@@ -0,0 +1,35 @@
+# Registro de diagnóstico de la simulación con niveles
+# Reemplaza los print() del modelo y los agentes: los mensajes se formatean de forma diferida
+# (plantilla con %s y argumentos) solo si su nivel está habilitado
+import sys  # Salida estándar (se consulta en cada escritura para respetar redirecciones)
+
+# Niveles disponibles, del más silencioso al más detallado
+LEVELS = {"silent": 0, "info": 1, "debug": 2}
+
+
+# No hace nada: se usa para los niveles deshabilitados (sin formatear ni escribir)
+def _noop(message, *args):
+    pass
+
+
+class SimulationLogger:
+    # `level` es "silent" (sin salida), "info" (eventos del juego) o "debug" (toda la salida,
+    # igual que los print() originales)
+    def __init__(self, level="debug"):
+        if level not in LEVELS:
+            raise ValueError(f"Nivel de registro desconocido: {level!r} (usar {', '.join(LEVELS)})")
+
+        self.level = level
+        # Banderas para evitar recorridos que solo existen para imprimir
+        self.info_enabled = LEVELS[level] >= LEVELS["info"]
+        self.debug_enabled = LEVELS[level] >= LEVELS["debug"]
+
+        # Los niveles deshabilitados se enlazan a una función vacía
+        self.info = self._write if self.info_enabled else _noop
+        self.debug = self._write if self.debug_enabled else _noop
+
+    # Formatea el mensaje (solo si hay argumentos) y lo escribe como una línea en stdout
+    def _write(self, message, *args):
+        if args:
+            message = message % args
+        sys.stdout.write(message + "\n")
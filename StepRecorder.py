@@ -0,0 +1,132 @@
+# Registro por turno del estado de la simulación en arreglos tipados
+# Sustituye al DataCollector de mesa, que en cada turno copiaba estructuras de todo el tablero
+# y el historial completo de cada agente (la memoria crecía de forma cuadrática con los turnos)
+# Cada turno registrado agrega filas de ancho fijo: niveles de fuego, máscaras de muros, daños,
+# puertas abiertas y retratos (un byte por celda), los contadores del modelo y la celda de cada
+# agente. Los DataFrame de pandas solo se construyen al exportar
+from array import array  # Arreglos tipados que crecen sin objetos por elemento
+
+import numpy as np  # Vistas de las filas como matrices del tablero al exportar
+
+# Contadores del modelo registrados en cada fila (columna del DataFrame: atributo del modelo)
+COUNTERS = {
+    "Steps": "step_count",
+    "Damage": "damage_counter",
+    "Rescued": "rescued",
+    "Losses": "losses",
+    "Casualties": "casualties",
+}
+
+
+class StepRecorder:
+    # `every` registra un turno de cada `every` (0 o None deshabilita el registro)
+    def __init__(self, board, every=1):
+        self.width = board.width
+        self.height = board.height
+        self.size = board.size
+        self.every = every or 0
+
+        # Filas registradas
+        self.rows = 0
+        self.counters = {name: array("i") for name in COUNTERS}
+        # Estado de la simulación de cada fila como índice en `status_names`
+        self.status = array("b")
+        self.status_names = []
+
+        # Un byte por celda y fila
+        self.fire = array("b")
+        self.walls = bytearray()
+        self.damage = bytearray()
+        self.doors = bytearray()
+        self.portraits = bytearray()
+
+        # Agentes en orden de id (fijados en la primera fila) y su celda por fila (-1 sin celda)
+        self.agent_ids = None
+        self.roles = None
+        self.positions = array("i")
+
+    # Indica si el turno `step` se registra
+    def wants(self, step):
+        return self.every > 0 and step % self.every == 0
+
+    # Agrega la fila del turno actual del modelo
+    def record(self, model):
+        if not self.wants(model.step_count):
+            return
+
+        board = model.board
+
+        if self.agent_ids is None:
+            agents = sorted(model.schedule.agents, key=lambda a: a.unique_id)
+            self.agent_ids = [agent.unique_id for agent in agents]
+            self.roles = [agent.role for agent in agents]
+
+        for name, attribute in COUNTERS.items():
+            self.counters[name].append(getattr(model, attribute))
+
+        status = model.simulation_status
+        if status not in self.status_names:
+            self.status_names.append(status)
+        self.status.append(self.status_names.index(status))
+
+        self.fire.extend(board.fire)
+        self.walls += board.walls
+        self.damage += board.damage
+        self.doors += board.door_open
+        self.portraits += board.portrait
+
+        agents = {agent.unique_id: agent for agent in model.schedule.agents}
+        for agent_id in self.agent_ids:
+            agent = agents.get(agent_id)
+            pos = agent.pos if agent is not None else None
+            self.positions.append(board.index(pos) if pos is not None else -1)
+
+        self.rows += 1
+
+    # Bytes ocupados por los arreglos registrados
+    @property
+    def nbytes(self):
+        total = sum(len(values) * values.itemsize for values in self.counters.values())
+        total += len(self.status) + len(self.fire) + len(self.walls) + len(self.damage)
+        total += len(self.doors) + len(self.portraits)
+        return total + len(self.positions) * self.positions.itemsize
+
+    # Filas de un arreglo por celda como matrices (filas, alto, ancho)
+    def _boards(self, values, dtype):
+        return np.frombuffer(values, dtype=dtype).reshape(self.rows, self.height, self.width)
+
+    # DataFrame con una fila por turno registrado: contadores, estado y las matrices del tablero
+    # (mismos nombres de columna que los reportes de modelo del DataCollector anterior)
+    def get_model_vars_dataframe(self):
+        import pandas as pd  # Solo se necesita al exportar
+
+        data = {name: list(values) for name, values in self.counters.items()}
+        data["Status"] = [self.status_names[code] for code in self.status]
+
+        if self.rows:
+            data["Fire"] = list(self._boards(self.fire, np.int8))
+            data["Walls"] = list(self._boards(self.walls, np.uint8))
+            data["Wall Damage"] = list(self._boards(self.damage, np.uint8))
+            data["Doors"] = list(self._boards(self.doors, np.uint8))
+            data["Portraits"] = list(self._boards(self.portraits, np.uint8))
+        else:
+            for name in ("Fire", "Walls", "Wall Damage", "Doors", "Portraits"):
+                data[name] = []
+
+        return pd.DataFrame(data)
+
+    # DataFrame con una fila por agente y turno registrado, indexado por (Step, AgentID)
+    def get_agent_vars_dataframe(self):
+        import pandas as pd  # Solo se necesita al exportar
+
+        records = []
+        count = len(self.agent_ids or [])
+        steps = self.counters["Steps"]
+        for row in range(self.rows):
+            for column in range(count):
+                idx = self.positions[row * count + column]
+                position = (idx % self.width, idx // self.width) if idx >= 0 else None
+                records.append((steps[row], self.agent_ids[column], self.roles[column], position))
+
+        frame = pd.DataFrame(records, columns=["Step", "AgentID", "Role", "Position"])
+        return frame.set_index(["Step", "AgentID"])
@@ -0,0 +1,56 @@
+# Asignación global de tareas al inicio de cada turno
+# En lugar de que cada agente elija por su cuenta el objetivo más cercano (y varios rescatistas
+# terminen yendo al mismo retrato), se arma una matriz de costos agente x objetivo con el costo
+# real del camino y se resuelve con un emparejamiento voraz: primero los pares más baratos, un
+# objetivo por agente y un agente por objetivo
+from PathSearch import nearest  # Búsqueda con el costo por paso de `LuigiAgent.nearest_path`
+
+
+# Objetivos que le corresponden a un agente este turno: retratos para los rescatistas que no
+# llevan uno, celdas con humo o fuego para los bomberos (los que llevan retrato van a la salida
+# más cercana, que puede compartirse, así que no se asignan)
+def task_targets(model, agent):
+    board = model.board
+
+    if agent.role == "rescuer" and not agent.carrying_portrait:
+        return [board.index(pos) for pos in model.portraits.live()]
+    elif agent.role == "firefighter":
+        return sorted(board.smoke_set | board.fire_set)
+
+    return []
+
+
+# Empareja agentes con objetivos de forma voraz sobre la matriz de costos
+# Devuelve {unique_id del agente: posición del objetivo}; los empates se resuelven por el id del
+# agente y después por el índice del objetivo
+# Con `expansion_budget` en el modelo, la búsqueda de cada agente expande como máximo esa
+# cantidad de celdas (aparte del presupuesto de su turno, que empieza después de esta fase) y
+# solo se consideran los objetivos que alcanzó
+def greedy_assignment(model):
+    board = model.board
+    buffers = model.search_buffers
+    pairs = []
+
+    for agent in sorted(model.schedule.agents, key=lambda a: a.unique_id):
+        targets = task_targets(model, agent)
+        if not targets or agent.pos is None:
+            continue
+
+        # Costos hacia todos sus objetivos con una sola búsqueda desde el agente
+        costs = nearest(model, board.index(agent.pos), set(targets), all_goals=True,
+                        budget=model.expansion_budget)
+        if buffers.exhausted:
+            model.budget_hits += 1
+        pairs.extend((cost, agent.unique_id, target) for target, cost in costs.items())
+
+    pairs.sort()
+
+    assignments = {}
+    taken = set()
+    for cost, agent_id, target in pairs:
+        if agent_id in assignments or target in taken:
+            continue
+        assignments[agent_id] = board.position(target)
+        taken.add(target)
+
+    return assignments
@@ -0,0 +1,248 @@
+# Línea de tiempo de la partida para repetir y saltar a cualquier turno
+# Guarda un cuadro clave con el estado compacto completo cada `interval` turnos y, en los
+# demás turnos, solo las celdas que cambiaron (índice y nuevo valor) más la fila de agentes y
+# contadores. Reconstruir el estado de un turno parte del cuadro clave anterior y aplica como
+# máximo `interval - 1` diferencias, sin repetir la partida desde el turno 0
+import sys               # Orden de bytes de los segmentos empaquetados
+from array import array  # Filas de agentes y contadores
+
+import numpy as np  # Comparación y aplicación de diferencias sobre el estado compacto
+
+# Capas del tablero en el estado compacto, un byte por celda cada una y en este orden
+LAYERS = ("fire", "walls", "damage", "doors", "door_open", "portrait")
+# Contadores del modelo guardados en cada turno
+COUNTERS = ("damage_counter", "rescued", "losses", "casualties")
+
+
+class Timeline:
+    # Registra el estado actual de `model` como primer cuadro clave
+    def __init__(self, model, interval):
+        board = model.board
+        self.width = board.width
+        self.height = board.height
+        self.size = board.size
+        self.interval = max(1, interval)
+
+        # Turno de cada registro (consecutivos a partir del primero)
+        self.steps = array("i")
+        # Estado completo de los registros que son cuadro clave (por número de registro)
+        self.keyframes = {}
+        # Diferencias de cada registro: (índices int32, valores) en bytes, None en cuadros clave
+        self.deltas = []
+
+        # Agentes en orden de id: celda (-1 sin celda) y si llevan retrato, por registro
+        agents = sorted(model.schedule.agents, key=lambda a: a.unique_id)
+        self.agent_ids = [agent.unique_id for agent in agents]
+        self.roles = [agent.role for agent in agents]
+        self.positions = array("i")
+        self.carrying = bytearray()
+
+        # Contadores, estado de la simulación (índice en `status_names`) y número de eventos
+        # registrados hasta cada registro
+        self.counters = array("i")
+        self.status = array("b")
+        self.status_names = []
+        self.event_marks = array("i")
+        # Eventos emitidos antes del primer registro (distinto de 0 en segmentos empaquetados)
+        self.events_before = 0
+
+        # Estado compacto del último registro
+        self._last = None
+
+        self.record(model)
+
+    def __len__(self):
+        return len(self.steps)
+
+    # Estado compacto del tablero: las capas de LAYERS concatenadas
+    def _state(self, board):
+        return np.concatenate([np.frombuffer(getattr(board, layer), dtype=np.uint8)
+                               for layer in LAYERS])
+
+    # Agrega el registro del turno actual del modelo
+    def record(self, model):
+        state = self._state(model.board)
+        count = len(self.steps)
+
+        if count % self.interval == 0:
+            self.keyframes[count] = state.tobytes()
+            self.deltas.append(None)
+        else:
+            changed = np.flatnonzero(state != self._last)
+            self.deltas.append((changed.astype(np.int32).tobytes(), state[changed].tobytes()))
+        self._last = state
+
+        agents = {agent.unique_id: agent for agent in model.schedule.agents}
+        for agent_id in self.agent_ids:
+            agent = agents.get(agent_id)
+            pos = agent.pos if agent is not None else None
+            self.positions.append(model.board.index(pos) if pos is not None else -1)
+            self.carrying.append(bool(agent is not None and agent.carrying_portrait))
+
+        for name in COUNTERS:
+            self.counters.append(getattr(model, name))
+
+        status = model.simulation_status
+        if status not in self.status_names:
+            self.status_names.append(status)
+        self.status.append(self.status_names.index(status))
+
+        self.event_marks.append(len(model.events))
+        self.steps.append(model.step_count)
+
+    # Número de registro del turno `step`
+    def _record_of(self, step):
+        if not self.steps or not self.steps[0] <= step <= self.steps[-1]:
+            raise IndexError(f"el turno {step} no está en la línea de tiempo")
+        return step - self.steps[0]
+
+    # Estado compacto del registro `record`: su cuadro clave más las diferencias siguientes
+    def _rebuild(self, record):
+        key = record - record % self.interval
+        state = np.frombuffer(self.keyframes[key], dtype=np.uint8).copy()
+
+        for delta in self.deltas[key + 1:record + 1]:
+            changed, values = delta
+            state[np.frombuffer(changed, dtype=np.int32)] = np.frombuffer(values, dtype=np.uint8)
+
+        return state
+
+    # Estado exacto del tablero, los agentes y los contadores al final del turno `step`
+    # Las capas son matrices de alto x ancho con los mismos valores que los arreglos de BoardState
+    def state_at(self, step):
+        record = self._record_of(step)
+        layers = self._rebuild(record).reshape(len(LAYERS), self.height, self.width)
+
+        state = {"step": step}
+        for layer, values in zip(LAYERS, layers):
+            state[layer] = values.view(np.int8) if layer == "fire" else values
+
+        count = len(self.agent_ids)
+        agents = []
+        for column, agent_id in enumerate(self.agent_ids):
+            idx = self.positions[record * count + column]
+            agents.append({
+                "id": agent_id,
+                "role": self.roles[column],
+                "position": (idx % self.width, idx // self.width) if idx >= 0 else None,
+                "carrying_portrait": bool(self.carrying[record * count + column]),
+            })
+        state["agents"] = agents
+
+        for offset, name in enumerate(COUNTERS):
+            state[name] = self.counters[record * len(COUNTERS) + offset]
+        state["simulation_status"] = self.status_names[self.status[record]]
+        # Eventos del registro del modelo emitidos hasta el final del turno
+        state["events"] = self.event_marks[record]
+
+        return state
+
+    # Rango [inicio, fin) de los eventos emitidos durante el turno `step` en el registro
+    # de eventos del modelo (el turno inicial incluye los eventos de la creación del modelo)
+    def event_range(self, step):
+        record = self._record_of(step)
+        start = self.event_marks[record - 1] if record > 0 else self.events_before
+        return start, self.event_marks[record]
+
+    # Empaqueta los registros [start, stop) para guardarlos fuera del modelo; `start` debe ser
+    # un cuadro clave (múltiplo de `interval`) para que el segmento se pueda leer solo
+    # Devuelve una cabecera serializable como JSON y los bytes de los registros
+    def pack(self, start, stop):
+        if start % self.interval:
+            raise ValueError(f"el registro {start} no es un cuadro clave")
+
+        records = []
+        data = bytearray()
+        for record in range(start, stop):
+            delta = self.deltas[record]
+            if delta is None:
+                records.append(-1)
+                data += self.keyframes[record]
+            else:
+                records.append(len(delta[0]) // 4)
+                data += delta[0]
+                data += delta[1]
+
+        count = len(self.agent_ids)
+        data += self.positions[start * count:stop * count].tobytes()
+        data += self.carrying[start * count:stop * count]
+        data += self.counters[start * len(COUNTERS):stop * len(COUNTERS)].tobytes()
+        data += self.status[start:stop].tobytes()
+        data += self.event_marks[start:stop].tobytes()
+
+        header = {
+            "width": self.width,
+            "height": self.height,
+            "interval": self.interval,
+            "first_step": self.steps[start],
+            "records": records,
+            "agent_ids": self.agent_ids,
+            "roles": self.roles,
+            "status_names": self.status_names,
+            "events_before": self.event_marks[start - 1] if start > 0 else self.events_before,
+            "byteorder": sys.byteorder,
+        }
+        return header, bytes(data)
+
+    # Línea de tiempo (solo lectura) con los registros empaquetados por `pack`
+    @classmethod
+    def unpack(cls, header, data):
+        timeline = cls.__new__(cls)
+        timeline.width = header["width"]
+        timeline.height = header["height"]
+        timeline.size = timeline.width * timeline.height
+        timeline.interval = header["interval"]
+        timeline.agent_ids = header["agent_ids"]
+        timeline.roles = header["roles"]
+        timeline.status_names = header["status_names"]
+        timeline.events_before = header["events_before"]
+        timeline._last = None
+
+        swap = header["byteorder"] != sys.byteorder
+        state_bytes = len(LAYERS) * timeline.size
+        offset = 0
+
+        timeline.keyframes = {}
+        timeline.deltas = []
+        for record, changed in enumerate(header["records"]):
+            if changed < 0:
+                timeline.keyframes[record] = bytes(data[offset:offset + state_bytes])
+                timeline.deltas.append(None)
+                offset += state_bytes
+                continue
+
+            indexes = np.frombuffer(data[offset:offset + 4 * changed], dtype=np.int32)
+            if swap:
+                indexes = indexes.byteswap()
+            offset += 4 * changed
+            timeline.deltas.append((indexes.tobytes(), bytes(data[offset:offset + changed])))
+            offset += changed
+
+        # Filas de ancho fijo por registro en el orden de `pack`
+        def take(typecode, items):
+            nonlocal offset
+            values = array(typecode)
+            values.frombytes(data[offset:offset + items * values.itemsize])
+            if swap:
+                values.byteswap()
+            offset += items * values.itemsize
+            return values
+
+        total = len(header["records"])
+        count = len(timeline.agent_ids)
+        timeline.positions = take("i", total * count)
+        timeline.carrying = bytearray(take("B", total * count))
+        timeline.counters = take("i", total * len(COUNTERS))
+        timeline.status = take("b", total)
+        timeline.event_marks = take("i", total)
+        timeline.steps = array("i", range(header["first_step"], header["first_step"] + total))
+        return timeline
+
+    # Bytes ocupados por los cuadros clave, las diferencias y las filas por registro
+    @property
+    def nbytes(self):
+        total = sum(len(frame) for frame in self.keyframes.values())
+        total += sum(len(delta[0]) + len(delta[1]) for delta in self.deltas if delta is not None)
+        total += len(self.positions) * self.positions.itemsize + len(self.carrying)
+        total += len(self.counters) * self.counters.itemsize + len(self.status)
+        return total + len(self.event_marks) * self.event_marks.itemsize + len(self.steps) * self.steps.itemsize